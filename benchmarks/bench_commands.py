@@ -0,0 +1,137 @@
+"""
+Measures how quickly commands are deserialized from and serialized into frames.
+
+    $ python -m benchmarks.bench_commands
+"""
+
+from __future__ import annotations
+
+import time
+import argparse
+import functools
+
+import zigpy_znp.types as t
+import zigpy_znp.commands as c
+from zigpy_znp.frames import GeneralFrame
+
+
+def legacy_from_frame(cls, frame, *, align=False):
+    """
+    The previous decoder: every parameter is deserialized on its own and the command
+    is then validated by its constructor.
+    """
+
+    data = frame.data
+    params = {}
+
+    for param in cls.schema:
+        try:
+            if issubclass(param.type, t.CStruct):
+                params[param.name], data = param.type.deserialize(data, align=align)
+            else:
+                params[param.name], data = param.type.deserialize(data)
+        except ValueError:
+            if not data and param.optional:
+                break
+
+            raise
+
+    return cls(**params)
+
+
+def legacy_to_frame(command, *, align=False):
+    """
+    The previous encoder: every parameter is serialized on its own.
+    """
+
+    chunks = []
+
+    for param in command.schema:
+        value = getattr(command, param.name)
+
+        if value is None:
+            continue
+
+        if issubclass(param.type, t.CStruct):
+            chunks.append(value.serialize(align=align))
+        else:
+            chunks.append(value.serialize())
+
+    return GeneralFrame(command.header, b"".join(chunks))
+
+
+COMMANDS = {
+    "AF.IncomingMsg": c.AF.IncomingMsg.Callback(
+        GroupId=0x0000,
+        ClusterId=0x0006,
+        SrcAddr=0x1234,
+        SrcEndpoint=1,
+        DstEndpoint=1,
+        WasBroadcast=t.Bool.false,
+        LQI=255,
+        SecurityUse=t.Bool.false,
+        TimeStamp=12345678,
+        TSN=0,
+        Data=b"\x18\x01\x0A\x00\x00\x10\x01",
+        MacSrcAddr=0x1234,
+        MsgResultRadius=29,
+    ),
+    "AF.DataRequestExt": c.AF.DataRequestExt.Req(
+        DstAddrModeAddress=t.AddrModeAddress(mode=t.AddrMode.NWK, address=0x1234),
+        DstEndpoint=1,
+        DstPanId=0x0000,
+        SrcEndpoint=1,
+        ClusterId=0x0006,
+        TSN=123,
+        Options=c.af.TransmitOptions.ACK_REQUEST,
+        Radius=30,
+        Data=b"\x01\x02\x03\x04\x05\x06\x07\x08",
+    ),
+}
+
+
+def measure(function, iterations: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        function()
+
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, command in COMMANDS.items():
+        cls = type(command)
+        frame = command.to_frame()
+
+        assert legacy_from_frame(cls, frame) == cls.from_frame(frame) == command
+        assert legacy_to_frame(command) == frame
+
+        results = {
+            "decode": (
+                measure(
+                    functools.partial(legacy_from_frame, cls, frame), args.iterations
+                ),
+                measure(functools.partial(cls.from_frame, frame), args.iterations),
+            ),
+            "encode": (
+                measure(functools.partial(legacy_to_frame, command), args.iterations),
+                measure(command.to_frame, args.iterations),
+            ),
+        }
+
+        print(f"{name}:")
+
+        for operation, (legacy, current) in results.items():
+            print(
+                f"  {operation}: {legacy:12,.0f} -> {current:12,.0f} ops/s"
+                f" ({current / legacy:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
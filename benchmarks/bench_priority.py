@@ -0,0 +1,211 @@
+"""
+Measures the latency of interactive commands sent with
+`ControllerApplication.send_packet` while the radio is saturated by OTA transfers and
+reporting configuration.
+
+    $ python -m benchmarks.bench_priority
+"""
+
+from __future__ import annotations
+
+import time
+import types
+import asyncio
+import argparse
+import itertools
+import statistics
+
+import zigpy.types as zigpy_t
+
+import zigpy_znp.types as t
+import zigpy_znp.config as conf
+import zigpy_znp.commands as c
+from zigpy_znp.api import ZNP
+from zigpy_znp.uart import ZnpMtProtocol
+from zigpy_znp.frames import TransportFrame
+from zigpy_znp.scheduler import PriorityClass
+from zigpy_znp.zigbee.application import ControllerApplication
+
+
+class LoopbackRadio:
+    """
+    Transport that confirms every data request. Like a real radio, it takes a while to
+    respond to each SREQ and confirms the packet once it has been sent.
+    """
+
+    def __init__(self, srsp_delay: float, confirm_delay: float) -> None:
+        self.protocol: ZnpMtProtocol | None = None
+        self._rx = ZnpMtProtocol(self)
+        self._srsp_delay = srsp_delay
+        self._confirm_delay = confirm_delay
+        self._closed = False
+
+    def write(self, data: bytes) -> None:
+        self._rx.data_received(data)
+
+    def frame_received(self, frame) -> None:
+        request = c.COMMANDS_BY_ID[frame.header].from_frame(frame)
+        loop = asyncio.get_running_loop()
+
+        for delay, response in [
+            (self._srsp_delay, c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS)),
+            (
+                self._srsp_delay + self._confirm_delay,
+                c.AF.DataConfirm.Callback(
+                    Status=t.Status.SUCCESS,
+                    Endpoint=request.DstEndpoint,
+                    TSN=request.TSN,
+                ),
+            ),
+        ]:
+            loop.call_later(delay, self._send, response)
+
+    def _send(self, response: t.CommandBase) -> None:
+        if self._closed:
+            return
+
+        self.protocol.data_received(
+            bytes(TransportFrame(response.to_frame()).serialize())
+        )
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class FifoControllerApplication(ControllerApplication):
+    """
+    Sends every packet with the same priority class, like before priority classes.
+    """
+
+    def _packet_priority(self, packet: zigpy_t.ZigbeePacket) -> PriorityClass:
+        return PriorityClass.NORMAL
+
+
+def make_app(
+    app_cls: type[ControllerApplication], srsp_delay: float, confirm_delay: float
+) -> ControllerApplication:
+    config = {conf.CONF_DEVICE: {conf.CONF_DEVICE_PATH: "/"}}
+    app = app_cls(config)
+
+    app._znp = ZNP(conf.CONFIG_SCHEMA(config))
+    app._znp._uart = ZnpMtProtocol(app._znp, url="loopback")
+    app._version_rsp = types.SimpleNamespace(CodeRevision=t.uint32_t(20230507))
+    app.state.node_info.nwk = 0x0000
+
+    radio = LoopbackRadio(srsp_delay, confirm_delay)
+    radio.protocol = app._znp._uart
+    app._znp._uart.connection_made(radio)
+
+    return app
+
+
+def make_packet(tsn: int, cluster: int, data: bytes) -> zigpy_t.ZigbeePacket:
+    return zigpy_t.ZigbeePacket(
+        src=zigpy_t.AddrModeAddress(addr_mode=zigpy_t.AddrMode.NWK, address=0x0000),
+        src_ep=1,
+        dst=zigpy_t.AddrModeAddress(addr_mode=zigpy_t.AddrMode.NWK, address=0x1234),
+        dst_ep=1,
+        tsn=tsn,
+        profile_id=0x0104,
+        cluster_id=cluster,
+        data=zigpy_t.SerializableBytes(data),
+        radius=30,
+    )
+
+
+async def run(
+    app_cls: type[ControllerApplication],
+    *,
+    duration: float,
+    bulk: int,
+    maintenance: int,
+    interval: float,
+    srsp_delay: float,
+    confirm_delay: float,
+) -> tuple[list[float], dict[str, int]]:
+    app = make_app(app_cls, srsp_delay, confirm_delay)
+    tsns = itertools.cycle(range(256))
+    sent = {"bulk": 0, "maintenance": 0}
+
+    async def background(kind: str, cluster: int, frame_control: int, command: bytes):
+        while True:
+            tsn = next(tsns)
+            data = bytes([frame_control, tsn]) + command
+            await app.send_packet(make_packet(tsn, cluster, data))
+            sent[kind] += 1
+
+    tasks = [
+        # OTA image block responses
+        asyncio.create_task(background("bulk", 0x0019, 0x19, b"\x05" + 64 * b"\xAB"))
+        for _ in range(bulk)
+    ] + [
+        # Configure reporting
+        asyncio.create_task(background("maintenance", 0x0006, 0x00, b"\x06\x00"))
+        for _ in range(maintenance)
+    ]
+
+    # Let the backlog build up
+    await asyncio.sleep(interval)
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        tsn = next(tsns)
+        start = time.perf_counter()
+        await app.send_packet(make_packet(tsn, 0x0006, bytes([0x01, tsn, 0x02])))
+        latencies.append(time.perf_counter() - start)
+
+        await asyncio.sleep(interval)
+
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    app._znp.close()
+
+    return latencies, sent
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--bulk", type=int, default=32, help="concurrent OTA senders")
+    parser.add_argument("--maintenance", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--srsp-delay", type=float, default=0.002)
+    parser.add_argument("--confirm-delay", type=float, default=0.010)
+    args = parser.parse_args()
+
+    for name, app_cls in [
+        ("fifo", FifoControllerApplication),
+        ("priority", ControllerApplication),
+    ]:
+        latencies, sent = asyncio.run(
+            run(
+                app_cls,
+                duration=args.duration,
+                bulk=args.bulk,
+                maintenance=args.maintenance,
+                interval=args.interval,
+                srsp_delay=args.srsp_delay,
+                confirm_delay=args.confirm_delay,
+            )
+        )
+
+        print(
+            f"{name:>8}: interactive"
+            f" p50={1000 * statistics.median(latencies):7.1f}ms"
+            f" p99={1000 * percentile(latencies, 0.99):7.1f}ms"
+            f" max={1000 * max(latencies):7.1f}ms,"
+            f" bulk {sent['bulk'] / args.duration:6.0f}/s,"
+            f" maintenance {sent['maintenance'] / args.duration:6.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
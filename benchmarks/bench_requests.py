@@ -0,0 +1,197 @@
+"""
+Measures SREQ throughput of `ZNP.request` against a radio that answers every SREQ with
+its SRSP on the next UART read, like bulk NVRAM reads and writes do.
+
+    $ python -m benchmarks.bench_requests
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import argparse
+import contextlib
+
+import async_timeout
+from zigpy.datastructures import PriorityLock
+
+import zigpy_znp.types as t
+import zigpy_znp.config as conf
+import zigpy_znp.commands as c
+from zigpy_znp.api import ZNP
+from zigpy_znp.uart import ZnpMtProtocol
+from zigpy_znp.frames import TransportFrame
+from zigpy_znp.types.nvids import OsalNvIds
+
+
+class LoopbackRadio:
+    """
+    Transport that answers NVRAM reads and writes. Replies are delivered on the next
+    event loop iteration, as if they had been read from the serial port.
+    """
+
+    def __init__(self, value: bytes) -> None:
+        self.protocol: ZnpMtProtocol | None = None
+        self._rx = ZnpMtProtocol(self)
+        self._value = value
+
+    def write(self, data: bytes) -> None:
+        self._rx.data_received(data)
+
+    def frame_received(self, frame) -> None:
+        request = c.COMMANDS_BY_ID[frame.header].from_frame(frame)
+
+        if isinstance(request, c.SYS.OSALNVReadExt.Req):
+            response = c.SYS.OSALNVReadExt.Rsp(
+                Status=t.Status.SUCCESS, Value=self._value
+            )
+        else:
+            response = c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)
+
+        asyncio.get_running_loop().call_soon(
+            self.protocol.data_received,
+            bytes(TransportFrame(response.to_frame()).serialize()),
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class LegacyZNP(ZNP):
+    """
+    The previous request path: every request takes a priority lock, registers its
+    listener, and sends its own frame once its sender has been woken up.
+    """
+
+    def __init__(self, config: conf.ConfigType) -> None:
+        super().__init__(config)
+        self._sync_request_lock = PriorityLock()
+
+    async def request(self, request, timeout=None, **response_params):
+        partial_response = request.Rsp(partial=True)
+        frame = request.to_frame(align=self.nvram.align_structs)
+
+        async with self._sync_request_lock(priority=self.get_request_priority(request)):
+            await self._uart.drain()
+
+            response_future = self.wait_for_responses(
+                [
+                    request.Rsp(partial=True),
+                    c.RPCError.CommandNotRecognized.Rsp(
+                        partial=True, RequestHeader=request.header
+                    ),
+                ]
+            )
+
+            self._uart.send(frame)
+
+            async with async_timeout.timeout(
+                timeout or self._znp_config[conf.CONF_SREQ_TIMEOUT]
+            ):
+                response = await response_future
+
+        assert partial_response.matches(response)
+
+        return response
+
+
+def make_znp(znp_cls: type[ZNP], value: bytes) -> ZNP:
+    znp = znp_cls(conf.CONFIG_SCHEMA({conf.CONF_DEVICE: {conf.CONF_DEVICE_PATH: "/"}}))
+    znp._uart = ZnpMtProtocol(znp, url="loopback")
+
+    radio = LoopbackRadio(value)
+    radio.protocol = znp._uart
+    znp._uart.connection_made(radio)
+
+    return znp
+
+
+def make_request(write: bool) -> t.CommandBase:
+    if write:
+        return c.SYS.OSALNVWriteExt.Req(
+            Id=OsalNvIds.ADDRMGR, Offset=0, Value=b"\xAB" * 16
+        )
+
+    return c.SYS.OSALNVReadExt.Req(Id=OsalNvIds.ADDRMGR, Offset=0)
+
+
+async def bulk(znp: ZNP, requests: int, concurrency: int | None, write: bool) -> None:
+    request = make_request(write)
+
+    # Without a concurrency, everything is sent as a single batch
+    if concurrency is None:
+        await znp.request_many([request] * requests, RspStatus=t.Status.SUCCESS)
+        return
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await znp.request(request, RspStatus=t.Status.SUCCESS)
+
+    await asyncio.gather(*[worker(requests // concurrency) for _ in range(concurrency)])
+
+
+async def busy_task() -> None:
+    """
+    Stands in for the other tasks sharing the event loop, which all get to run once
+    during every loop iteration.
+    """
+
+    while True:
+        await asyncio.sleep(0)
+
+
+async def run(
+    znp_cls: type[ZNP], requests: int, concurrency: int | None, write: bool, load: int
+) -> float:
+    znp = make_znp(znp_cls, value=b"\xAB" * 16)
+    busy_tasks = [asyncio.create_task(busy_task()) for _ in range(load)]
+
+    start = time.perf_counter()
+
+    with contextlib.closing(znp):
+        await bulk(znp, requests, concurrency, write)
+
+    elapsed = time.perf_counter() - start
+
+    for task in busy_tasks:
+        task.cancel()
+
+    await asyncio.gather(*busy_tasks, return_exceptions=True)
+
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32])
+    parser.add_argument(
+        "--load", type=int, nargs="+", default=[0, 20], help="other busy tasks"
+    )
+    args = parser.parse_args()
+
+    for write in (False, True):
+        for load in args.load:
+            kind = "write" if write else "read"
+
+            for concurrency in args.concurrency:
+                label = f"{kind} x{concurrency} load={load}"
+
+                for name, znp_cls in [("legacy", LegacyZNP), ("current", ZNP)]:
+                    elapsed = asyncio.run(
+                        run(znp_cls, args.requests, concurrency, write, load)
+                    )
+                    print(
+                        f"{label:>20} {name:>8}:"
+                        f" {args.requests / elapsed:10,.0f} SREQ/s"
+                    )
+
+            elapsed = asyncio.run(run(ZNP, args.requests, None, write, load))
+            label = f"{kind} batch load={load}"
+            print(
+                f"{label:>20} {'current':>8}: {args.requests / elapsed:10,.0f} SREQ/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Measures how long each phase of `ControllerApplication.startup` takes against the
+simulated radios used by the tests, with every request taking a while to be answered.
+Bootloader delays are shortened the same way the tests shorten them.
+
+    $ python -m benchmarks.bench_startup
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+import argparse
+import statistics
+import collections
+from unittest.mock import patch
+
+from zigpy_znp.uart import ZnpMtProtocol
+from zigpy_znp.zigbee.application import ControllerApplication
+
+from tests.conftest import (
+    FORMED_DEVICES,
+    FAKE_SERIAL_PORT,
+    BaseServerZNP,
+    ForwardingSerialTransport,
+    config_for_port_path,
+)
+
+
+def with_latency(server_cls: type[BaseServerZNP], latency: float) -> type:
+    """
+    Simulated radio that waits before answering every request.
+    """
+
+    class DelayedServer(server_cls):  # type: ignore[valid-type,misc]
+        async def _send_responses(self, request, responses):
+            await asyncio.sleep(latency)
+            await super()._send_responses(request, responses)
+
+    DelayedServer.__name__ = server_cls.__name__
+
+    return DelayedServer
+
+
+def serial_connection(server: BaseServerZNP):
+    """
+    Replacement for `create_serial_connection` that connects to the simulated radio.
+    """
+
+    def create_serial_connection(loop, protocol_factory, url, *args, **kwargs):
+        if server._uart is None:
+            server._uart = ZnpMtProtocol(server)
+
+        client_protocol = protocol_factory()
+
+        client_transport = ForwardingSerialTransport(server._uart)
+        server_transport = ForwardingSerialTransport(client_protocol)
+        server_transport.other = client_transport
+        client_transport.other = server_transport
+
+        server_transport._connect()
+        client_transport._connect()
+
+        future = loop.create_future()
+        future.set_result((client_transport, client_protocol))
+
+        return future
+
+    return create_serial_connection
+
+
+async def run(
+    server_cls: type[BaseServerZNP], latency: float
+) -> tuple[float, list[tuple[str, float, int]]]:
+    config = config_for_port_path(FAKE_SERIAL_PORT)
+
+    server = with_latency(server_cls, latency)(config)
+    server._uart = None
+
+    app = ControllerApplication(config)
+
+    with patch(
+        "serial_asyncio.create_serial_connection", new=serial_connection(server)
+    ), patch("zigpy_znp.api.AFTER_BOOTLOADER_SKIP_BYTE_DELAY", 0.001), patch(
+        "zigpy_znp.api.BOOTLOADER_PIN_TOGGLE_DELAY", 0.001
+    ):
+        start = time.perf_counter()
+        await app.startup(auto_form=False)
+        total = time.perf_counter() - start
+
+    phases = [(p.name, p.duration, p.sreqs) for p in app.startup_phases()]
+    await app.shutdown()
+
+    return total, phases
+
+
+def main() -> None:
+    devices = {cls.__name__: cls for cls in FORMED_DEVICES}
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="seconds to answer each request"
+    )
+    parser.add_argument(
+        "--device", choices=list(devices), action="append", help="default: all"
+    )
+    args = parser.parse_args()
+
+    # The simulated radios warn about requests they do not handle
+    logging.disable(logging.WARNING)
+
+    for name in args.device or list(devices):
+        totals = []
+        durations: dict[str, list[float]] = collections.defaultdict(list)
+        sreqs: dict[str, int] = {}
+
+        for _ in range(args.rounds):
+            total, phases = asyncio.run(run(devices[name], args.latency))
+            totals.append(total)
+
+            for phase, duration, count in phases:
+                durations[phase].append(duration)
+                sreqs[phase] = count
+
+        print(
+            f"{name}: startup p50={1000 * statistics.median(totals):7.1f}ms"
+            f" over {args.rounds} rounds, {sum(sreqs.values())} requests"
+        )
+
+        for phase, values in durations.items():
+            print(
+                f"  {phase:>22}: {1000 * statistics.median(values):7.1f}ms"
+                f" {sreqs[phase]:4d} requests"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures how quickly `ZnpMtProtocol` extracts frames from bursty UART reads.
+
+    $ python -m benchmarks.bench_uart
+"""
+
+from __future__ import annotations
+
+import time
+import argparse
+
+import zigpy_znp.types as t
+import zigpy_znp.commands as c
+from zigpy_znp.uart import ZnpMtProtocol
+from zigpy_znp.frames import TransportFrame
+from zigpy_znp.exceptions import InvalidFrame
+
+
+class NullAPI:
+    def frame_received(self, frame) -> None:
+        pass
+
+
+class LegacyZnpMtProtocol(ZnpMtProtocol):
+    """
+    The previous frame extractor: every frame is fully deserialized from the start of
+    the buffer and then deleted from it.
+    """
+
+    def _extract_frames(self):
+        extracted = []
+
+        while len(self._buffer) >= 5:
+            try:
+                if self._buffer[0] != TransportFrame.SOF or self._buffer[1] > 250:
+                    raise InvalidFrame()
+
+                if len(self._buffer) < self._buffer[1] + 5:
+                    break
+
+                frame, rest = TransportFrame.deserialize(self._buffer)
+            except InvalidFrame:
+                sof_index = self._buffer.find(TransportFrame.SOF, 1)
+
+                if sof_index < 0:
+                    self._buffer.clear()
+                else:
+                    del self._buffer[:sof_index]
+
+                continue
+
+            del self._buffer[: len(self._buffer) - len(rest)]
+            extracted.append(frame.payload)
+
+        return extracted
+
+
+def make_burst(frames_per_read: int) -> bytes:
+    frame = c.AF.IncomingMsg.Callback(
+        GroupId=0x0000,
+        ClusterId=0x0006,
+        SrcAddr=0x1234,
+        SrcEndpoint=1,
+        DstEndpoint=1,
+        WasBroadcast=t.Bool.false,
+        LQI=255,
+        SecurityUse=t.Bool.false,
+        TimeStamp=12345678,
+        TSN=0,
+        Data=b"\x18\x01\x0A\x00\x00\x10\x01",
+        MacSrcAddr=0x1234,
+        MsgResultRadius=29,
+    ).to_frame()
+
+    return bytes(TransportFrame(frame).serialize()) * frames_per_read
+
+
+def run(protocol_cls, burst: bytes, reads: int, chunk: int) -> float:
+    protocol = protocol_cls(NullAPI())
+    chunks = [burst[i : i + chunk] for i in range(0, len(burst), chunk)]
+
+    start = time.perf_counter()
+
+    for _ in range(reads):
+        for data in chunks:
+            protocol.data_received(data)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--frames-per-read", type=int, default=50)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--chunk", type=int, default=4096, help="USB read size")
+    args = parser.parse_args()
+
+    burst = make_burst(args.frames_per_read)
+    total = args.frames_per_read * args.reads
+
+    for name, protocol_cls in [
+        ("legacy", LegacyZnpMtProtocol),
+        ("current", ZnpMtProtocol),
+    ]:
+        elapsed = run(protocol_cls, burst, args.reads, args.chunk)
+        print(f"{name:>8}: {total / elapsed:12,.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
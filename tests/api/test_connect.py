@@ -4,10 +4,18 @@ from unittest.mock import call
 import pytest
 
 import zigpy_znp.types as t
+import zigpy_znp.config as conf
 import zigpy_znp.commands as c
 from zigpy_znp.api import ZNP
+from zigpy_znp.liveness import LinkHealth
+from zigpy_znp.probe_cache import ProbeCache
 
-from ..conftest import BaseServerZNP, CoroutineMock, config_for_port_path
+from ..conftest import (
+    BaseServerZNP,
+    CoroutineMock,
+    FormedLaunchpadCC26X2R1,
+    config_for_port_path,
+)
 
 
 async def test_connect_no_test(make_znp_server):
@@ -115,6 +123,70 @@ async def test_connect_skip_bootloader_rts_dtr_pins(make_znp_server, mocker):
     znp.close()
 
 
+async def test_connect_probe_cache(make_znp_server, mocker, tmp_path):
+    znp_server = make_znp_server(server_cls=FormedLaunchpadCC26X2R1)
+    config = conf.CONFIG_SCHEMA(
+        {
+            conf.CONF_DEVICE: {conf.CONF_DEVICE_PATH: znp_server.port_path},
+            conf.CONF_ZNP_CONFIG: {
+                conf.CONF_PROBE_CACHE_PATH: str(tmp_path / "probes.json")
+            },
+        }
+    )
+
+    # The first connection probes the radio and caches the results
+    znp = ZNP(config)
+    mocker.spy(znp, "_skip_bootloader")
+    await znp.connect()
+
+    assert znp._skip_bootloader.call_count == 1
+    probe = ProbeCache(tmp_path / "probes.json").get(znp_server.port_path)
+    assert probe.align_structs == znp.nvram.align_structs
+    assert probe.zstack_version == znp.version
+    assert probe.capabilities == znp.capabilities
+    znp.close()
+
+    # Reconnecting only checks that the radio and its firmware are the same
+    znp = ZNP(config)
+    mocker.spy(znp, "_skip_bootloader")
+    mocker.spy(znp.nvram, "determine_alignment")
+    await znp.connect()
+
+    assert znp._skip_bootloader.call_count == 0
+    assert znp.nvram.determine_alignment.call_count == 0
+    assert znp._uart._transport._mock_rts_prop.mock_calls == []
+    assert (znp.version, znp.nvram.align_structs, znp.capabilities) == (
+        probe.zstack_version,
+        probe.align_structs,
+        probe.capabilities,
+    )
+    znp.close()
+
+    # New firmware is probed again
+    znp_server.code_revision += 1
+
+    znp = ZNP(config)
+    mocker.spy(znp, "_skip_bootloader")
+    await znp.connect()
+
+    assert znp._skip_bootloader.call_count == 1
+    assert ProbeCache(tmp_path / "probes.json").get(
+        znp_server.port_path
+    ).code_revision == (znp_server.code_revision)
+    znp.close()
+
+    # Cached probes that are out of date are forgotten, even if probing fails
+    znp_server.code_revision += 1
+
+    znp = ZNP(config)
+    mocker.patch.object(znp, "_probe", side_effect=RuntimeError("Probe failed"))
+
+    with pytest.raises(RuntimeError):
+        await znp.connect()
+
+    assert ProbeCache(tmp_path / "probes.json").get(znp_server.port_path) is None
+
+
 async def test_api_close(connected_znp, mocker):
     znp, znp_server = connected_znp
     uart = znp._uart
@@ -134,12 +206,29 @@ async def test_api_close(connected_znp, mocker):
     def dict_minus(d, minus):
         return {k: v for k, v in d.items() if k not in minus}
 
-    ignored_keys = ["_sync_request_lock", "nvram"]
+    ignored_keys = [
+        "_request_scheduler",
+        "_deadlines",
+        "_request_cache",
+        "_callback_engine",
+        "_sreq_round_trips",
+        "_arsp_round_trips",
+        "_liveness",
+        "_startup_profiler",
+        "nvram",
+    ]
 
     # Closing ZNP should reset it completely to that of a fresh object
-    # We have to ignore our mocked method and the lock
+    # We have to ignore our mocked method, the request scheduler, and deadlines
     znp2 = ZNP(znp._config)
-    assert znp2._sync_request_lock.locked() == znp._sync_request_lock.locked()
+    assert len(znp2._request_scheduler) == len(znp._request_scheduler) == 0
+    assert len(znp2._deadlines) == len(znp._deadlines) == 0
+    assert len(znp2._request_cache) == len(znp._request_cache) == 0
+    assert len(znp2._callback_engine) == len(znp._callback_engine) == 0
+    assert len(znp2._sreq_round_trips) == len(znp._sreq_round_trips) == 0
+    assert len(znp2._arsp_round_trips) == len(znp._arsp_round_trips) == 0
+    assert znp2.link_health() == znp.link_health() == LinkHealth()
+    assert znp2.startup_phases() == znp.startup_phases() == []
     assert dict_minus(znp.__dict__, ignored_keys) == dict_minus(
         znp2.__dict__, ignored_keys
     )
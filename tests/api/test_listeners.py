@@ -6,6 +6,7 @@ import pytest
 import zigpy_znp.types as t
 import zigpy_znp.commands as c
 from zigpy_znp.api import OneShotResponseListener, CallbackResponseListener
+from zigpy_znp.utils import CallbackEngine, ListenerGauges, CallbackEngineCounters
 
 
 async def test_resolve(event_loop, mocker):
@@ -102,3 +103,250 @@ async def test_api_cancel_listeners(connected_znp, mocker):
     await asyncio.sleep(0.1)
 
     assert len(znp._listeners) == 0
+
+
+async def test_api_frame_received_lazy(connected_znp, mocker):
+    znp, znp_server = connected_znp
+
+    mocker.spy(znp, "_unhandled_command")
+    mocker.spy(c.ZDO.SrcRtgInd.Callback, "from_frame")
+
+    callback = mocker.Mock()
+    znp.callback_for_response(c.ZDO.SrcRtgInd.Callback(partial=True), callback)
+
+    command = c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678, 0xABCD])
+
+    # Handled commands are not parsed until the callback reads them
+    assert znp.frame_received(command.to_frame())
+    assert callback.mock_calls == [mocker.call(command)]
+    assert c.ZDO.SrcRtgInd.Callback.from_frame.call_count == 0
+
+    # Unhandled commands with fixed-size parameters are never parsed
+    assert not znp.frame_received(c.SYS.OSALTimerExpired.Callback(Id=0xAB).to_frame())
+    assert znp._unhandled_command.call_count == 1
+    assert znp._unhandled_command.mock_calls[0].args[0]._decoder is not None
+
+
+async def test_api_listener_index(connected_znp, mocker):
+    znp, znp_server = connected_znp
+
+    futures = {
+        tsn: znp.wait_for_response(c.AF.DataConfirm.Callback(partial=True, TSN=tsn))
+        for tsn in range(16)
+    }
+
+    # Listeners matching other fields are only checked when the fields match
+    mocker.spy(OneShotResponseListener, "resolve")
+    response = c.AF.DataConfirm.Callback(Status=t.Status.SUCCESS, Endpoint=1, TSN=5)
+
+    assert znp.frame_received(response.to_frame())
+    assert OneShotResponseListener.resolve.call_count == 1
+    assert (await futures.pop(5)) == response
+
+    # Every other listener is untouched
+    assert not any(f.done() for f in futures.values())
+
+    # The index is cleaned up along with the listeners
+    for future in futures.values():
+        future.cancel()
+
+    await asyncio.sleep(0)
+    assert len(znp._listeners) == 0
+
+
+async def test_api_listener_index_order(connected_znp):
+    znp, znp_server = connected_znp
+
+    # Unindexable listeners and listeners indexed by different fields are registered
+    fut1 = znp.wait_for_response(c.AF.DataConfirm.Callback(partial=True, Endpoint=1))
+    fut2 = znp.wait_for_response(c.AF.DataConfirm.Callback(partial=True, TSN=5))
+    fut3 = znp.wait_for_response(
+        c.ZDO.SrcRtgInd.Callback(partial=True, Relays=[0x1234])
+    )
+    fut4 = znp.wait_for_response(c.ZDO.SrcRtgInd.Callback(partial=True))
+
+    response1 = c.AF.DataConfirm.Callback(Status=t.Status.SUCCESS, Endpoint=1, TSN=5)
+    response2 = c.ZDO.SrcRtgInd.Callback(DstAddr=0x0000, Relays=[0x1234])
+
+    # A single response resolves only the oldest matching one-shot listener
+    for _ in range(2):
+        znp.frame_received(response1.to_frame())
+        znp.frame_received(response2.to_frame())
+        await asyncio.sleep(0)
+
+    assert (await fut1) == response1
+    assert (await fut2) == response1
+    assert (await fut3) == response2
+    assert (await fut4) == response2
+
+
+async def test_api_listener_gauges(connected_znp, mocker):
+    znp, znp_server = connected_znp
+
+    assert znp.listener_gauges() == ListenerGauges(one_shot=0, callback=0)
+
+    callback = znp.callback_for_responses(
+        [c.SYS.Ping.Rsp(partial=True), c.SYS.ResetInd.Callback(partial=True)],
+        mocker.Mock(),
+    )
+    future = znp.wait_for_responses(
+        [c.SYS.Ping.Rsp(partial=True), c.AF.DataConfirm.Callback(partial=True, TSN=1)]
+    )
+
+    assert znp.listener_gauges() == ListenerGauges(one_shot=1, callback=1)
+    assert znp.listener_gauges_by_header() == {
+        c.SYS.Ping.Rsp.header: ListenerGauges(one_shot=1, callback=1),
+        c.SYS.ResetInd.Callback.header: ListenerGauges(one_shot=0, callback=1),
+        c.AF.DataConfirm.Callback.header: ListenerGauges(one_shot=1, callback=0),
+    }
+
+    # Looking up headers without listeners does not create empty buckets
+    assert not znp.frame_received(c.SYS.OSALTimerExpired.Callback(Id=1).to_frame())
+    assert not znp._listeners[c.UTIL.TimeAlive.Rsp.header]
+    assert c.UTIL.TimeAlive.Rsp.header not in znp._listeners
+
+    future.cancel()
+    await asyncio.sleep(0)
+
+    assert znp.listener_gauges() == ListenerGauges(one_shot=0, callback=1)
+    assert znp.listener_gauges_by_header() == {
+        c.SYS.Ping.Rsp.header: ListenerGauges(one_shot=0, callback=1),
+        c.SYS.ResetInd.Callback.header: ListenerGauges(one_shot=0, callback=1),
+    }
+
+    # Removing a listener twice is harmless
+    znp.remove_listener(callback)
+    znp.remove_listener(callback)
+    assert znp.listener_gauges() == ListenerGauges(one_shot=0, callback=0)
+    assert len(znp._listeners) == 0
+
+
+async def test_api_callback_engine(connected_znp, caplog):
+    znp, znp_server = connected_znp
+
+    engine = znp._callback_engine
+    started = []
+    release = asyncio.Event()
+
+    async def callback(response):
+        started.append(response)
+        await release.wait()
+
+        if response.Capabilities == t.MTCapabilities.ZDO:
+            raise RuntimeError("Uh oh")
+
+    znp.callback_for_response(c.SYS.Ping.Rsp(partial=True), callback)
+
+    for capabilities in [t.MTCapabilities.SYS] * 9 + [t.MTCapabilities.ZDO]:
+        znp.frame_received(c.SYS.Ping.Rsp(Capabilities=capabilities).to_frame())
+
+    await asyncio.sleep(0.1)
+
+    # By default, every callback runs right away
+    assert len(started) == 10
+    assert len(engine._workers) == 10
+    assert znp.callback_engine_counters() == CallbackEngineCounters(
+        submitted=10, running=10
+    )
+
+    release.set()
+    await asyncio.sleep(0.1)
+
+    assert "Caught an exception while executing callback" in caplog.text
+    assert znp.callback_engine_counters() == CallbackEngineCounters(
+        submitted=10, completed=9, failed=1
+    )
+
+    # Idle workers are reused for later callbacks
+    workers = set(engine._workers)
+    znp.frame_received(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame())
+    await asyncio.sleep(0.1)
+
+    assert engine._workers == workers
+    assert len(started) == 11
+
+
+async def test_callback_engine_max_workers():
+    engine = CallbackEngine(max_workers=8)
+    started = []
+    release = asyncio.Event()
+
+    async def callback(i):
+        started.append(i)
+        await release.wait()
+
+    for i in range(10):
+        engine.submit(callback(i))
+
+    await asyncio.sleep(0.1)
+
+    # Only a bounded number of callbacks run at once, the rest wait their turn
+    assert started == list(range(8))
+    assert len(engine._workers) == 8
+    assert engine.counters() == CallbackEngineCounters(
+        submitted=10, queued=2, running=8
+    )
+
+    release.set()
+    await asyncio.sleep(0.1)
+
+    assert started == list(range(10))
+    assert engine.counters() == CallbackEngineCounters(submitted=10, completed=10)
+
+    engine.close()
+    await engine.wait_closed()
+
+
+async def test_api_callback_engine_close(connected_znp):
+    znp, znp_server = connected_znp
+
+    engine = znp._callback_engine
+    release = asyncio.Event()
+    finished = []
+
+    async def callback(response):
+        await release.wait()
+        finished.append(response)
+
+    znp.callback_for_response(c.SYS.Ping.Rsp(partial=True), callback)
+
+    for _ in range(10):
+        znp.frame_received(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame())
+
+    await asyncio.sleep(0.1)
+    workers = list(engine._workers)
+
+    # Running callbacks are cancelled
+    znp.close()
+    release.set()
+    await znp.wait_closed()
+
+    assert not finished
+    assert len(engine) == 0
+    assert all(worker.done() for worker in workers)
+
+
+async def test_callback_engine_close_unstarted():
+    engine = CallbackEngine(max_workers=1)
+    started = []
+
+    async def callback(i):
+        started.append(i)
+
+    engine.submit(callback(0))
+    await asyncio.sleep(0)
+    assert started == [0]
+
+    # The idle worker is woken up but is closed before it can start the callback
+    engine.submit(handed_off := callback(1))
+    engine.submit(queued := callback(2))
+    workers = list(engine._workers)
+
+    engine.close()
+    await engine.wait_closed()
+
+    assert started == [0]
+    assert handed_off.cr_frame is None
+    assert queued.cr_frame is None
+    assert all(worker.done() for worker in workers)
+    assert not engine._closing
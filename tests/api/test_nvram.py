@@ -5,6 +5,8 @@ import zigpy_znp.commands as c
 from zigpy_znp.types import nvids
 from zigpy_znp.exceptions import SecurityError
 
+from ..conftest import FormedZStack3CC2531, FormedLaunchpadCC26X2R1
+
 
 async def test_osal_writes_invalid(connected_znp):
     znp, _ = connected_znp
@@ -334,3 +336,133 @@ async def test_osal_read_unexpected_value(connected_znp, nvid, value):
 
     await length_rsp
     await read_rsp
+
+
+@pytest.mark.parametrize("device", [FormedZStack3CC2531, FormedLaunchpadCC26X2R1])
+async def test_nvram_cache(device, make_connected_znp, mocker):
+    znp, znp_server = await make_connected_znp(server_cls=device)
+    znp.nvram.cache_enabled = True
+
+    nvid = nvids.OsalNvIds.LOGICAL_TYPE
+    request = mocker.spy(znp, "request")
+
+    value = await znp.nvram.osal_read(nvid, item_type=t.DeviceLogicalType)
+    round_trips = request.call_count
+    assert round_trips >= 2
+
+    # Reading it again, even through the new NVRAM system, does not touch the radio
+    assert await znp.nvram.osal_read(nvid, item_type=t.DeviceLogicalType) == value
+
+    if device.version == 3.30:
+        assert (
+            await znp.nvram.read(
+                item_id=nvids.ExNvIds.LEGACY,
+                sub_id=nvid,
+                item_type=t.DeviceLogicalType,
+            )
+            == value
+        )
+
+    assert request.call_count == round_trips
+
+    # Writes and deletes go through the cache
+    await znp.nvram.osal_write(nvid, t.DeviceLogicalType.EndDevice)
+    request.reset_mock()
+
+    assert (
+        await znp.nvram.osal_read(nvid, item_type=t.DeviceLogicalType)
+        == t.DeviceLogicalType.EndDevice
+    )
+
+    assert await znp.nvram.osal_delete(nvid)
+
+    # Only the delete was sent
+    assert request.call_count == 2
+    assert nvid not in znp_server._nvram[nvids.ExNvIds.LEGACY]
+
+    # Missing items are not cached, they can be created by anything
+    with pytest.raises(KeyError):
+        await znp.nvram.osal_read(nvid, item_type=t.DeviceLogicalType)
+
+    assert request.call_count == 3
+
+    znp_server._nvram[nvids.ExNvIds.LEGACY][
+        nvid
+    ] = t.DeviceLogicalType.Router.serialize()
+    assert (
+        await znp.nvram.osal_read(nvid, item_type=t.DeviceLogicalType)
+        == t.DeviceLogicalType.Router
+    )
+
+    # Items that Z-Stack changes on its own are never cached
+    request.reset_mock()
+    await znp.nvram.osal_read(nvids.OsalNvIds.NIB, item_type=t.NIB)
+    await znp.nvram.osal_read(nvids.OsalNvIds.NIB, item_type=t.NIB)
+    assert request.call_count >= 4
+
+    counters = znp.nvram.cache_counters()
+    assert counters.misses == 3
+    assert counters.hits == (3 if device.version == 3.30 else 2)
+    assert counters.round_trips_saved > round_trips
+
+    znp.close()
+
+
+async def test_nvram_cache_set_ext_addr(make_connected_znp, mocker):
+    znp, znp_server = await make_connected_znp(server_cls=FormedLaunchpadCC26X2R1)
+    znp.nvram.cache_enabled = True
+
+    new_ieee = t.EUI64.convert("77:66:55:44:33:22:11:00")
+
+    def set_ext_addr(req):
+        znp_server._nvram[nvids.ExNvIds.LEGACY][
+            nvids.OsalNvIds.EXTADDR
+        ] = req.ExtAddr.serialize()
+        return c.SYS.SetExtAddr.Rsp(Status=t.Status.SUCCESS)
+
+    znp_server.reply_to(c.SYS.SetExtAddr.Req(partial=True), responses=[set_ext_addr])
+
+    ieee = await znp.nvram.osal_read(nvids.OsalNvIds.EXTADDR, item_type=t.EUI64)
+    assert ieee != new_ieee
+
+    # The IEEE address is changed without going through the NVRAM helper
+    await znp.request(c.SYS.SetExtAddr.Req(ExtAddr=new_ieee))
+
+    assert (
+        await znp.nvram.osal_read(nvids.OsalNvIds.EXTADDR, item_type=t.EUI64)
+        == new_ieee
+    )
+    assert znp.nvram.cache_counters().invalidations == 1
+
+    znp.close()
+
+
+async def test_nvram_cache_reset(make_connected_znp, mocker):
+    znp, znp_server = await make_connected_znp(server_cls=FormedLaunchpadCC26X2R1)
+    znp.nvram.cache_enabled = True
+
+    ieee = await znp.nvram.osal_read(nvids.OsalNvIds.EXTADDR, item_type=t.EUI64)
+    await znp.nvram.osal_read(nvids.OsalNvIds.LOGICAL_TYPE, item_type=t.uint8_t)
+
+    # Z-Stack rewrites some items when it starts
+    await znp.reset()
+
+    request = mocker.spy(znp, "request")
+    await znp.nvram.osal_read(nvids.OsalNvIds.LOGICAL_TYPE, item_type=t.uint8_t)
+    assert request.call_count == 0
+
+    assert await znp.nvram.osal_read(nvids.OsalNvIds.EXTADDR, item_type=t.EUI64) == ieee
+    assert request.call_count > 0
+    assert znp.nvram.cache_counters().invalidations == 1
+
+    # Clearing the config on startup drops everything
+    await znp.nvram.osal_write(
+        nvids.OsalNvIds.STARTUP_OPTION, t.StartupOptions.ClearConfig
+    )
+    await znp.reset()
+
+    request.reset_mock()
+    await znp.nvram.osal_read(nvids.OsalNvIds.LOGICAL_TYPE, item_type=t.uint8_t)
+    assert request.call_count > 0
+
+    znp.close()
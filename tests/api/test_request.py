@@ -7,8 +7,14 @@ import async_timeout
 import zigpy_znp.types as t
 import zigpy_znp.config as conf
 import zigpy_znp.commands as c
-from zigpy_znp.frames import GeneralFrame
-from zigpy_znp.exceptions import CommandNotRecognized, InvalidCommandResponse
+from zigpy_znp.frames import GeneralFrame, TransportFrame
+from zigpy_znp.scheduler import PriorityClass
+from zigpy_znp.exceptions import (
+    RequestExpired,
+    CommandNotRecognized,
+    InvalidCommandResponse,
+)
+from zigpy_znp.types.nvids import OsalNvIds
 
 
 async def test_callback_rsp(connected_znp, event_loop):
@@ -320,6 +326,48 @@ async def test_handling_unknown_bad_command_parsing(connected_znp):
         znp.frame_received(bad_frame)
 
 
+async def test_handling_truncated_response(connected_znp):
+    znp, _ = connected_znp
+
+    ping_rsp = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS)
+    listener = znp.wait_for_response(c.SYS.Ping.Rsp(partial=True))
+
+    # Truncated frames are rejected when received, not when a listener parses them
+    with pytest.raises(ValueError):
+        znp.frame_received(GeneralFrame(ping_rsp.header, ping_rsp.to_frame().data[:1]))
+
+    assert not listener.done()
+
+    znp.frame_received(ping_rsp.to_frame())
+    assert (await listener) == ping_rsp
+
+
+async def test_handling_corrupt_variable_length_frame(connected_znp, caplog):
+    znp, _ = connected_znp
+
+    src_rtg = c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678, 0xABCD])
+    listener = znp.wait_for_response(c.ZDO.SrcRtgInd.Callback(partial=True))
+
+    # Frames whose length prefixes do not match are rejected before any listener
+    with pytest.raises(ValueError):
+        znp.frame_received(GeneralFrame(src_rtg.header, src_rtg.to_frame().data[:-1]))
+
+    assert not listener.done()
+
+    znp.frame_received(src_rtg.to_frame())
+    assert (await listener) == src_rtg
+
+    # Known broken commands are only logged even when something is listening for them
+    znp.callback_for_response(c.ZDO.ParentAnnceRsp.Callback(partial=True), print)
+
+    caplog.set_level(logging.WARNING)
+    znp.frame_received(
+        GeneralFrame(c.ZDO.ParentAnnceRsp.Callback.header, b"\x13\xDB\x84\x01\x21")
+    )
+
+    assert caplog.records[-1].levelname == "WARNING"
+
+
 async def test_send_failure_when_disconnected(connected_znp):
     znp, _ = connected_znp
     znp._uart = None
@@ -328,3 +376,645 @@ async def test_send_failure_when_disconnected(connected_znp):
         await znp.request(c.SYS.Ping.Req())
 
     assert "Coordinator is disconnected" in str(e.value)
+
+
+async def test_request_pipelining(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+
+    def sent():
+        return [
+            c.COMMANDS_BY_ID[frame.payload.header].from_frame(frame.payload)
+            for call in write.mock_calls
+            for frame in [TransportFrame.deserialize(call.args[0])[0]]
+        ]
+
+    time_alive = asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req()))
+    await asyncio.sleep(0)
+
+    version = asyncio.create_task(znp.request(c.SYS.Version.Req()))
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0)
+
+    # Only a single SREQ is outstanding
+    assert sent() == [c.UTIL.TimeAlive.Req()]
+    assert len(znp._request_scheduler) == 3
+
+    # The next SREQ is sent as soon as the SRSP is received, by priority
+    znp.frame_received(c.UTIL.TimeAlive.Rsp(Seconds=123).to_frame())
+    assert sent() == [c.UTIL.TimeAlive.Req(), c.SYS.Ping.Req()]
+
+    # Requests cancelled while they are queued are never sent
+    version.cancel()
+
+    znp.frame_received(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame())
+    assert sent() == [c.UTIL.TimeAlive.Req(), c.SYS.Ping.Req()]
+
+    assert (await time_alive).Seconds == 123
+    assert (await ping).Capabilities == t.MTCapabilities.SYS
+
+    with pytest.raises(asyncio.CancelledError):
+        await version
+
+    assert len(znp._request_scheduler) == 0
+    assert not any(znp._listeners.values())
+
+
+async def test_request_timeout_sends_next(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+
+    time_alive = asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req(), timeout=0.1))
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0)
+
+    assert write.call_count == 1
+
+    # The radio is freed up once the outstanding SREQ times out
+    with pytest.raises(asyncio.TimeoutError):
+        await time_alive
+
+    assert write.call_count == 2
+
+    ping.cancel()
+    await asyncio.gather(ping, return_exceptions=True)
+
+
+async def test_request_backpressure(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+
+    znp._uart.pause_writing()
+
+    # Every request waits for the transport, not just the ones that skip the queue
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0.01)
+
+    assert write.call_count == 0
+    assert len(znp._request_scheduler) == 0
+
+    znp._uart.resume_writing()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert write.call_count == 1
+
+    znp.frame_received(c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame())
+    assert (await ping).Capabilities == t.MTCapabilities.SYS
+
+
+async def test_request_priority_classes(connected_znp):
+    znp, _ = connected_znp
+
+    # Nothing is sent while the radio is busy with the first request
+    tasks = [asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req()))]
+    await asyncio.sleep(0)
+
+    for priority_class in [PriorityClass.BULK] * 8 + [PriorityClass.MAINTENANCE] * 8:
+        tasks.append(
+            asyncio.create_task(
+                znp.request(c.UTIL.TimeAlive.Req(), priority_class=priority_class)
+            )
+        )
+
+    await asyncio.sleep(0)
+
+    tasks.append(
+        asyncio.create_task(
+            znp.request(
+                c.UTIL.TimeAlive.Req(), priority_class=PriorityClass.INTERACTIVE
+            )
+        )
+    )
+    await asyncio.sleep(0)
+
+    order = [
+        entry.priority_class for *_, entry in sorted(znp._request_scheduler._queue)
+    ]
+
+    # Interactive requests skip the backlog, only the head of each class is before it
+    assert order.index(PriorityClass.INTERACTIVE) == 2
+
+    # Backlogged classes share the radio according to their weights, without starving
+    assert order[:13].count(PriorityClass.BULK) == 8
+    assert order[:13].count(PriorityClass.MAINTENANCE) == 4
+
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_request_deadline(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+    loop = asyncio.get_running_loop()
+
+    # Requests that expire while the radio is busy are never sent
+    busy = asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req()))
+    await asyncio.sleep(0)
+
+    with pytest.raises(RequestExpired):
+        await znp.request(c.SYS.Ping.Req(), deadline=loop.time() + 0.05)
+
+    with pytest.raises(RequestExpired):
+        await znp.request(c.SYS.Ping.Req(), deadline=loop.time() - 1)
+
+    assert write.call_count == 1
+    assert len(znp._request_scheduler) == 1
+
+    busy.cancel()
+    await asyncio.gather(busy, return_exceptions=True)
+
+
+async def test_callback_rsp_unsent_dropped(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+
+    busy = asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req()))
+    await asyncio.sleep(0)
+
+    # Requests that are kept alive for late responses are dropped if they were never
+    # sent, since there is nothing to be late
+    with pytest.raises(asyncio.TimeoutError):
+        await znp.request_callback_rsp(
+            request=c.SYS.Ping.Req(),
+            callback=c.SYS.ResetInd.Callback(partial=True),
+            wait_timeout=0.05,
+        )
+
+    busy.cancel()
+    await asyncio.gather(busy, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert write.call_count == 1
+    assert not any(znp._listeners.values())
+
+
+async def test_request_adaptive_timeout(connected_znp):
+    znp, znp_server = connected_znp
+    znp._config[conf.CONF_ZNP_CONFIG][conf.CONF_MIN_SREQ_TIMEOUT] = 0.05
+    znp._config[conf.CONF_ZNP_CONFIG][conf.CONF_SREQ_TIMEOUT] = 0.2
+
+    ping_header = c.SYS.Ping.Req.header
+
+    # Until the radio has responded, the configured timeout is used
+    assert znp.sreq_timeout(c.SYS.Ping.Req()) == 0.2
+
+    ping_rsp = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS)
+    znp_server.reply_to(c.SYS.Ping.Req(), responses=[ping_rsp], override=True)
+
+    for _ in range(5):
+        await znp.request(c.SYS.Ping.Req())
+
+    assert znp.sreq_round_trips()[ping_header].samples == 5
+    assert znp.sreq_timeout(c.SYS.Ping.Req()) == 0.05
+    assert znp.link_health().slow_sreqs == 0
+
+    # A radio that stops responding is noticed as slow almost immediately but requests
+    # only fail after the configured timeout
+    znp_server.reply_to(c.SYS.Ping.Req(), responses=[], override=True)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+
+    await asyncio.sleep(0.1)
+    assert znp.link_health().slow_sreqs == 1
+    assert not ping.done()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await ping
+
+    assert loop.time() - start >= 0.19
+    assert znp.link_health().consecutive_sreq_timeouts == 1
+    assert znp.sreq_round_trips()[ping_header].backoff == 1
+    assert znp.sreq_timeout(c.SYS.Ping.Req()) >= 0.05
+
+
+async def test_request_adaptive_timeout_slow_nvram_write(connected_znp, mocker):
+    znp, znp_server = connected_znp
+    znp._config[conf.CONF_ZNP_CONFIG][conf.CONF_MIN_SREQ_TIMEOUT] = 0.05
+    znp._config[conf.CONF_ZNP_CONFIG][conf.CONF_SREQ_TIMEOUT] = 0.5
+
+    write_req = c.SYS.OSALNVWriteExt.Req(
+        Id=OsalNvIds.STARTUP_OPTION, Offset=0, Value=b"\x00"
+    )
+    write_rsp = c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)
+    znp_server.reply_to(write_req, responses=[write_rsp], override=True)
+
+    for _ in range(5):
+        await znp.request(write_req)
+
+    assert znp.sreq_timeout(write_req) == 0.05
+
+    # The radio compacts its NVRAM and answers after the adaptive timeout
+    znp_server.reply_to(write_req, responses=[], override=True)
+    write = mocker.spy(znp._uart, "write")
+
+    nv_write = asyncio.create_task(znp.request(write_req, RspStatus=t.Status.SUCCESS))
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0.2)
+
+    # The write is still outstanding, so nothing else has been sent
+    assert not nv_write.done()
+    assert write.call_count == 1
+    assert znp.link_health().slow_sreqs == 1
+
+    znp.frame_received(write_rsp.to_frame())
+    assert (await nv_write) == write_rsp
+
+    # A slow response is not a timeout and is taken into account for the estimate
+    assert znp.link_health().consecutive_sreq_timeouts == 0
+    assert znp.sreq_timeout(write_req) > 0.05
+
+    await asyncio.sleep(0)
+    assert write.call_count == 2
+
+    ping.cancel()
+    await asyncio.gather(ping, return_exceptions=True)
+
+
+async def test_callback_rsp_adaptive_timeout(connected_znp):
+    znp, znp_server = connected_znp
+
+    request = c.AF.DataRequest.Req(
+        DstAddr=0x1234,
+        DstEndpoint=56,
+        SrcEndpoint=78,
+        ClusterId=90,
+        TSN=1,
+        Options=c.af.TransmitOptions.NONE,
+        Radius=30,
+        Data=b"hi",
+    )
+    callback = c.AF.DataConfirm.Callback(partial=True, TSN=1)
+
+    znp_server.reply_to(
+        request,
+        responses=[
+            c.AF.DataRequest.Rsp(Status=t.Status.SUCCESS),
+            c.AF.DataConfirm.Callback(Endpoint=56, TSN=1, Status=t.Status.SUCCESS),
+        ],
+    )
+
+    await znp.request_callback_rsp(
+        request=request, RspStatus=t.Status.SUCCESS, callback=callback
+    )
+
+    stats = znp.arsp_round_trips()[request.header, callback.header]
+    assert stats.samples == 1
+
+    # Estimates are bounded by the configured minimum
+    assert znp.arsp_timeout(request, callback) == 5
+
+
+async def test_close_fails_queued_requests(connected_znp):
+    znp, _ = connected_znp
+
+    time_alive = asyncio.create_task(znp.request(c.UTIL.TimeAlive.Req()))
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0)
+
+    znp.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await time_alive
+
+    with pytest.raises(RuntimeError) as e:
+        await ping
+
+    assert "Coordinator is disconnected" in str(e.value)
+
+
+async def test_request_many(connected_znp):
+    znp, znp_server = connected_znp
+
+    write_req = c.SYS.OSALNVWriteExt.Req(Id=0x0001, Offset=0, Value=b"test")
+    write_rsp = znp_server.reply_to(
+        c.SYS.OSALNVWriteExt.Req(partial=True),
+        responses=[c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)],
+    )
+
+    responses = await znp.request_many(
+        [write_req.replace(Offset=offset) for offset in range(5)],
+        RspStatus=t.Status.SUCCESS,
+    )
+
+    assert responses == [c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)] * 5
+    assert write_rsp.call_count == 5
+    assert len(znp._request_scheduler) == 0
+    assert not any(znp._listeners.values())
+
+
+@pytest.mark.parametrize("stop_on_error", [True, False])
+async def test_request_many_errors(stop_on_error, connected_znp):
+    znp, znp_server = connected_znp
+
+    def write_replier(req):
+        if req.Offset == 1:
+            return c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.NV_OPER_FAILED)
+
+        return c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)
+
+    write_rsp = znp_server.reply_to(
+        c.SYS.OSALNVWriteExt.Req(partial=True), responses=write_replier
+    )
+
+    requests = [
+        c.SYS.OSALNVWriteExt.Req(Id=0x0001, Offset=offset, Value=b"test")
+        for offset in range(3)
+    ]
+
+    if stop_on_error:
+        # Requests after the first failure are never sent
+        with pytest.raises(InvalidCommandResponse):
+            await znp.request_many(requests, RspStatus=t.Status.SUCCESS)
+
+        await asyncio.sleep(0.1)
+        assert write_rsp.call_count == 2
+    else:
+        responses = await znp.request_many(
+            requests, stop_on_error=False, RspStatus=t.Status.SUCCESS
+        )
+
+        assert responses[0] == c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)
+        assert isinstance(responses[1], InvalidCommandResponse)
+        assert responses[2] == c.SYS.OSALNVWriteExt.Rsp(Status=t.Status.SUCCESS)
+        assert write_rsp.call_count == 3
+
+    assert len(znp._request_scheduler) == 0
+
+
+async def test_iter_requests_close(connected_znp):
+    znp, znp_server = connected_znp
+
+    ping_rsp = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS)
+    ping = znp_server.reply_to(c.SYS.Ping.Req(), responses=[ping_rsp])
+
+    responses = znp.iter_requests([c.SYS.Ping.Req()] * 10)
+
+    assert await responses.__anext__() == ping_rsp
+    await responses.aclose()
+
+    # Requests that were not sent are cancelled when the iterator is closed
+    await asyncio.sleep(0.1)
+    assert ping.call_count <= 2
+    assert len(znp._request_scheduler) == 0
+
+
+async def test_request_coalescing(connected_znp):
+    znp, znp_server = connected_znp
+
+    device_info_rsp = c.UTIL.GetDeviceInfo.Rsp(
+        Status=t.Status.SUCCESS,
+        IEEE=t.EUI64.convert("00:11:22:33:44:55:66:77"),
+        NWK=0x0000,
+        DeviceType=t.DeviceTypeCapabilities(7),
+        DeviceState=t.DeviceState.StartedAsCoordinator,
+        AssociatedDevices=[],
+    )
+    device_info = znp_server.reply_to(
+        c.UTIL.GetDeviceInfo.Req(), responses=[device_info_rsp]
+    )
+
+    # Identical requests sent concurrently share a single exchange with the radio
+    responses = await asyncio.gather(
+        *[znp.request(c.UTIL.GetDeviceInfo.Req()) for _ in range(5)]
+    )
+
+    assert responses == [device_info_rsp] * 5
+    assert device_info.call_count == 1
+
+    # Their responses are not cached
+    assert (await znp.request(c.UTIL.GetDeviceInfo.Req())) == device_info_rsp
+    assert device_info.call_count == 2
+
+    counters = znp.request_cache_counters()[c.UTIL.GetDeviceInfo.Req.header]
+    assert counters.misses == 2
+    assert counters.coalesced == 4
+    assert counters.hits == 0
+    assert len(znp._request_cache) == 0
+
+
+async def test_request_coalescing_write_between(connected_znp):
+    znp, znp_server = connected_znp
+
+    # Hold up the radio so that everything after this is queued
+    znp_server.reply_to(c.SYS.Ping.Req(), responses=[], override=True)
+    blocker = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0)
+
+    nv_length = znp_server.reply_to(
+        c.SYS.OSALNVLength.Req(Id=0x0021),
+        responses=[c.SYS.OSALNVLength.Rsp(ItemLen=0)],
+    )
+    znp_server.reply_to(
+        c.SYS.OSALNVItemInit.Req(Id=0x0021, ItemLen=8, Value=b"\x00" * 8),
+        responses=[c.SYS.OSALNVItemInit.Rsp(Status=t.Status.NV_ITEM_UNINIT)],
+    )
+
+    before = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    create = asyncio.create_task(
+        znp.request(c.SYS.OSALNVItemInit.Req(Id=0x0021, ItemLen=8, Value=b"\x00" * 8))
+    )
+    after = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    await asyncio.sleep(0)
+
+    # A read queued after a write cannot share the response of one queued before it
+    assert len(znp._request_scheduler) == 4
+
+    blocker.cancel()
+    await asyncio.gather(before, create, after)
+    assert nv_length.call_count == 2
+
+    counters = znp.request_cache_counters()[c.SYS.OSALNVLength.Req.header]
+    assert counters.coalesced == 0
+
+
+async def test_request_coalescing_options(connected_znp):
+    znp, znp_server = connected_znp
+
+    nv_length = znp_server.reply_to(
+        c.SYS.OSALNVLength.Req(Id=0x0021),
+        responses=[c.SYS.OSALNVLength.Rsp(ItemLen=8)],
+    )
+
+    # Requests are only shared by callers that want them sent the same way
+    await asyncio.gather(
+        znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)),
+        znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)),
+        znp.request(
+            c.SYS.OSALNVLength.Req(Id=0x0021),
+            priority_class=PriorityClass.INTERACTIVE,
+        ),
+        znp.request(c.SYS.OSALNVLength.Req(Id=0x0021), timeout=5),
+    )
+
+    assert nv_length.call_count == 3
+
+    counters = znp.request_cache_counters()[c.SYS.OSALNVLength.Req.header]
+    assert counters.coalesced == 1
+
+
+async def test_request_coalescing_cancel(connected_znp):
+    znp, znp_server = connected_znp
+
+    ping_rsp = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS)
+    znp_server.reply_to(c.SYS.Ping.Req(), responses=[ping_rsp])
+
+    nv_length_rsp = c.SYS.OSALNVLength.Rsp(ItemLen=8)
+    nv_length = znp_server.reply_to(
+        c.SYS.OSALNVLength.Req(Id=0x0021), responses=[nv_length_rsp]
+    )
+
+    ping = asyncio.create_task(znp.request(c.SYS.Ping.Req()))
+    await asyncio.sleep(0)
+
+    first = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    second = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    await asyncio.sleep(0)
+
+    # Cancelling one caller does not cancel the request for the others
+    first.cancel()
+    assert (await second) == nv_length_rsp
+    assert nv_length.call_count == 1
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # Once every caller is cancelled, the queued request is never sent
+    znp_server.reply_to(c.SYS.Ping.Req(), responses=[], override=True)
+    blocker = asyncio.create_task(znp.request(c.SYS.Ping.Req(), timeout=0.5))
+    await asyncio.sleep(0)
+
+    third = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    fourth = asyncio.create_task(znp.request(c.SYS.OSALNVLength.Req(Id=0x0021)))
+    await asyncio.sleep(0)
+
+    third.cancel()
+    fourth.cancel()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await blocker
+
+    await asyncio.sleep(0.1)
+    assert nv_length.call_count == 1
+
+    await ping
+    assert len(znp._request_scheduler) == 0
+
+
+async def test_request_cache(connected_znp):
+    znp, znp_server = connected_znp
+
+    version_rsp = c.SYS.Version.Rsp(
+        TransportRev=2,
+        ProductId=1,
+        MajorRel=2,
+        MinorRel=7,
+        MaintRel=1,
+        CodeRevision=20200805,
+        BootloaderBuildType=c.sys.BootloaderBuildType.NON_BOOTLOADER_BUILD,
+        BootloaderRevision=0xFFFFFFFF,
+    )
+    version = znp_server.reply_to(
+        c.SYS.Version.Req(), responses=[version_rsp], override=True
+    )
+
+    # Responses are reused until the radio resets
+    assert (await znp.request(c.SYS.Version.Req())) == version_rsp
+    assert (await znp.request(c.SYS.Version.Req())) == version_rsp
+    assert version.call_count == 1
+    assert len(znp._request_cache) == 1
+
+    znp.frame_received(
+        c.SYS.ResetInd.Callback(
+            Reason=t.ResetReason.PowerUp,
+            TransportRev=2,
+            ProductId=1,
+            MajorRel=2,
+            MinorRel=7,
+            MaintRel=1,
+        ).to_frame()
+    )
+    assert len(znp._request_cache) == 0
+
+    assert (await znp.request(c.SYS.Version.Req())) == version_rsp
+    assert version.call_count == 2
+
+    counters = znp.request_cache_counters()[c.SYS.Version.Req.header]
+    assert counters.hits == 1
+    assert counters.misses == 2
+    assert counters.invalidations == 1
+
+
+async def test_request_cache_reset_in_flight(connected_znp, mocker):
+    znp, _ = connected_znp
+    write = mocker.spy(znp._uart, "write")
+
+    version_rsp = c.SYS.Version.Rsp(
+        TransportRev=2,
+        ProductId=1,
+        MajorRel=2,
+        MinorRel=7,
+        MaintRel=1,
+        CodeRevision=20200805,
+        BootloaderBuildType=c.sys.BootloaderBuildType.NON_BOOTLOADER_BUILD,
+        BootloaderRevision=0xFFFFFFFF,
+    )
+
+    first = asyncio.create_task(znp.request(c.SYS.Version.Req()))
+    await asyncio.sleep(0)
+
+    znp.frame_received(
+        c.SYS.ResetInd.Callback(
+            Reason=t.ResetReason.PowerUp,
+            TransportRev=2,
+            ProductId=1,
+            MajorRel=2,
+            MinorRel=7,
+            MaintRel=1,
+        ).to_frame()
+    )
+
+    # A request sent after the reset does not join the one sent before it
+    second = asyncio.create_task(znp.request(c.SYS.Version.Req()))
+    await asyncio.sleep(0)
+
+    # The request in flight still receives its response, which is not cached
+    znp.frame_received(version_rsp.to_frame())
+    assert (await first) == version_rsp
+    assert not second.done()
+    assert len(znp._request_cache) == 0
+    assert write.call_count == 2
+
+    znp.frame_received(version_rsp.to_frame())
+    assert (await second) == version_rsp
+    assert len(znp._request_cache) == 1
+
+
+async def test_request_cache_invalidation(connected_znp):
+    znp, znp_server = connected_znp
+
+    ieee = t.EUI64.convert("00:11:22:33:44:55:66:77")
+    new_ieee = t.EUI64.convert("77:66:55:44:33:22:11:00")
+
+    ext_addr = znp_server.reply_to(
+        c.SYS.GetExtAddr.Req(), responses=[c.SYS.GetExtAddr.Rsp(ExtAddr=ieee)]
+    )
+    znp_server.reply_to(
+        c.SYS.SetExtAddr.Req(ExtAddr=new_ieee),
+        responses=[c.SYS.SetExtAddr.Rsp(Status=t.Status.SUCCESS)],
+    )
+
+    assert (await znp.request(c.SYS.GetExtAddr.Req())).ExtAddr == ieee
+    assert (await znp.request(c.SYS.GetExtAddr.Req())).ExtAddr == ieee
+    assert ext_addr.call_count == 1
+
+    # Writes drop the cached responses of the requests they affect
+    await znp.request(c.SYS.SetExtAddr.Req(ExtAddr=new_ieee))
+    assert len(znp._request_cache) == 0
+
+    await znp.request(c.SYS.GetExtAddr.Req())
+    assert ext_addr.call_count == 2
@@ -3,8 +3,12 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+import zigpy_znp.types as t
 import zigpy_znp.config as conf
+import zigpy_znp.commands as c
 from zigpy_znp.uart import connect as uart_connect
+from zigpy_znp.frames import TransportFrame
+from zigpy_znp.exceptions import LinkDegraded
 from zigpy_znp.zigbee.application import ControllerApplication
 
 from ..conftest import FORMED_DEVICES, FormedLaunchpadCC26X2R1
@@ -213,3 +217,167 @@ async def test_watchdog(device, make_application):
     assert len(app._watchdog_feed.mock_calls) >= 5
 
     await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_watchdog_skips_busy_link(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_ZNP_CONFIG: {conf.CONF_WATCHDOG_QUIET_PERIOD: 0.2}},
+    )
+    await app.startup(auto_form=False)
+
+    ping = znp_server.reply_to(
+        c.SYS.Ping.Req(),
+        responses=[c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS)],
+        override=True,
+    )
+
+    # The radio has just responded to startup requests so it is not pinged
+    await app._watchdog_feed()
+    assert ping.call_count == 0
+
+    # Once it has been quiet for long enough, it is
+    await asyncio.sleep(0.3)
+    await app._watchdog_feed()
+    assert ping.call_count == 1
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_hot_attach(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_ZNP_CONFIG: {conf.CONF_HOT_ATTACH: True}},
+    )
+    await app.startup(auto_form=False)
+
+    register = znp_server.reply_to(
+        c.AF.Register.Req(partial=True),
+        responses=[c.AF.Register.Rsp(Status=t.Status.SUCCESS)],
+    )
+
+    mocker.spy(app._znp, "reset")
+    mocker.spy(app._znp, "start_network")
+
+    # The radio is already running our network with our endpoints
+    await app.start_network()
+
+    assert app._znp.reset.call_count == 0
+    assert app._znp.start_network.call_count == 0
+    assert register.call_count == 0
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_hot_attach_changed_endpoint(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_ZNP_CONFIG: {conf.CONF_HOT_ATTACH: True}},
+    )
+    await app.startup(auto_form=False)
+
+    # Endpoint 1 was registered differently by someone else
+    ep = next(ep for ep in znp_server.active_endpoints if ep.Endpoint == 1)
+    znp_server.active_endpoints.remove(ep)
+    znp_server.active_endpoints.append(ep.replace(InputClusters=[]))
+
+    mocker.spy(app._znp, "reset")
+
+    await app.start_network()
+
+    # It is replaced with ours
+    assert app._znp.reset.call_count == 0
+    assert [e for e in znp_server.active_endpoints if e.Endpoint == 1] == [ep]
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_hot_attach_different_network(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_ZNP_CONFIG: {conf.CONF_HOT_ATTACH: True}},
+    )
+    await app.startup(auto_form=False)
+
+    # The radio was moved to another channel behind our back
+    nib = znp_server.nib
+    nib.nwkLogicalChannel = 26 if nib.nwkLogicalChannel != 26 else 25
+    znp_server.nib = nib
+
+    mocker.spy(app._znp, "reset")
+    mocker.spy(app._znp, "start_network")
+
+    await app.start_network()
+
+    assert app._znp.reset.call_count == 1
+    assert app._znp.start_network.call_count == 1
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_liveness_sreq_timeouts(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={
+            conf.CONF_ZNP_CONFIG: {
+                conf.CONF_SREQ_TIMEOUT: 0.1,
+                conf.CONF_MIN_SREQ_TIMEOUT: 0.1,
+            }
+        },
+    )
+    await app.startup(auto_form=False)
+
+    mocker.patch.object(app, "connection_lost")
+    znp_server.reply_to(c.UTIL.TimeAlive.Req(), responses=[], override=True)
+
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await app._znp.request(c.UTIL.TimeAlive.Req())
+
+    assert app._znp.link_health().consecutive_sreq_timeouts == 2
+    assert app.connection_lost.call_count == 0
+
+    # The third unanswered request in a row is treated as a lost connection
+    with pytest.raises(asyncio.TimeoutError):
+        await app._znp.request(c.UTIL.TimeAlive.Req())
+
+    assert app.connection_lost.call_count == 1
+    assert isinstance(app.connection_lost.mock_calls[0].args[0], LinkDegraded)
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_liveness_uart_errors(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_ZNP_CONFIG: {conf.CONF_MAX_UART_ERRORS: 3}},
+    )
+    await app.startup(auto_form=False)
+
+    mocker.patch.object(app, "connection_lost")
+
+    frame = TransportFrame(
+        c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame()
+    ).serialize()
+
+    # Frames with a bad checksum
+    for _ in range(2):
+        app._znp._uart.data_received(frame[:-1] + bytes([frame[-1] ^ 0xFF]))
+
+    assert app._znp.link_health().checksum_errors == 2
+    assert app.connection_lost.call_count == 0
+
+    # Garbage on the line
+    app._znp._uart.data_received(b"\x00\x00\x00\x00\x00")
+
+    assert app._znp.link_health().resyncs == 1
+    assert app.connection_lost.call_count == 1
+    assert isinstance(app.connection_lost.mock_calls[0].args[0], LinkDegraded)
+
+    await app.shutdown()
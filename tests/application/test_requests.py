@@ -1,4 +1,5 @@
 import asyncio
+import datetime
 
 import pytest
 import zigpy.types as zigpy_t
@@ -10,7 +11,8 @@ from zigpy.exceptions import DeliveryError
 import zigpy_znp.types as t
 import zigpy_znp.config as conf
 import zigpy_znp.commands as c
-from zigpy_znp.exceptions import InvalidCommandResponse
+from zigpy_znp.scheduler import PriorityClass
+from zigpy_znp.exceptions import RequestExpired, InvalidCommandResponse
 
 from ..conftest import (
     FORMED_DEVICES,
@@ -1042,3 +1044,178 @@ async def test_send_packet_failure_disconnected(device, make_application, mocker
     assert "Coordinator is disconnected" in str(excinfo.value)
 
     await app.shutdown()
+
+
+def make_test_packet(**kwargs) -> zigpy_t.ZigbeePacket:
+    return zigpy_t.ZigbeePacket(
+        **{
+            "src": zigpy_t.AddrModeAddress(
+                addr_mode=zigpy_t.AddrMode.NWK, address=0x0000
+            ),
+            "src_ep": 0x01,
+            "dst": zigpy_t.AddrModeAddress(
+                addr_mode=zigpy_t.AddrMode.NWK, address=0xEEFF
+            ),
+            "dst_ep": 0x01,
+            "tsn": 0xDE,
+            "profile_id": 0x0104,
+            "cluster_id": 0x0006,
+            "data": zigpy_t.SerializableBytes(b"\x01\xDE\x02"),
+            **kwargs,
+        }
+    )
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_send_packet_expired_stale(device, make_application):
+    app, znp_server = make_application(server_cls=device)
+    await app.startup(auto_form=False)
+
+    data_req = znp_server.reply_to(
+        request=c.AF.DataRequestExt.Req(partial=True), responses=[]
+    )
+
+    # A packet created long ago is never sent
+    packet = make_test_packet(
+        timestamp=datetime.datetime.now(datetime.timezone.utc)
+        - datetime.timedelta(hours=1)
+    )
+
+    with pytest.raises(RequestExpired):
+        await app.send_packet(packet)
+
+    assert data_req.call_count == 0
+    assert app.state.counters["Expired_Packets"]["admission"] == 1
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_send_packet_expired_admission(device, make_application, mocker):
+    app, znp_server = make_application(
+        server_cls=device,
+        client_config={conf.CONF_MAX_CONCURRENT_REQUESTS: 1},
+    )
+    await app.startup(auto_form=False)
+
+    mocker.patch("zigpy_znp.zigbee.application.PACKET_TTL", 0.1)
+
+    data_req = znp_server.reply_to(
+        request=c.AF.DataRequestExt.Req(partial=True), responses=[]
+    )
+
+    # Packets waiting for a concurrency slot expire while they wait
+    await app._concurrent_requests_semaphore.acquire()
+
+    with pytest.raises(RequestExpired):
+        await app.send_packet(make_test_packet())
+
+    app._concurrent_requests_semaphore.release()
+
+    assert data_req.call_count == 0
+    assert app.state.counters["Expired_Packets"]["admission"] == 1
+    assert not app._concurrent_requests_semaphore.locked()
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_send_packet_expired_queue(device, make_application, mocker):
+    app, znp_server = make_application(server_cls=device)
+    await app.startup(auto_form=False)
+
+    mocker.patch("zigpy_znp.zigbee.application.PACKET_TTL", 0.1)
+
+    data_req = znp_server.reply_to(
+        request=c.AF.DataRequestExt.Req(partial=True), responses=[]
+    )
+
+    # The radio is busy with a request that it will never respond to
+    znp_server.reply_to(request=c.UTIL.TimeAlive.Req(), responses=[])
+    busy = asyncio.create_task(app._znp.request(c.UTIL.TimeAlive.Req()))
+    await asyncio.sleep(0)
+
+    with pytest.raises(RequestExpired):
+        await app.send_packet(make_test_packet())
+
+    assert data_req.call_count == 0
+    assert app.state.counters["Expired_Packets"]["queue"] == 1
+
+    busy.cancel()
+    await asyncio.gather(busy, return_exceptions=True)
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_send_packet_expired_retry(device, make_application, mocker):
+    app, znp_server = make_application(server_cls=device)
+    await app.startup(auto_form=False)
+
+    mocker.patch("zigpy_znp.zigbee.application.PACKET_TTL", 0.2)
+    mocker.patch("zigpy_znp.zigbee.application.REQUEST_ERROR_RETRY_DELAY", 0.1)
+
+    data_req = znp_server.reply_to(
+        request=c.AF.DataRequestExt.Req(partial=True),
+        responses=[
+            c.AF.DataRequestExt.Rsp(Status=t.Status.SUCCESS),
+            c.AF.DataConfirm.Callback(
+                Status=t.Status.MAC_CHANNEL_ACCESS_FAILURE, Endpoint=1, TSN=0xDE
+            ),
+        ],
+    )
+
+    # The packet expires before it can be retried
+    with pytest.raises(RequestExpired):
+        await app.send_packet(make_test_packet())
+
+    assert data_req.call_count == 1
+    assert app.state.counters["Expired_Packets"]["retry"] == 1
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize(
+    "dst_ep,cluster,data,priority_class",
+    [
+        # On/Off toggle
+        (1, 0x0006, b"\x01\x12\x02", PriorityClass.INTERACTIVE),
+        # Color Control move to hue
+        (1, 0x0300, b"\x01\x12\x00\x10\x00\x0A\x00", PriorityClass.INTERACTIVE),
+        # Recall scene
+        (1, 0x0005, b"\x01\x12\x05\x01\x00\x02", PriorityClass.INTERACTIVE),
+        # Store scene
+        (1, 0x0005, b"\x01\x12\x04\x01\x00\x02", PriorityClass.NORMAL),
+        # Add group
+        (1, 0x0004, b"\x01\x12\x00\x01\x00\x00", PriorityClass.NORMAL),
+        # Manufacturer-specific cluster command
+        (1, 0xFC00, b"\x05\x34\x12\x12\x01", PriorityClass.NORMAL),
+        # Manufacturer-specific On/Off command
+        (1, 0x0006, b"\x05\x34\x12\x12\xFD", PriorityClass.INTERACTIVE),
+        # Read attributes
+        (1, 0x0006, b"\x00\x12\x00\x00\x00", PriorityClass.NORMAL),
+        # Configure reporting
+        (1, 0x0006, b"\x00\x12\x06\x00\x00\x00", PriorityClass.MAINTENANCE),
+        # OTA image block response
+        (1, 0x0019, b"\x19\x12\x05\x00", PriorityClass.BULK),
+        # Node descriptor request
+        (0, zdo_t.ZDOCmd.Node_Desc_req, b"\x12\x34\x12", PriorityClass.NORMAL),
+        # Topology scan
+        (0, zdo_t.ZDOCmd.Mgmt_Lqi_req, b"\x12\x00", PriorityClass.MAINTENANCE),
+        # Empty packet
+        (1, 0x0006, b"", PriorityClass.NORMAL),
+    ],
+)
+def test_packet_priority(dst_ep, cluster, data, priority_class, make_application):
+    app, _ = make_application(FormedLaunchpadCC26X2R1)
+
+    packet = zigpy_t.ZigbeePacket(
+        src=zigpy_t.AddrModeAddress(addr_mode=zigpy_t.AddrMode.NWK, address=0x0000),
+        src_ep=1,
+        dst=zigpy_t.AddrModeAddress(addr_mode=zigpy_t.AddrMode.NWK, address=0x1234),
+        dst_ep=dst_ep,
+        cluster_id=cluster,
+        data=zigpy_t.SerializableBytes(data),
+    )
+
+    assert app._packet_priority(packet) == priority_class
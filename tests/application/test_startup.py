@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 import voluptuous as vol
 from zigpy.exceptions import NetworkNotFormed
@@ -222,6 +224,93 @@ async def test_auto_form_unnecessary(device, make_application, mocker):
     await app.shutdown()
 
 
+@pytest.mark.parametrize("device", FORMED_DEVICES)
+async def test_startup_phases(device, make_application, mocker):
+    app, znp_server = make_application(server_cls=device)
+
+    await app.startup(auto_form=False)
+
+    phases = app.startup_phases()
+    names = [p.name for p in phases]
+
+    # Phases are listed in the order they ran
+    assert names.index("skip bootloader") < names.index("reset")
+    assert names.index("reset") < names.index("commission")
+    assert names.index("commission") < names.index("network ready")
+    assert names[-1] == "initialize coordinator"
+
+    assert all(p.duration >= 0 for p in phases)
+    assert sum(p.sreqs for p in phases) > 0
+    assert [p.sreqs for p in phases if p.name == "network ready"] == [1]
+
+    # Requests sent once startup has finished are not counted
+    await app._znp.request(c.SYS.Ping.Req())
+    assert app._znp._startup_profiler._sreqs == sum(p.sreqs for p in phases)
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", [FormedLaunchpadCC26X2R1])
+async def test_network_ready_polling(device, make_application, mocker):
+    app, znp_server = make_application(server_cls=device)
+
+    calls = 0
+
+    def ext_nwk_info(req):
+        nonlocal calls
+        calls += 1
+
+        rsp = znp_server.zdo_ext_nwk_info(req)
+
+        # The NIB takes a few attempts to be filled in
+        if calls <= 3:
+            rsp = rsp.replace(Channel=0)
+
+        return rsp
+
+    znp_server.reply_to(c.ZDO.ExtNwkInfo.Req(), responses=[ext_nwk_info], override=True)
+    nib_read = mocker.spy(ZNP, "_network_ready_from_nib")
+
+    await app.startup(auto_form=False)
+    assert calls == 4
+
+    calls = 0
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await app._znp._wait_for_network_ready()
+
+    # Polling backs off from a short interval, the NIB is never read
+    assert calls == 4
+    assert loop.time() - start < 0.5
+    assert nib_read.call_count == 0
+
+    await app.shutdown()
+
+
+@pytest.mark.parametrize("device", FORMED_DEVICES)
+async def test_network_ready_nib_fallback(device, make_application, mocker):
+    app, znp_server = make_application(server_cls=device)
+
+    ext_nwk_info = znp_server.reply_to(
+        c.ZDO.ExtNwkInfo.Req(),
+        responses=[
+            c.RPCError.CommandNotRecognized.Rsp(
+                ErrorCode=c.rpc_error.ErrorCode.InvalidCommandId,
+                RequestHeader=c.ZDO.ExtNwkInfo.Req().header,
+            )
+        ],
+        override=True,
+    )
+    nib_read = mocker.spy(ZNP, "_network_ready_from_nib")
+
+    await app.startup(auto_form=False)
+
+    assert ext_nwk_info.call_count == 1
+    assert nib_read.call_count == 1
+
+    await app.shutdown()
+
+
 @pytest.mark.parametrize("device", EMPTY_DEVICES)
 async def test_auto_form_necessary(device, make_application, mocker):
     app, znp_server = make_application(server_cls=device)
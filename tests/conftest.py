@@ -238,6 +238,7 @@ def connected_znp(event_loop, make_connected_znp):
     znp, znp_server = event_loop.run_until_complete(make_connected_znp(BaseServerZNP))
     yield znp, znp_server
     znp.close()
+    event_loop.run_until_complete(znp.wait_closed())
 
 
 def simple_deepcopy(d):
@@ -367,7 +368,8 @@ class BaseServerZNP(ZNP):
 
     def reply_once_to(self, request, responses, *, override=False):
         if override:
-            self._listeners[request.header].clear()
+            for listener in list(self._listeners.get(request.header, [])):
+                self.remove_listener(listener)
 
         request_future = self.wait_for_response(request)
 
@@ -381,7 +383,8 @@ class BaseServerZNP(ZNP):
 
     def reply_to(self, request, responses, *, override=False):
         if override:
-            self._listeners[request.header].clear()
+            for listener in list(self._listeners.get(request.header, [])):
+                self.remove_listener(listener)
 
         async def callback(request):
             callback.call_count += 1
@@ -734,7 +737,9 @@ class BaseZStackDevice(BaseServerZNP):
 
     @reply_to(c.AF.Delete.Req(partial=True))
     def on_endpoint_deletion(self, req):
-        self.active_endpoints.remove(req)
+        self.active_endpoints = [
+            ep for ep in self.active_endpoints if ep.Endpoint != req.Endpoint
+        ]
 
         return c.AF.Delete.Rsp(Status=t.Status.SUCCESS)
 
@@ -912,6 +917,14 @@ class BaseZStackDevice(BaseServerZNP):
             MaintRel=version.MaintRel,
         )
 
+    @reply_to(c.SYS.GetExtAddr.Req())
+    def get_ext_addr(self, request):
+        return c.SYS.GetExtAddr.Rsp(
+            ExtAddr=t.EUI64.deserialize(self._nvram[ExNvIds.LEGACY][OsalNvIds.EXTADDR])[
+                0
+            ]
+        )
+
     @reply_to(c.UTIL.GetDeviceInfo.Req())
     def util_device_info(self, request):
         nwk = 0xFFFE
@@ -928,6 +941,53 @@ class BaseZStackDevice(BaseServerZNP):
             AssociatedDevices=[],
         )
 
+    @reply_to(c.ZDO.ExtNwkInfo.Req())
+    def zdo_ext_nwk_info(self, request):
+        nib = self.nib
+
+        return c.ZDO.ExtNwkInfo.Rsp(
+            Dst=nib.nwkDevAddress,
+            DeviceState=self.device_state,
+            PanId=nib.nwkPanId,
+            ParentNWK=nib.nwkCoordAddress,
+            ExtendedPanId=nib.extendedPANID,
+            ParentIEEE=nib.nwkCoordExtAddress,
+            Channel=nib.nwkLogicalChannel,
+        )
+
+    @reply_to(c.ZDO.ActiveEpReq.Req(partial=True))
+    def zdo_active_ep_req(self, request):
+        return [
+            request.Rsp(Status=t.Status.SUCCESS),
+            c.ZDO.ActiveEpRsp.Callback(
+                Src=0x0000,
+                Status=t.ZDOStatus.SUCCESS,
+                NWK=0x0000,
+                ActiveEndpoints=[ep.Endpoint for ep in self.active_endpoints],
+            ),
+        ]
+
+    @reply_to(c.ZDO.SimpleDescReq.Req(partial=True))
+    def zdo_simple_desc_req(self, request):
+        ep = next(ep for ep in self.active_endpoints if ep.Endpoint == request.Endpoint)
+
+        return [
+            request.Rsp(Status=t.Status.SUCCESS),
+            c.ZDO.SimpleDescRsp.Callback(
+                Src=0x0000,
+                Status=t.ZDOStatus.SUCCESS,
+                NWK=0x0000,
+                SimpleDescriptor=zdo_t.SizePrefixedSimpleDescriptor(
+                    endpoint=ep.Endpoint,
+                    profile=ep.ProfileId,
+                    device_type=ep.DeviceId,
+                    device_version=ep.DeviceVersion,
+                    input_clusters=ep.InputClusters,
+                    output_clusters=ep.OutputClusters,
+                ),
+            ),
+        ]
+
     @reply_to(c.ZDO.ExtRouteChk.Req(partial=True))
     def zdo_route_check(self, request):
         return c.ZDO.ExtRouteChk.Rsp(Status=c.zdo.RoutingStatus.SUCCESS)
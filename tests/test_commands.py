@@ -1,3 +1,4 @@
+import copy
 import keyword
 import dataclasses
 from collections import defaultdict
@@ -559,3 +560,219 @@ def test_neighbors_missing_payload():
         Src=0x821F,
         Status=t.ZDOStatus.NOT_SUPPORTED,
     )
+
+
+def test_command_lazy_deserialization(mocker):
+    command = c.AF.IncomingMsg.Callback(
+        GroupId=0x0000,
+        ClusterId=0x0006,
+        SrcAddr=0x1234,
+        SrcEndpoint=1,
+        DstEndpoint=1,
+        WasBroadcast=t.Bool.false,
+        LQI=255,
+        SecurityUse=t.Bool.false,
+        TimeStamp=123456,
+        TSN=0,
+        Data=b"\x18\x01\x0A",
+        MacSrcAddr=0x1234,
+        MsgResultRadius=29,
+    )
+
+    frame = command.to_frame()
+    lazy = c.AF.IncomingMsg.Callback.from_frame_lazy(frame)
+
+    mocker.spy(t.ShortBytes, "deserialize_from")
+
+    # Only the fixed-size header of the command is parsed to read these
+    assert lazy.ClusterId == 0x0006
+    assert c.AF.IncomingMsg.Callback(partial=True, SrcAddr=0x1234).matches(lazy)
+    assert not c.AF.IncomingMsg.Callback(partial=True, SrcAddr=0x5678).matches(lazy)
+    assert lazy._decoder._index == 10
+    assert t.ShortBytes.deserialize_from.call_count == 0
+
+    # Everything is parsed only when the command is compared
+    assert lazy == command
+    assert t.ShortBytes.deserialize_from.call_count == 1
+    assert lazy._decoder is None
+    assert lazy.Data == b"\x18\x01\x0A"
+
+
+def test_command_lazy_deserialization_errors():
+    frame = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities(0x0101)).to_frame()
+
+    # Frames with an invalid length are rejected up front
+    with pytest.raises(ValueError):
+        c.SYS.Ping.Rsp.from_frame_lazy(
+            dataclasses.replace(frame, data=frame.data + b"\xAB")
+        )
+
+    with pytest.raises(ValueError):
+        c.SYS.Ping.Rsp.from_frame_lazy(dataclasses.replace(frame, data=b"\x01"))
+
+    # Variable-length commands are checked against the length prefixes in them
+    frame = c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678]).to_frame()
+
+    for data in (frame.data[:1], frame.data[:2], frame.data[:-1], frame.data + b"\x00"):
+        with pytest.raises(ValueError):
+            c.ZDO.SrcRtgInd.Callback.from_frame_lazy(
+                dataclasses.replace(frame, data=data)
+            )
+
+    lazy = c.ZDO.SrcRtgInd.Callback.from_frame_lazy(frame)
+    assert lazy._decoder is not None
+    assert lazy.Relays == [0x5678]
+
+    # Commands whose parameters can fail to deserialize are parsed right away
+    frame = c.ZDO.ParentAnnceRsp.Callback(
+        Src=0x1234, Status=t.ZDOStatus.SUCCESS, ChildInfo=[]
+    ).to_frame()
+
+    assert c.ZDO.ParentAnnceRsp.Callback.from_frame_lazy(frame)._decoder is None
+
+    with pytest.raises(ValueError):
+        c.ZDO.ParentAnnceRsp.Callback.from_frame_lazy(
+            dataclasses.replace(frame, data=frame.data[:-1])
+        )
+
+    with pytest.raises(ValueError):
+        c.SYS.Ping.Rsp.from_frame_lazy(
+            dataclasses.replace(frame, header=c.SYS.Version.Rsp.header)
+        )
+
+
+def test_command_slots():
+    command = c.SYS.OSALTimerExpired.Callback(Id=0xAB)
+    lazy = c.AF.DataConfirm.Callback.from_frame_lazy(
+        c.AF.DataConfirm.Callback(Status=t.Status.SUCCESS, Endpoint=1, TSN=2).to_frame()
+    )
+
+    # Parameters are stored in slots, not in an instance dictionary
+    assert not hasattr(command, "__dict__")
+    assert not hasattr(lazy, "__dict__")
+    assert type(command).__slots__ == ("Id",)
+    assert command.Id == 0xAB
+
+    with pytest.raises(AttributeError):
+        command.Unknown
+
+    with pytest.raises(AttributeError):
+        lazy.Unknown
+
+    # Lazy commands fill in their slots as they are decoded
+    assert lazy.Endpoint == 1
+    assert lazy._decoder is None
+    assert lazy.as_dict() == {"Status": t.Status.SUCCESS, "Endpoint": 1, "TSN": 2}
+
+    # Commands can still be copied
+    for other in (command, lazy):
+        assert copy.copy(other) == other
+        assert copy.deepcopy(other) == other
+
+    partial = c.SYS.OSALTimerExpired.Callback(partial=True)
+    assert copy.copy(partial)._partial
+
+
+def test_command_validate_frame(mocker):
+    frame = c.AF.DataConfirm.Callback(
+        Status=t.Status.SUCCESS, Endpoint=1, TSN=2
+    ).to_frame()
+
+    # Commands with only fixed-size parameters do not need to be parsed
+    mocker.spy(c.AF.DataConfirm.Callback, "from_frame")
+    c.AF.DataConfirm.Callback.validate_frame(frame)
+    assert c.AF.DataConfirm.Callback.from_frame.call_count == 0
+
+    with pytest.raises(ValueError):
+        c.AF.DataConfirm.Callback.validate_frame(
+            dataclasses.replace(frame, data=frame.data[:-1])
+        )
+
+    # Others are
+    frame = c.ZDO.SrcRtgInd.Callback(DstAddr=0x1234, Relays=[0x5678]).to_frame()
+    c.ZDO.SrcRtgInd.Callback.validate_frame(frame)
+
+    with pytest.raises(ValueError):
+        c.ZDO.SrcRtgInd.Callback.validate_frame(
+            dataclasses.replace(frame, data=frame.data[:-1])
+        )
+
+
+def test_command_codec_runs():
+    codec = c.AF.IncomingMsg.Callback._codec
+
+    # Every parameter up to the variable-length `Data` is unpacked as a single struct
+    run_struct, run_params = codec.runs[0]
+    assert run_struct.format == "<HHHBBBBBIB"
+    assert [p.name for p in run_params] == [
+        "GroupId",
+        "ClusterId",
+        "SrcAddr",
+        "SrcEndpoint",
+        "DstEndpoint",
+        "WasBroadcast",
+        "LQI",
+        "SecurityUse",
+        "TimeStamp",
+        "TSN",
+    ]
+
+    # And so are the two after it
+    assert codec.runs[11][0].format == "<HB"
+    assert list(codec.runs) == [0, 11]
+
+    # Runs can follow variable-length parameters
+    runs = c.AF.DataRequestExt.Req._codec.runs
+    assert [(i, s.format) for i, (s, _) in runs.items()] == [(1, "<BHBHBBB")]
+
+    # Optional parameters and lone bytes are left alone
+    assert c.SYS.ResetReq.Req._codec.runs == {}
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        c.AF.DataRequestExt.Req(
+            DstAddrModeAddress=t.AddrModeAddress(mode=t.AddrMode.NWK, address=0x1234),
+            DstEndpoint=1,
+            DstPanId=0x0000,
+            SrcEndpoint=1,
+            ClusterId=0x0006,
+            TSN=123,
+            Options=c.af.TransmitOptions.NONE,
+            Radius=30,
+            Data=b"\x01\x02\x03",
+        ),
+        c.AF.IncomingMsg.Callback(
+            GroupId=0x0000,
+            ClusterId=0x0006,
+            SrcAddr=0x1234,
+            SrcEndpoint=1,
+            DstEndpoint=1,
+            WasBroadcast=t.Bool.true,
+            LQI=255,
+            SecurityUse=t.Bool.false,
+            TimeStamp=123456,
+            TSN=0,
+            Data=b"\x18\x01\x0A",
+            MacSrcAddr=0x1234,
+            MsgResultRadius=29,
+        ),
+        c.ZDO.NodeDescRsp.Callback(Src=0x1234, Status=t.ZDOStatus.SUCCESS, NWK=0x1234),
+        c.SYS.ResetReq.Req(Type=t.ResetType.Soft),
+    ],
+)
+def test_command_codec_round_trip(command):
+    frame = command.to_frame()
+
+    # The struct prefix must produce the same bytes as serializing each parameter
+    chunks = [v.serialize() for v in command.as_dict().values() if v is not None]
+    assert frame.data == b"".join(chunks)
+
+    decoded = type(command).from_frame(frame)
+    assert decoded == command
+    assert decoded.as_dict() == command.as_dict()
+
+    for param in decoded.schema:
+        value = getattr(decoded, param.name)
+        assert value is None or type(value) is param.type
@@ -1,3 +1,6 @@
+import operator
+import functools
+
 import pytest
 
 import zigpy_znp.types as t
@@ -59,3 +62,33 @@ def test_transport_frame():
 
     # constructor
     assert frames.TransportFrame(r.payload) == r
+
+
+@pytest.mark.parametrize("length", [0, 1, 5, 31, 32, 33, 100, 250, 255])
+def test_xor_checksum(length):
+    data = bytes((17 * i + 3) & 0xFF for i in range(length))
+    expected = 0
+
+    for byte in data:
+        expected ^= byte
+
+    assert frames.xor_checksum(data) == expected
+    assert frames.xor_checksum(memoryview(bytearray(data))) == expected
+
+
+def test_transport_frame_serialize_single_pass():
+    frame = frames.GeneralFrame(t.CommandHeader(0x0161), b"\x11\x00" * 100)
+    serialized = frames.TransportFrame(frame).serialize()
+
+    assert serialized == (
+        b"\xFE"
+        + frame.serialize()
+        + bytes([functools.reduce(operator.xor, frame.serialize())])
+    )
+
+    # The payload can be written at any offset of an existing buffer
+    buffer = bytearray(b"\xAA" * (len(frame.data) + 10))
+    assert frame.serialize_into(buffer, 4) == 4 + 3 + len(frame.data)
+    assert buffer[4:-3] == frame.serialize()
+    assert buffer[:4] == b"\xAA" * 4
+    assert buffer[-3:] == b"\xAA" * 3
@@ -150,6 +150,46 @@ def test_fixed_list_deserialize():
     assert r[2] == 0xAB89
 
 
+def test_deserialize_from():
+    class TestList(t.LVList, item_type=t.EUI64, length_type=t.uint8_t):
+        pass
+
+    class TestTable(t.CompleteList, item_type=t.uint16_t):
+        pass
+
+    data = memoryview(
+        b"\xAA"
+        + b"\x02"
+        + b"\x00\x11\x22\x33\x44\x55\x66\x77" * 2
+        + b"\x03abc"
+        + b"\x34\x12\x55\xAA"
+    )
+
+    assert t.deserialize_from(t.uint8_t, data) == (0xAA, 1)
+    assert type(t.deserialize_from(t.uint8_t, data)[0]) is t.uint8_t
+
+    eui64s, offset = t.deserialize_from(TestList, data, 1)
+    assert offset == 18
+    assert eui64s == [t.EUI64.convert("77:66:55:44:33:22:11:00")] * 2
+    assert type(eui64s) is TestList
+
+    value, offset = t.ShortBytes.deserialize_from(data, offset)
+    assert (value, offset) == (b"abc", 22)
+    assert type(value) is t.ShortBytes
+
+    assert TestTable.deserialize_from(data, offset) == ([0x1234, 0xAA55], len(data))
+    assert t.Bytes.deserialize_from(data, offset) == (b"\x34\x12\x55\xAA", len(data))
+
+    # The old API is a thin wrapper
+    assert TestList.deserialize(bytes(data[1:])) == (eui64s, bytes(data[18:]))
+
+    with pytest.raises(ValueError):
+        t.deserialize_from(t.uint32_t, data, len(data) - 3)
+
+    with pytest.raises(ValueError):
+        t.ShortBytes.deserialize_from(data, 18 + 4 + 1)
+
+
 def test_enum_instance_types():
     class TestEnum(t.enum8):
         Member = 0x00
@@ -171,6 +171,60 @@ def test_struct_aligned_nested_serialization_deserialization():
     assert struct == struct2
 
 
+def test_struct_serialize_into_deserialize_from():
+    class Inner(t.CStruct):
+        c: t.uint8_t
+        d: t.uint32_t
+
+    class TestStruct(t.CStruct):
+        a: t.uint8_t
+        b: Inner
+        e: t.EUI64
+        f: t.NwkState
+
+    struct = TestStruct(
+        a=1,
+        b=Inner(c=2, d=3),
+        e=t.EUI64.convert("00:11:22:33:44:55:66:77"),
+        f=t.NwkState.NWK_ROUTER,
+    )
+
+    for align in (False, True):
+        size = TestStruct.get_size(align=align)
+        buffer = bytearray(b"ab" + b"\x00" * size + b"cd")
+
+        assert struct.serialize_into(buffer, 2, align=align) == 2 + size
+        assert buffer == b"ab" + struct.serialize(align=align) + b"cd"
+
+        struct2, offset = TestStruct.deserialize_from(
+            memoryview(buffer), 2, align=align
+        )
+        assert offset == 2 + size
+        assert struct2 == struct
+        assert type(struct2.b.d) is t.uint32_t
+        assert type(struct2.f) is t.NwkState
+
+        with pytest.raises(ValueError):
+            TestStruct.deserialize_from(buffer, 5, align=align)
+
+
+def test_struct_layout_cached():
+    class TestStruct(t.CStruct):
+        a: t.uint8_t
+        b: t.uint16_t
+
+    layout = TestStruct.get_layout(align=True)
+    assert TestStruct.get_layout(align=True) is layout
+    assert TestStruct.get_layout(align=False) is not layout
+
+    assert layout.size == TestStruct.get_size(align=True) == 4
+    assert layout.struct.size == layout.size
+    assert list(TestStruct.get_padded_fields(align=True)) == [
+        (0, 1, TestStruct.fields.a),
+        (1, 2, TestStruct.fields.b),
+    ]
+
+
 def test_struct_unaligned_serialization_deserialization():
     class TestStruct(t.CStruct):
         a: t.uint8_t
@@ -419,3 +473,60 @@ def test_struct_addrmode_address():
     struct = TestStruct(addr=t.AddrModeAddress(mode=t.AddrMode.NWK, address=0x1234))
     assert struct.get_size(align=False) == 1 + 8
     assert struct.get_size(align=True) == 1 + 8
+
+
+def test_struct_array():
+    class TestStruct(t.CStruct):
+        a: t.uint8_t
+        b: t.uint16_t
+        c: t.EUI64
+
+    entries = [
+        TestStruct(a=1, b=2, c=t.EUI64.convert("00:11:22:33:44:55:66:77")),
+        TestStruct(a=0xFF, b=0xFFFF, c=t.EUI64.convert("FF:FF:FF:FF:FF:FF:FF:FF")),
+        TestStruct(a=0x00, b=0x0000, c=t.EUI64.convert("00:00:00:00:00:00:00:00")),
+        TestStruct(a=0x00, b=0xFFFF, c=t.EUI64.convert("FF:FF:FF:FF:FF:FF:FF:FF")),
+        TestStruct(a=3, b=4, c=t.EUI64.convert("77:66:55:44:33:22:11:00")),
+    ]
+
+    for align in (False, True):
+        data = b"".join(e.serialize(align=align) for e in entries)
+        array = t.CStructArray(TestStruct, data, align=align)
+
+        assert len(array) == 5
+        assert array == entries
+        assert array[-1] == entries[-1]
+        assert array[1:3] == entries[1:3]
+        assert array.serialize() == data
+
+        # All-0x00 and all-0xFF rows are always empty
+        assert array.live_indices() == [0, 3, 4]
+        assert array.live_indices(empty=[entries[3]]) == [0, 4]
+        assert array.live(empty=[entries[3]]) == [entries[0], entries[4]]
+
+        with pytest.raises(IndexError):
+            array[5]
+
+        with pytest.raises(ValueError):
+            t.CStructArray(TestStruct, data[:-1], align=align)
+
+    assert t.CStructArray(TestStruct, b"") == []
+
+
+def test_struct_list_bulk_deserialization():
+    class TestStruct(t.CStruct):
+        a: t.uint8_t
+        b: t.uint16_t
+
+    class TestList(t.CompleteList, item_type=TestStruct):
+        pass
+
+    entries = TestList([TestStruct(a=1, b=2), TestStruct(a=3, b=4)])
+
+    for align in (False, True):
+        data = entries.serialize(align=align)
+        assert TestList.deserialize(data, align=align) == (entries, b"")
+
+        # A partial trailing entry is still invalid
+        with pytest.raises(ValueError):
+            TestList.deserialize(data + b"\x00", align=align)
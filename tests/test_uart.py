@@ -1,3 +1,6 @@
+import asyncio
+from unittest import mock
+
 import pytest
 from serial_asyncio import SerialTransport
 
@@ -6,6 +9,7 @@ import zigpy_znp.config as conf
 import zigpy_znp.commands as c
 from zigpy_znp import uart as znp_uart
 from zigpy_znp.frames import TransportFrame
+from zigpy_znp.liveness import UartError
 
 
 @pytest.fixture
@@ -169,11 +173,39 @@ def test_uart_rx_corrupted_fcs(connected_uart):
     test_frame = test_command.to_frame()
     test_frame_bytes = TransportFrame(test_frame).serialize()
 
+    uart.data_received(test_frame_bytes)
+    znp.frame_received.reset_mock()
+
     # Almost, but not quite
     uart.data_received(test_frame_bytes[:-1])
     uart.data_received(b"\x00")
 
     assert not znp.frame_received.called
+    znp.uart_error.assert_called_once_with(UartError.CHECKSUM)
+
+
+def test_uart_rx_resync(connected_uart):
+    znp, uart = connected_uart
+
+    test_frame = c.SYS.Ping.Rsp(Capabilities=t.MTCapabilities.SYS).to_frame()
+    test_frame_bytes = TransportFrame(test_frame).serialize()
+
+    # Garbage received while the radio starts up is skipped but not reported
+    uart.data_received(b"\x00\x01\x02\x03\x04" + test_frame_bytes)
+
+    znp.frame_received.assert_called_once_with(test_frame)
+    assert not znp.uart_error.called
+
+    # Once a valid frame has been received, a run of garbage is reported once
+    uart.data_received(b"\x00\x01\x02\x03\x04")
+    uart.data_received(b"\xFE\xFF\x05\x06\x07")
+    uart.data_received(b"\x08\x09\x0A\x0B\x0C" + test_frame_bytes)
+
+    assert znp.frame_received.call_count == 2
+    znp.uart_error.assert_called_once_with(UartError.RESYNC)
+
+    uart.data_received(b"\x00\x01\x02\x03\x04" + test_frame_bytes)
+    assert znp.uart_error.call_count == 2
 
 
 def test_uart_rx_sof_stress(connected_uart):
@@ -246,3 +278,115 @@ async def test_connection_made(dummy_serial_conn, mocker):
     await znp_uart.connect(conf.SCHEMA_DEVICE({conf.CONF_DEVICE_PATH: device}), api=znp)
 
     znp.connection_made.assert_called_once_with()
+
+
+def test_uart_rx_many_frames_partial_tail(connected_uart):
+    znp, uart = connected_uart
+
+    test_frames = [
+        c.SYS.OSALNVWriteExt.Req(
+            Id=0x0021, Offset=0, Value=t.ShortBytes(bytes([i]) * (10 * i))
+        ).to_frame()
+        for i in range(1, 20)
+    ]
+    data = b"".join(TransportFrame(f).serialize() for f in test_frames)
+
+    # The last frame is split across two reads
+    uart.data_received(b"\x00\x01" + data[:-3])
+    assert znp.frame_received.call_count == len(test_frames) - 1
+    assert uart._buffer == data[-len(TransportFrame(test_frames[-1]).serialize()) : -3]
+
+    uart.data_received(data[-3:])
+    assert znp.frame_received.mock_calls == [mock.call(f) for f in test_frames]
+    assert not uart._buffer
+
+
+async def test_uart_tx_coalescing(connected_uart):
+    znp, uart = connected_uart
+
+    test_frames = [
+        c.SYS.OSALNVWriteExt.Req(
+            Id=0x0021, Offset=0, Value=t.ShortBytes(bytes([i]) * 10)
+        ).to_frame()
+        for i in range(5)
+    ]
+    data = [TransportFrame(f).serialize() for f in test_frames]
+
+    for frame in test_frames:
+        uart.send(frame)
+
+    # The first frame is written immediately
+    assert uart._transport.write.mock_calls == [mock.call(data[0])]
+
+    # The rest are written together at the end of the loop iteration
+    await asyncio.sleep(0)
+    assert uart._transport.write.mock_calls == [
+        mock.call(data[0]),
+        mock.call(b"".join(data[1:])),
+    ]
+
+    # A new loop iteration starts over
+    uart.send(test_frames[0])
+    assert uart._transport.write.mock_calls[-1] == mock.call(data[0])
+
+
+async def test_uart_tx_close_flushes(connected_uart):
+    znp, uart = connected_uart
+    transport = uart._transport
+
+    uart.write(b"first")
+    uart.write(b"second")
+    uart.write(b"third")
+    uart.close()
+
+    assert transport.write.mock_calls == [
+        mock.call(b"first"),
+        mock.call(b"secondthird"),
+    ]
+    assert transport.close.call_count == 1
+
+
+async def test_uart_tx_backpressure(connected_uart):
+    znp, uart = connected_uart
+
+    uart.pause_writing()
+
+    drain = asyncio.create_task(uart.drain())
+    await asyncio.sleep(0.01)
+    assert not drain.done()
+
+    uart.resume_writing()
+    await asyncio.wait_for(drain, timeout=1)
+
+
+async def test_uart_tx_baudrate_pacing(connected_uart):
+    znp, uart = connected_uart
+    uart.baudrate = 100_000
+
+    # Writing within the allowed lead does not block
+    uart.write(b"\xAB" * znp_uart.UART_MAX_TX_LEAD)
+    await asyncio.wait_for(uart.drain(), timeout=0.001)
+
+    # 1000 bytes at 10,000 bytes per second will take 100ms
+    uart.write(b"\xAB" * 1000)
+    await asyncio.sleep(0)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await uart.drain()
+
+    assert loop.time() - start >= 0.09
+
+
+def test_uart_tx_without_event_loop(connected_uart):
+    znp, uart = connected_uart
+    uart.baudrate = 100_000
+
+    # Nothing can be coalesced without a running event loop
+    uart.write(b"first")
+    uart.write(b"second")
+
+    assert uart._transport.write.mock_calls == [
+        mock.call(b"first"),
+        mock.call(b"second"),
+    ]
@@ -4,7 +4,12 @@ import pytest
 
 import zigpy_znp.types as t
 import zigpy_znp.commands as c
-from zigpy_znp.utils import deduplicate_commands, combine_concurrent_calls
+from zigpy_znp.utils import (
+    DeadlineQueue,
+    RoundTripEstimator,
+    deduplicate_commands,
+    combine_concurrent_calls,
+)
 
 
 def test_command_deduplication_simple():
@@ -133,3 +138,111 @@ async def test_combine_concurrent_calls():
             await coro
 
     assert f.slow_error_calls == 2
+
+
+async def test_deadline_queue(mocker):
+    loop = asyncio.get_running_loop()
+    deadlines = DeadlineQueue()
+    call_at = mocker.spy(loop, "call_at")
+
+    slow = loop.create_future()
+    fast = loop.create_future()
+    done = loop.create_future()
+    callback = mocker.Mock()
+
+    deadlines.add(slow, 0.2)
+    deadlines.add(fast, 0.05, callback)
+    deadlines.add(done, 0.1)
+    done.set_result(None)
+
+    # Only one timer is pending at a time, for the earliest deadline
+    assert call_at.call_count == 2
+    assert len(deadlines) == 2
+
+    await asyncio.sleep(0.15)
+
+    # Futures with callbacks are expired by them
+    assert callback.call_count == 1
+    assert not fast.done()
+    assert not slow.done()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await slow
+
+    assert len(deadlines) == 0
+    deadlines.clear()
+
+
+async def test_deadline_queue_early_timer(mocker):
+    loop = asyncio.get_running_loop()
+    deadlines = DeadlineQueue()
+
+    future = loop.create_future()
+    deadlines.add(future, 10)
+    call_at = mocker.spy(loop, "call_at")
+
+    # The event loop can run the timer up to one clock tick before the deadline
+    when = deadlines._heap[0][0]
+    mocker.patch.object(loop, "time", return_value=when - loop._clock_resolution)
+    deadlines._expire()
+
+    # The deadline is treated as reached instead of re-arming the timer for it
+    assert future.done()
+    assert call_at.call_count == 0
+
+    with pytest.raises(asyncio.TimeoutError):
+        await future
+
+
+def test_round_trip_estimator():
+    estimator = RoundTripEstimator()
+    header = c.SYS.Ping.Req.header
+
+    # Requests that have never been measured use the largest timeout
+    assert estimator.timeout(header, minimum=0.1, maximum=10) == 10
+
+    estimator.sample(header, 0.4)
+    stats = estimator.stats()[header]
+
+    assert stats.srtt == 0.4
+    assert stats.rttvar == 0.2
+    assert estimator.timeout(header, minimum=0.1, maximum=10) == pytest.approx(1.2)
+
+    # Consistent round-trip times tighten the timeout down to its lower bound
+    for _ in range(100):
+        estimator.sample(header, 0.01)
+
+    assert estimator.stats()[header].samples == 101
+    assert estimator.timeout(header, minimum=0.1, maximum=10) == 0.1
+    assert estimator.timeout(header, minimum=0.0, maximum=10) < 0.02
+
+    # Timeouts back off exponentially until the next sample
+    for _ in range(2 * RoundTripEstimator.MAX_BACKOFF):
+        estimator.timed_out(header)
+
+    assert estimator.stats()[header].backoff == RoundTripEstimator.MAX_BACKOFF
+    assert estimator.timeout(header, minimum=0.1, maximum=10) > 0.1
+
+    estimator.sample(header, 0.01)
+    assert estimator.stats()[header].backoff == 0
+
+    # Unmeasured requests cannot back off
+    estimator.timed_out(c.SYS.Version.Req.header)
+    assert len(estimator) == 1
+
+    estimator.clear()
+    assert len(estimator) == 0
+
+
+async def test_deadline_queue_compaction():
+    loop = asyncio.get_running_loop()
+    deadlines = DeadlineQueue()
+
+    for _ in range(10 * DeadlineQueue.MIN_COMPACT_SIZE):
+        future = loop.create_future()
+        deadlines.add(future, 10)
+        future.set_result(None)
+
+    # Completed futures do not accumulate
+    assert len(deadlines._heap) <= DeadlineQueue.MIN_COMPACT_SIZE
+    deadlines.clear()
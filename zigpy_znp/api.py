@@ -1,22 +1,18 @@
 from __future__ import annotations
 
 import os
-import time
 import typing
 import asyncio
 import logging
-import itertools
 import contextlib
 import dataclasses
 import importlib.metadata
-from collections import Counter, defaultdict
 
 import zigpy.state
 import async_timeout
 import zigpy.zdo.types as zdo_t
 import zigpy.exceptions
 from zigpy.exceptions import NetworkNotFormed
-from zigpy.datastructures import PriorityLock
 
 import zigpy_znp.const as const
 import zigpy_znp.types as t
@@ -26,14 +22,35 @@ import zigpy_znp.commands as c
 from zigpy_znp import uart
 from zigpy_znp.nvram import NVRAMHelper
 from zigpy_znp.utils import (
+    DeadlineQueue,
+    CallbackEngine,
+    ListenerGauges,
+    RoundTripStats,
     CatchAllResponse,
+    ListenerRegistry,
+    RoundTripEstimator,
     BaseResponseListener,
+    CallbackEngineCounters,
     OneShotResponseListener,
     CallbackResponseListener,
 )
-from zigpy_znp.frames import GeneralFrame
-from zigpy_znp.exceptions import CommandNotRecognized, InvalidCommandResponse
+from zigpy_znp.frames import GeneralFrame, TransportFrame
+from zigpy_znp.liveness import UartError, LinkHealth, LivenessMonitor
+from zigpy_znp.profiler import StartupPhase, StartupProfiler
+from zigpy_znp.scheduler import (
+    RequestBatch,
+    PriorityClass,
+    PendingRequest,
+    RequestScheduler,
+)
+from zigpy_znp.exceptions import (
+    LinkDegraded,
+    CommandNotRecognized,
+    InvalidCommandResponse,
+)
+from zigpy_znp.probe_cache import ProbeCache, ConnectProbe
 from zigpy_znp.types.nvids import ExNvIds, OsalNvIds
+from zigpy_znp.request_cache import RequestCache, RequestCacheCounters
 
 if typing.TYPE_CHECKING:
     import typing_extensions
@@ -45,6 +62,8 @@ LOGGER = logging.getLogger(__name__)
 STARTUP_TIMEOUT = 15
 AFTER_BOOTLOADER_SKIP_BYTE_DELAY = 2.5
 NETWORK_COMMISSIONING_TIMEOUT = 60
+NETWORK_READY_MIN_POLL_INTERVAL = 0.01
+NETWORK_READY_MAX_POLL_INTERVAL = 1
 BOOTLOADER_PIN_TOGGLE_DELAY = 0.15
 CONNECT_PING_TIMEOUT = 0.50
 CONNECT_PROBE_TIMEOUT = 10
@@ -58,13 +77,52 @@ class ZNP:
         self._app = None
         self._config = config
 
-        self._listeners = defaultdict(list)
-        self._sync_request_lock = PriorityLock()
+        self._listeners = ListenerRegistry()
+        self._deadlines = DeadlineQueue()
+        self._request_scheduler = RequestScheduler(
+            uart=lambda: self._uart,
+            listeners=self._listeners,
+            deadlines=self._deadlines,
+            on_sreq_sent=self._sreq_sent,
+            on_srsp=self._srsp_received,
+            on_sreq_slow=self._sreq_slow,
+            on_sreq_timeout=self._sreq_timed_out,
+        )
+        self._request_cache = RequestCache()
+
+        # Coroutine callbacks reuse long-lived tasks instead of creating one task each
+        self._callback_engine = CallbackEngine(
+            max_workers=self._znp_config[conf.CONF_MAX_CONCURRENT_CALLBACKS]
+        )
+
+        # Any frame from the radio is proof of life, the watchdog only pings when quiet
+        self._liveness = LivenessMonitor(
+            self._link_degraded,
+            max_sreq_timeouts=self._znp_config[conf.CONF_MAX_SREQ_TIMEOUTS],
+            max_uart_errors=self._znp_config[conf.CONF_MAX_UART_ERRORS],
+        )
+
+        # Where the time goes while connecting and starting the network
+        self._startup_profiler = StartupProfiler()
+
+        # Results of the last probe of the radio, to skip probing it when reconnecting
+        self._probe_cache: ProbeCache | None = None
+
+        if self._znp_config[conf.CONF_PROBE_CACHE_PATH] is not None:
+            self._probe_cache = ProbeCache(self._znp_config[conf.CONF_PROBE_CACHE_PATH])
+
+        # SREQ -> SRSP and SREQ -> AREQ round-trip times, used to derive timeouts
+        self._sreq_round_trips: RoundTripEstimator[
+            t.CommandHeader
+        ] = RoundTripEstimator()
+        self._arsp_round_trips: RoundTripEstimator[
+            tuple[t.CommandHeader, t.CommandHeader]
+        ] = RoundTripEstimator()
 
         self.capabilities = None  # type: int
         self.version = None  # type: float
 
-        self.nvram = NVRAMHelper(self)
+        self.nvram = NVRAMHelper(self, cache=self._znp_config[conf.CONF_NVRAM_CACHE])
         self.network_info: zigpy.state.NetworkInfo = None
         self.node_info: zigpy.state.NodeInfo = None
 
@@ -246,7 +304,7 @@ class ZNP:
         )
 
         # Handle the startup progress messages
-        async with self.capture_responses(
+        async with self.startup_phase("commission"), self.capture_responses(
             [
                 c.ZDO.StateChangeInd.Callback(
                     State=t.DeviceState.StartingAsCoordinator
@@ -305,24 +363,63 @@ class ZNP:
                     " 2.4GHz routers, motherboards, etc."
                 ) from e
 
+        async with self.startup_phase("network ready"):
+            await self._wait_for_network_ready()
+
+    async def _network_ready_from_nib(self) -> bool:
+        try:
+            nib = await self.nvram.osal_read(OsalNvIds.NIB, item_type=t.NIB)
+        except KeyError:
+            return False
+
+        LOGGER.debug("Current NIB is %s", nib)
+
+        return nib.nwkLogicalChannel != 0 and nib.nwkPanId != 0xFFFE
+
+    async def _wait_for_network_ready(self) -> None:
+        """
+        Waits for the network settings in the NIB to become valid.
+        """
+
         LOGGER.debug("Waiting for NIB to stabilize")
 
-        # Even though the device says it is "ready" at this point, it takes a few more
-        # seconds for `_NIB.nwkState` to switch from `NwkState.NWK_INIT`. There does
-        # not appear to be any user-facing MT command to read this information.
+        # Even though the device says it is "ready" at this point, it takes a bit longer
+        # for the NIB to be filled in. `ExtNwkInfo` reports just the fields we need from
+        # the NIB in RAM, reading the whole NIB from NVRAM is only a fallback.
+        use_nib = False
+        delay = NETWORK_READY_MIN_POLL_INTERVAL
+
         while True:
-            try:
-                nib = await self.nvram.osal_read(OsalNvIds.NIB, item_type=t.NIB)
-            except KeyError:
-                pass
+            if use_nib:
+                ready = await self._network_ready_from_nib()
             else:
-                LOGGER.debug("Current NIB is %s", nib)
-
-                # Usually this works after the first attempt
-                if nib.nwkLogicalChannel != 0 and nib.nwkPanId != 0xFFFE:
-                    break
+                try:
+                    rsp = await self.request(c.ZDO.ExtNwkInfo.Req())
+                except CommandNotRecognized:
+                    LOGGER.debug("ExtNwkInfo is not supported, reading the NIB")
+                    use_nib = True
+                    continue
+
+                LOGGER.debug("Current network info is %s", rsp)
+                ready = rsp.Channel != 0 and rsp.PanId != 0xFFFE
+
+            # Usually this works after the first attempt
+            if ready:
+                break
+
+            # Any state change is worth checking for immediately
+            with contextlib.suppress(asyncio.TimeoutError):
+                async with async_timeout.timeout(delay):
+                    await self.wait_for_responses(
+                        [
+                            c.ZDO.StateChangeInd.Callback(partial=True),
+                            c.AppConfig.BDBCommissioningNotification.Callback(
+                                partial=True
+                            ),
+                        ]
+                    )
 
-            await asyncio.sleep(1)
+            delay = min(2 * delay, NETWORK_READY_MAX_POLL_INTERVAL)
 
     async def reset_network_info(self):
         """
@@ -715,6 +812,114 @@ class ZNP:
 
         return await self.request(c.SYS.Ping.Req())
 
+    async def _probe(self) -> None:
+        """
+        Probes the radio for everything needed to communicate with it.
+        """
+
+        # The reset indication callback is sent when some sticks start up
+        async with self.startup_phase("skip bootloader"):
+            self.capabilities = (await self._skip_bootloader()).Capabilities
+
+        # We need to know how structs are packed to deserialize frames correctly
+        async with self.startup_phase("detect alignment"):
+            await self.nvram.determine_alignment()
+
+        async with self.startup_phase("detect version"):
+            self.version = await self.detect_zstack_version()
+
+    def _pin_states(self) -> tuple[tuple[bool, ...], tuple[bool, ...]]:
+        return (
+            tuple(self._znp_config[conf.CONF_CONNECT_DTR_STATES]),
+            tuple(self._znp_config[conf.CONF_CONNECT_RTS_STATES]),
+        )
+
+    async def _identify(self) -> tuple[t.EUI64, int | None]:
+        """
+        Reads the IEEE address and firmware code revision of the radio.
+        """
+
+        async with async_timeout.timeout(2 * CONNECT_PING_TIMEOUT):
+            version = await self.request(c.SYS.Version.Req())
+            ext_addr = await self.request(c.SYS.GetExtAddr.Req())
+
+        return ext_addr.ExtAddr, version.CodeRevision
+
+    async def _probe_from_cache(self) -> bool:
+        """
+        Checks that the radio is the one that was last probed on this port, with the
+        same firmware, and reuses the results of that probe if it is.
+        """
+
+        loop = asyncio.get_running_loop()
+        probe = await loop.run_in_executor(None, self._probe_cache.get, self._port_path)
+
+        if probe is None:
+            return False
+
+        if (probe.dtr_states, probe.rts_states) != self._pin_states():
+            LOGGER.debug("Pin states have changed since the radio was last probed")
+            await self._discard_cached_probe()
+            return False
+
+        # A radio that is already running responds right away, without its pins being
+        # toggled or the bootloader being skipped
+        try:
+            async with async_timeout.timeout(CONNECT_PING_TIMEOUT):
+                ping_rsp = await self.request(c.SYS.Ping.Req())
+
+            ieee, code_revision = await self._identify()
+        except (asyncio.TimeoutError, CommandNotRecognized):
+            LOGGER.debug("Radio did not respond quickly, probing it again")
+            return False
+
+        if (ping_rsp.Capabilities, ieee, code_revision) != (
+            probe.capabilities,
+            probe.ieee,
+            probe.code_revision,
+        ):
+            LOGGER.debug("Radio does not match its cached probe, probing it again")
+            await self._discard_cached_probe()
+            return False
+
+        LOGGER.debug("Using cached probe of radio %s", ieee)
+
+        self.capabilities = probe.capabilities
+        self.nvram.align_structs = probe.align_structs
+        self.version = probe.zstack_version
+
+        return True
+
+    async def _discard_cached_probe(self) -> None:
+        """
+        Forgets a cached probe that is out of date, so that it is not checked again if
+        probing the radio fails.
+        """
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._probe_cache.discard, self._port_path)
+
+    async def _update_probe_cache(self) -> None:
+        try:
+            ieee, code_revision = await self._identify()
+        except (asyncio.TimeoutError, CommandNotRecognized):
+            LOGGER.debug("Failed to identify radio, not caching its probe")
+            return
+
+        dtr_states, rts_states = self._pin_states()
+        probe = ConnectProbe(
+            ieee=ieee,
+            code_revision=code_revision,
+            capabilities=self.capabilities,
+            align_structs=self.nvram.align_structs,
+            zstack_version=self.version,
+            dtr_states=dtr_states,
+            rts_states=rts_states,
+        )
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._probe_cache.put, self._port_path, probe)
+
     async def connect(self, *, test_port=True) -> None:
         """
         Connects to the device specified by the "device" section of the config dict.
@@ -727,17 +932,21 @@ class ZNP:
         assert self._uart is None
 
         try:
-            self._uart = await uart.connect(self._config[conf.CONF_DEVICE], self)
+            async with self.startup_phase("open port"):
+                self._uart = await uart.connect(self._config[conf.CONF_DEVICE], self)
 
             # To allow the ZNP interface to be used for bootloader commands, we have to
             # prevent any data from being sent
             if test_port:
-                # The reset indication callback is sent when some sticks start up
-                self.capabilities = (await self._skip_bootloader()).Capabilities
+                if self._probe_cache is None:
+                    await self._probe()
+                else:
+                    async with self.startup_phase("cached probe"):
+                        probed = await self._probe_from_cache()
 
-                # We need to know how structs are packed to deserialize frames correctly
-                await self.nvram.determine_alignment()
-                self.version = await self.detect_zstack_version()
+                    if not probed:
+                        await self._probe()
+                        await self._update_probe_cache()
 
                 LOGGER.debug("Detected Z-Stack %s", self.version)
         except (Exception, asyncio.CancelledError):
@@ -763,6 +972,21 @@ class ZNP:
         if self._app is not None:
             self._app.connection_lost(exc)
 
+    def _link_degraded(self, exc: LinkDegraded) -> None:
+        """
+        Called by the liveness monitor once the radio stops responding or the UART link
+        becomes unreliable. Treated like the port being closed.
+        """
+
+        self.connection_lost(exc)
+
+    def uart_error(self, error: UartError) -> None:
+        """
+        Called by the UART object when it receives corrupted data.
+        """
+
+        self._liveness.uart_error(error)
+
     def close(self) -> None:
         """
         Cleans up resources, namely the listener queues.
@@ -777,6 +1001,15 @@ class ZNP:
                 listener.cancel()
 
         self._listeners.clear()
+        self._request_scheduler.close()
+        self._request_cache.clear()
+        self._callback_engine.close()
+        self._deadlines.clear()
+        self._sreq_round_trips.clear()
+        self._arsp_round_trips.clear()
+        self._liveness.reset()
+        self._startup_profiler.reset()
+        self.nvram.clear_cache()
         self.version = None
         self.capabilities = None
 
@@ -784,6 +1017,13 @@ class ZNP:
             self._uart.close()
             self._uart = None
 
+    async def wait_closed(self) -> None:
+        """
+        Waits for the background callbacks cancelled by `close` to finish.
+        """
+
+        await self._callback_engine.wait_closed()
+
     def remove_listener(self, listener: BaseResponseListener) -> None:
         """
         Unbinds a listener from ZNP.
@@ -798,30 +1038,140 @@ class ZNP:
 
         LOGGER.log(log.TRACE, "Removing listener %s", listener)
 
-        for header in listener.matching_headers():
-            try:
-                self._listeners[header].remove(listener)
-            except ValueError:
-                pass
-
-            if not self._listeners[header]:
-                LOGGER.log(
-                    log.TRACE, "Cleaning up empty listener list for header %s", header
-                )
-                del self._listeners[header]
+        self._listeners.remove(listener)
 
-        counts = Counter()
-
-        for listener in itertools.chain.from_iterable(self._listeners.values()):
-            counts[type(listener)] += 1
+        gauges = self._listeners.gauges
 
         LOGGER.log(
             log.TRACE,
             "There are %d callbacks and %d one-shot listeners remaining",
-            counts[CallbackResponseListener],
-            counts[OneShotResponseListener],
+            gauges.callback,
+            gauges.one_shot,
+        )
+
+    def listener_gauges(self) -> ListenerGauges:
+        """
+        Number of callbacks and one-shot listeners that are currently registered.
+        """
+
+        return self._listeners.gauges
+
+    def listener_gauges_by_header(self) -> dict[t.CommandHeader, ListenerGauges]:
+        """
+        Number of callbacks and one-shot listeners registered for each command header.
+        """
+
+        return self._listeners.header_gauges()
+
+    def startup_phase(self, name: str) -> typing.AsyncContextManager[None]:
+        """
+        Times a phase of startup, along with the number of SREQs sent during it.
+        """
+
+        return self._startup_profiler.phase(name)
+
+    def startup_phases(self) -> list[StartupPhase]:
+        """
+        Wall time and number of SREQs of each startup phase, in the order they ran.
+        """
+
+        return self._startup_profiler.phases()
+
+    def link_health(self) -> LinkHealth:
+        """
+        Signals used to judge whether the radio is still alive.
+        """
+
+        return self._liveness.health()
+
+    def callback_engine_counters(self) -> CallbackEngineCounters:
+        """
+        Number of coroutine callbacks run in the background, by how they finished.
+        """
+
+        return self._callback_engine.counters()
+
+    def request_cache_counters(self) -> dict[t.CommandHeader, RequestCacheCounters]:
+        """
+        Cache hits, misses, coalesced requests and invalidations of each request type
+        with a request policy.
+        """
+
+        return self._request_cache.counters()
+
+    def sreq_round_trips(self) -> dict[t.CommandHeader, RoundTripStats]:
+        """
+        Estimated time between sending each type of SREQ and receiving its SRSP.
+        """
+
+        return self._sreq_round_trips.stats()
+
+    def arsp_round_trips(
+        self,
+    ) -> dict[tuple[t.CommandHeader, t.CommandHeader], RoundTripStats]:
+        """
+        Estimated time between sending each type of SREQ and receiving its AREQ
+        callback, keyed by the request and callback headers.
+        """
+
+        return self._arsp_round_trips.stats()
+
+    def sreq_timeout(self, request: t.CommandBase) -> float:
+        """
+        How long the SRSP of a request is expected to take, based on how long the radio
+        has previously taken to respond to the same kind of request. Requests that take
+        longer only mark the radio as slow: they fail after `sync_request_timeout`.
+        """
+
+        return self._sreq_round_trips.timeout(
+            request.header,
+            minimum=self._znp_config[conf.CONF_MIN_SREQ_TIMEOUT],
+            maximum=self._znp_config[conf.CONF_SREQ_TIMEOUT],
         )
 
+    def arsp_timeout(self, request: t.CommandBase, callback: t.CommandBase) -> float:
+        """
+        How long to wait for the AREQ callback of a request after sending it, based on
+        how long the radio has previously taken to send the same kind of callback.
+        """
+
+        return self._arsp_round_trips.timeout(
+            (request.header, callback.header),
+            minimum=self._znp_config[conf.CONF_MIN_ARSP_TIMEOUT],
+            maximum=self._znp_config[conf.CONF_ARSP_TIMEOUT],
+        )
+
+    def _sreq_sent(self, request: t.CommandBase) -> None:
+        """
+        Called by the request scheduler when a SREQ is written to the radio.
+        """
+
+        self._startup_profiler.sreq_sent()
+
+    def _srsp_received(self, request: t.CommandBase, latency: float) -> None:
+        """
+        Called by the request scheduler when the outstanding SREQ receives its SRSP.
+        """
+
+        self._sreq_round_trips.sample(request.header, latency)
+        self._liveness.srsp_received(latency)
+
+    def _sreq_slow(self, request: t.CommandBase) -> None:
+        """
+        Called by the request scheduler when a SREQ takes longer than its adaptive
+        timeout. The radio may just be busy, for example compacting its NVRAM.
+        """
+
+        self._liveness.sreq_slow()
+
+    def _sreq_timed_out(self, request: t.CommandBase) -> None:
+        """
+        Called by the request scheduler when a SREQ does not receive its SRSP in time.
+        """
+
+        self._sreq_round_trips.timed_out(request.header)
+        self._liveness.sreq_timed_out()
+
     def frame_received(self, frame: GeneralFrame) -> bool | None:
         """
         Called when a frame has been received. Returns whether or not the frame was
@@ -830,6 +1180,9 @@ class ZNP:
         XXX: Can be called multiple times in a single event loop step!
         """
 
+        # Any valid frame is proof that the radio is still running
+        self._liveness.frame_received()
+
         if frame.header not in c.COMMANDS_BY_ID:
             LOGGER.error("Received an unknown frame: %s", frame)
             return False
@@ -837,7 +1190,27 @@ class ZNP:
         command_cls = c.COMMANDS_BY_ID[frame.header]
 
         try:
-            command = command_cls.from_frame(frame, align=self.nvram.align_structs)
+            # Frames are validated but not parsed up front: parameters are deserialized
+            # only when they are read by a listener, so frames nothing is listening for
+            # are usually never parsed
+            command = command_cls.from_frame_lazy(frame, align=self.nvram.align_structs)
+
+            # Caches are invalidated by a reset, except for NVRAM items Z-Stack keeps
+            if command_cls is c.SYS.ResetInd.Callback:
+                self._request_cache.clear()
+                self.nvram.reset_received()
+            elif (
+                command_cls is c.SYS.SetExtAddr.Rsp
+                and command.Status == t.Status.SUCCESS
+            ):
+                self.nvram.ext_addr_changed()
+
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                # Formatting the command fully parses it so do it here, not in logging
+                LOGGER.debug("Received command: %s", repr(command))
+
+            # Only listeners whose indexed parameters match the command are considered
+            matched = self._listeners.resolve(command)
         except ValueError:
             # Some commands can be received corrupted. They are not useful:
             # https://github.com/home-assistant/core/issues/50005
@@ -847,29 +1220,9 @@ class ZNP:
 
             raise
 
-        LOGGER.debug("Received command: %s", command)
-
-        matched = False
-        one_shot_matched = False
-
-        for listener in (
-            self._listeners[command.header] + self._listeners[CatchAllResponse.header]
-        ):
-            # XXX: A single response should *not* resolve multiple one-shot listeners!
-            #      `future.add_done_callback` doesn't remove our listeners synchronously
-            #      so doesn't prevent this from happening.
-            if one_shot_matched and isinstance(listener, OneShotResponseListener):
-                continue
-
-            if not listener.resolve(command):
-                LOGGER.log(log.TRACE, "%s does not match %s", command, listener)
-                continue
-
-            matched = True
-            LOGGER.log(log.TRACE, "%s matches %s", command, listener)
-
-            if isinstance(listener, OneShotResponseListener):
-                one_shot_matched = True
+        # Send the next SREQ right away if the outstanding one has just been completed
+        if frame.header.type == t.CommandType.SRSP:
+            self._request_scheduler.response_received()
 
         if not matched:
             self._unhandled_command(command)
@@ -905,12 +1258,13 @@ class ZNP:
         executed more than once.
         """
 
-        listener = CallbackResponseListener(responses, callback=callback)
+        listener = CallbackResponseListener(
+            responses, callback=callback, engine=self._callback_engine
+        )
 
         LOGGER.log(log.TRACE, "Creating callback %s", listener)
 
-        for header in listener.matching_headers():
-            self._listeners[header].append(listener)
+        self._listeners.add(listener)
 
         return listener
 
@@ -946,8 +1300,7 @@ class ZNP:
 
         LOGGER.log(log.TRACE, "Creating one-shot listener %s", listener)
 
-        for header in listener.matching_headers():
-            self._listeners[header].append(listener)
+        self._listeners.add(listener)
 
         # Remove the listener when the future is done, not only when it gets a result
         listener.future.add_done_callback(lambda _: self.remove_listener(listener))
@@ -985,12 +1338,12 @@ class ZNP:
             c.ZDO.MgmtPermitJoinReq.Req: -1,
         }.get(type(request), 0)
 
-    async def request(
-        self, request: t.CommandBase, timeout: int | None = None, **response_params
+    def _expected_response(
+        self, request: t.CommandBase, response_params: dict[str, typing.Any]
     ) -> t.CommandBase | None:
         """
-        Sends a SREQ/AREQ request and returns its SRSP (only for SREQ), failing if any
-        of the SRSP's parameters don't match `response_params`.
+        Validates a request and constructs the partial SRSP it expects out of the
+        `Rsp*` response parameters.
         """
 
         # Common mistake is to do `znp.request(c.SYS.Ping())`
@@ -1010,53 +1363,72 @@ class ZNP:
                 renamed_response_params[param.replace("Rsp", "", 1)] = value
 
             # Construct our response before we send the request so that we fail early
-            partial_response = request.Rsp(partial=True, **renamed_response_params)
+            return request.Rsp(partial=True, **renamed_response_params)
         elif response_params:
             raise ValueError(
                 f"Command has no response so response_params={response_params} "
                 f"will have no effect"
             )
 
-        frame = request.to_frame(align=self.nvram.align_structs)
+        return None
 
-        if self._uart is None:
-            raise RuntimeError("Coordinator is disconnected, cannot send request")
+    def _submit_request(
+        self,
+        request: t.CommandBase,
+        partial_response: t.CommandBase | None,
+        *,
+        timeout: float | None,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        batch: RequestBatch | None = None,
+        deadline: float | None = None,
+        immediate: bool = False,
+    ) -> PendingRequest:
+        """
+        Encodes a request and queues it to be sent.
+        """
 
-        # Immediately send reset requests
-        ctx = (
-            contextlib.AsyncExitStack()
-            if isinstance(request, c.SYS.ResetReq.Req)
-            else self._sync_request_lock(priority=self.get_request_priority(request))
-        )
+        self._request_cache.invalidate(request)
+        frame = request.to_frame(align=self.nvram.align_structs)
 
-        # We should only be sending one SREQ at a time, according to the spec
-        async with ctx:
-            LOGGER.debug("Sending request: %s", request)
-
-            # If our request has no response, we cannot wait for one
-            if not request.Rsp:
-                LOGGER.debug("Request has no response, not waiting for one.")
-                self._uart.send(frame)
-                return None
-
-            # We need to create the response listener before we send the request
-            response_future = self.wait_for_responses(
-                [
-                    request.Rsp(partial=True),
-                    c.RPCError.CommandNotRecognized.Rsp(
-                        partial=True, RequestHeader=request.header
-                    ),
-                ]
-            )
+        # We need to create the response listener before we send the request
+        if request.Rsp:
+            responses = [
+                request.Rsp(partial=True),
+                c.RPCError.CommandNotRecognized.Rsp(
+                    partial=True, RequestHeader=request.header
+                ),
+            ]
+        else:
+            responses = None
+
+        # We should only be sending one SREQ at a time, according to the spec. The
+        # scheduler queues the request and sends it as soon as the radio is free.
+        return self._request_scheduler.submit(
+            request,
+            TransportFrame(frame).serialize(),
+            priority=self.get_request_priority(request),
+            priority_class=priority_class,
+            timeout=timeout or self._znp_config[conf.CONF_SREQ_TIMEOUT],
+            slow_timeout=self.sreq_timeout(request),
+            responses=responses,
+            expected=partial_response,
+            batch=batch,
+            deadline=deadline,
+            immediate=immediate,
+        )
 
-            self._uart.send(frame)
+    def _check_response(
+        self,
+        request: t.CommandBase,
+        partial_response: t.CommandBase | None,
+        response: t.CommandBase | None,
+    ) -> t.CommandBase | None:
+        """
+        Fails if a request's SRSP is an error or does not match the expected response.
+        """
 
-            # We should get a SRSP in a reasonable amount of time
-            async with async_timeout.timeout(
-                timeout or self._znp_config[conf.CONF_SREQ_TIMEOUT]
-            ):
-                # We lock until either a sync response is seen or an error occurs
-                response = await response_future
+        if not request.Rsp:
+            return None
 
         if isinstance(response, c.RPCError.CommandNotRecognized.Rsp):
             raise CommandNotRecognized(
@@ -1071,8 +1443,202 @@ class ZNP:
 
         return response
 
+    async def request(
+        self,
+        request: t.CommandBase,
+        timeout: int | None = None,
+        *,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        deadline: float | None = None,
+        **response_params,
+    ) -> t.CommandBase | None:
+        """
+        Sends a SREQ/AREQ request and returns its SRSP (only for SREQ), failing if any
+        of the SRSP's parameters don't match `response_params`.
+
+        Requests of a more urgent `priority_class` get a larger share of the radio.
+        Requests that cannot be sent before their `deadline`, in event loop time, fail
+        with `RequestExpired` without ever being sent.
+        """
+
+        partial_response = self._expected_response(request, response_params)
+
+        if self._uart is None:
+            raise RuntimeError("Coordinator is disconnected, cannot send request")
+
+        # Apply backpressure if the transport or the radio cannot keep up. This does
+        # not suspend the caller while the UART is keeping up.
+        await self._uart.drain()
+
+        if self._uart is None:
+            raise RuntimeError("Coordinator is disconnected, cannot send request")
+
+        # Immediately send reset requests
+        immediate = isinstance(request, c.SYS.ResetReq.Req)
+
+        if immediate:
+            self._request_cache.clear()
+
+        # Identical read-only requests share a response
+        if self._request_cache.policy(request) is not None:
+            response = await self._coalesced_request(
+                request,
+                partial_response,
+                timeout=timeout,
+                priority_class=priority_class,
+                deadline=deadline,
+            )
+
+            return self._check_response(request, partial_response, response)
+
+        pending = self._submit_request(
+            request,
+            partial_response,
+            timeout=timeout,
+            priority_class=priority_class,
+            deadline=deadline,
+            immediate=immediate,
+        )
+        response = await pending.future
+
+        return self._check_response(request, partial_response, response)
+
+    async def _coalesced_request(
+        self,
+        request: t.CommandBase,
+        partial_response: t.CommandBase | None,
+        *,
+        timeout: int | None,
+        priority_class: PriorityClass,
+        deadline: float | None,
+    ) -> t.CommandBase:
+        """
+        Returns a cached response to the request, waits for an identical request that
+        is already in flight, or sends it.
+        """
+
+        response = self._request_cache.get(request)
+
+        if response is not None:
+            return response
+
+        # Callers only share a request if it is sent the way each of them asked for
+        options = (timeout, priority_class, deadline)
+        in_flight = self._request_cache.join(request, options)
+
+        if in_flight is None:
+            pending = self._submit_request(
+                request,
+                partial_response,
+                timeout=timeout,
+                priority_class=priority_class,
+                deadline=deadline,
+            )
+            in_flight = self._request_cache.track(
+                request,
+                pending,
+                options=options,
+                abandon=self._request_scheduler.cancel,
+            )
+
+        return await in_flight.wait()
+
+    async def iter_requests(
+        self,
+        requests: typing.Iterable[t.CommandBase],
+        *,
+        stop_on_error: bool = True,
+        timeout: int | None = None,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        **response_params,
+    ) -> typing.AsyncIterator[t.CommandBase | None | Exception]:
+        """
+        Queues a batch of independent requests at once and yields their responses in
+        order, validating each one against `response_params` like `request`.
+
+        Every request is sent as soon as the SRSP of the one before it is received. If
+        `stop_on_error` is set, the first failure is raised and no request after it is
+        sent. Otherwise failures are yielded in place of their responses.
+
+        Requests that have not been sent when the iterator is closed are cancelled.
+        """
+
+        requests = list(requests)
+        partial_responses = [
+            self._expected_response(request, response_params) for request in requests
+        ]
+
+        if self._uart is None:
+            raise RuntimeError("Coordinator is disconnected, cannot send request")
+
+        batch = RequestBatch(stop_on_error=stop_on_error)
+        pending = [
+            self._submit_request(
+                request,
+                partial_response,
+                timeout=timeout,
+                priority_class=priority_class,
+                batch=batch,
+            )
+            for request, partial_response in zip(requests, partial_responses)
+        ]
+
+        try:
+            for request, partial_response, entry in zip(
+                requests, partial_responses, pending
+            ):
+                try:
+                    response = self._check_response(
+                        request, partial_response, await entry.future
+                    )
+                except Exception as exc:
+                    if stop_on_error:
+                        raise
+
+                    yield exc
+                else:
+                    yield response
+        finally:
+            batch.cancel()
+
+    async def request_many(
+        self,
+        requests: typing.Iterable[t.CommandBase],
+        *,
+        stop_on_error: bool = True,
+        timeout: int | None = None,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        **response_params,
+    ) -> list[t.CommandBase | None | Exception]:
+        """
+        Sends a batch of independent requests and returns their responses in order.
+        See `iter_requests`.
+        """
+
+        responses = self.iter_requests(
+            requests,
+            stop_on_error=stop_on_error,
+            timeout=timeout,
+            priority_class=priority_class,
+            **response_params,
+        )
+
+        try:
+            return [response async for response in responses]
+        finally:
+            await responses.aclose()
+
     async def request_callback_rsp(
-        self, *, request, callback, timeout=None, background=False, **response_params
+        self,
+        *,
+        request,
+        callback,
+        timeout=None,
+        background=False,
+        wait_timeout=None,
+        priority_class=PriorityClass.NORMAL,
+        deadline=None,
+        **response_params,
     ):
         """
         Sends an SREQ, gets its SRSP confirmation, and waits for its real AREQ response.
@@ -1083,46 +1649,119 @@ class ZNP:
 
         This is necessary because the SRSP and the AREQ may arrive in the same "chunk"
         from the UART and be handled in the same event loop step by ZNP.
+
+        If `wait_timeout` is provided, the caller stops waiting after that many seconds
+        or when it is cancelled, but the SRSP and the AREQ are still received until
+        `timeout` expires so that late responses are not left unhandled. Requests that
+        have not been sent by then, or by their `deadline`, are dropped.
         """
 
-        # Every request should have a timeout to prevent deadlocks
+        # Every request should have a timeout to prevent deadlocks. Callbacks must be
+        # received for at least as long as the caller is willing to wait for them.
         if timeout is None:
-            timeout = self._znp_config[conf.CONF_ARSP_TIMEOUT]
+            timeout = self.arsp_timeout(request, callback)
 
-        callback_rsp, listener = self.wait_for_responses([callback], context=True)
+            if wait_timeout is not None:
+                timeout = max(timeout, wait_timeout)
 
-        # Typical request/response/callbacks are not backgrounded
-        if not background:
-            try:
-                async with async_timeout.timeout(timeout):
-                    await self.request(request, timeout=timeout, **response_params)
+        partial_response = self._expected_response(request, response_params)
 
-                    return await callback_rsp
-            finally:
-                self.remove_listener(listener)
+        if self._uart is None:
+            raise RuntimeError("Coordinator is disconnected, cannot send request")
 
-        # Backgrounded callback handlers need to respect the provided timeout
-        start_time = time.monotonic()
+        callback_rsp, listener = self.wait_for_responses([callback], context=True)
 
-        try:
-            async with async_timeout.timeout(timeout):
-                request_rsp = await self.request(request, **response_params)
-        except Exception:
+        # The SRSP is expected as quickly as with any other request
+        pending = self._submit_request(
+            request,
+            partial_response,
+            timeout=None,
+            priority_class=priority_class,
+            deadline=deadline,
+        )
+        request_rsp = pending.future
+        arsp_key = (request.header, callback.header)
+
+        # Everything below is driven by callbacks, there is no task or timer for each
+        # request. The caller only waits for this future.
+        result = asyncio.get_running_loop().create_future()
+
+        def fail(exc: Exception | None) -> None:
             # If the SREQ/SRSP pair fails, we must cancel the AREQ listener
             self.remove_listener(listener)
-            raise
+            callback_rsp.cancel()
+
+            if result.done():
+                return
+            elif exc is None:
+                result.cancel()
+            else:
+                result.set_exception(exc)
+
+        def update(_) -> None:
+            # The AREQ can be received before the SRSP
+            if not request_rsp.done():
+                return
+
+            if request_rsp.cancelled():
+                fail(None)
+                return
 
-        # If it succeeds, create a background task to receive the AREQ but take into
-        # account the time it took to start the SREQ to ensure we do not grossly exceed
-        # the timeout
-        async def callback_catcher(timeout):
             try:
-                async with async_timeout.timeout(timeout):
-                    await callback_rsp
-            finally:
-                self.remove_listener(listener)
+                response = self._check_response(
+                    request, partial_response, request_rsp.result()
+                )
+            except Exception as exc:
+                fail(exc)
+                return
+
+            if result.done():
+                return
+            elif background:
+                # Backgrounded callbacks are received until the timeout expires
+                result.set_result(response)
+            elif callback_rsp.cancelled():
+                result.cancel()
+            elif callback_rsp.done():
+                result.set_result(callback_rsp.result())
+
+        def received(_) -> None:
+            if callback_rsp.cancelled() or pending.sent_at is None:
+                return
+
+            self._arsp_round_trips.sample(
+                arsp_key, asyncio.get_running_loop().time() - pending.sent_at
+            )
+
+        def expire() -> None:
+            if not result.done():
+                result.set_exception(asyncio.TimeoutError())
+
+            # Only a request that was answered can be late with its callback
+            if request_rsp.done() and not request_rsp.cancelled():
+                self._arsp_round_trips.timed_out(arsp_key)
+
+            self._request_scheduler.cancel(pending)
+            callback_rsp.cancel()
+
+        def stop_waiting(_) -> None:
+            if result.cancelled() or result.exception() is not None:
+                # Unshielded requests are abandoned along with their caller, as are
+                # requests that were never sent and so cannot receive a late response
+                if wait_timeout is None or pending.sent_at is None:
+                    self.remove_listener(listener)
+                    self._request_scheduler.cancel(pending)
+                    callback_rsp.cancel()
+
+        request_rsp.add_done_callback(update)
+        callback_rsp.add_done_callback(update)
+        callback_rsp.add_done_callback(received)
+        result.add_done_callback(stop_waiting)
+
+        # The AREQ has to be received within the timeout, which starts now
+        self._deadlines.add(callback_rsp, timeout, expire)
 
-        callback_timeout = max(0, timeout - (time.monotonic() - start_time))
-        asyncio.create_task(callback_catcher(callback_timeout))
+        if wait_timeout is not None:
+            self._deadlines.add(result, wait_timeout)
 
-        return request_rsp
+        return await result
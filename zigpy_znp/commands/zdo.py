@@ -875,11 +875,12 @@ class ZDO(t.CommandsBase, subsystem=t.Subsystem.ZDO):
         req_schema=(),
         rsp_schema=(
             t.Param("Dst", t.NWK, "Short address of the destination"),
+            t.Param("DeviceState", t.DeviceState, "Device state"),
             t.Param("PanId", t.PanId, "The PAN Id to join."),
             t.Param("ParentNWK", t.NWK, "Short address of the parent"),
             t.Param("ExtendedPanId", t.ExtendedPanId, "64-bit extended PAN ID"),
             t.Param("ParentIEEE", t.EUI64, "IEEE address of the parent"),
-            t.Param("Channel", t.Channels, "Current Channel"),
+            t.Param("Channel", t.uint8_t, "Current Channel"),
         ),
     )
 
@@ -82,7 +82,16 @@ CONF_LED_MODE = "led_mode"
 CONF_SKIP_BOOTLOADER = "skip_bootloader"
 CONF_SREQ_TIMEOUT = "sync_request_timeout"
 CONF_ARSP_TIMEOUT = "async_response_timeout"
+CONF_MIN_SREQ_TIMEOUT = "min_sync_request_timeout"
+CONF_MIN_ARSP_TIMEOUT = "min_async_response_timeout"
 CONF_PREFER_ENDPOINT_1 = "prefer_endpoint_1"
+CONF_WATCHDOG_QUIET_PERIOD = "watchdog_quiet_period"
+CONF_MAX_SREQ_TIMEOUTS = "max_consecutive_sync_request_timeouts"
+CONF_MAX_UART_ERRORS = "max_uart_errors_per_minute"
+CONF_PROBE_CACHE_PATH = "probe_cache_path"
+CONF_HOT_ATTACH = "hot_attach"
+CONF_NVRAM_CACHE = "nvram_cache"
+CONF_MAX_CONCURRENT_CALLBACKS = "max_concurrent_callbacks"
 CONF_AUTO_RECONNECT_RETRY_DELAY = "auto_reconnect_retry_delay"
 CONF_CONNECT_RTS_STATES = "connect_rts_pin_states"
 CONF_CONNECT_DTR_STATES = "connect_dtr_pin_states"
@@ -97,10 +106,29 @@ CONFIG_SCHEMA = CONFIG_SCHEMA.extend(
                     ),
                     vol.Optional(CONF_SREQ_TIMEOUT, default=15): VolPositiveNumber,
                     vol.Optional(CONF_ARSP_TIMEOUT, default=30): VolPositiveNumber,
+                    vol.Optional(CONF_MIN_SREQ_TIMEOUT, default=1): VolPositiveNumber,
+                    vol.Optional(CONF_MIN_ARSP_TIMEOUT, default=5): VolPositiveNumber,
                     vol.Optional(
                         CONF_AUTO_RECONNECT_RETRY_DELAY, default=5
                     ): VolPositiveNumber,
+                    vol.Optional(
+                        CONF_WATCHDOG_QUIET_PERIOD, default=10
+                    ): VolPositiveNumber,
+                    vol.Optional(CONF_MAX_SREQ_TIMEOUTS, default=3): vol.All(
+                        int, vol.Range(min=1)
+                    ),
+                    vol.Optional(CONF_MAX_UART_ERRORS, default=10): vol.All(
+                        int, vol.Range(min=1)
+                    ),
                     vol.Optional(CONF_SKIP_BOOTLOADER, default=True): cv_boolean,
+                    vol.Optional(CONF_PROBE_CACHE_PATH, default=None): vol.Any(
+                        None, str
+                    ),
+                    vol.Optional(CONF_HOT_ATTACH, default=False): cv_boolean,
+                    vol.Optional(CONF_NVRAM_CACHE, default=False): cv_boolean,
+                    vol.Optional(CONF_MAX_CONCURRENT_CALLBACKS, default=None): vol.Any(
+                        None, vol.All(int, vol.Range(min=1))
+                    ),
                     vol.Optional(CONF_PREFER_ENDPOINT_1, default=True): cv_boolean,
                     vol.Optional(CONF_LED_MODE, default=LEDMode.OFF): vol.Any(
                         None, EnumValue(LEDMode, transformer=bool_to_upper_str)
@@ -17,3 +17,11 @@ class InvalidCommandResponse(DeliveryError):
     def __init__(self, message, response):
         super().__init__(message)
         self.response = response
+
+
+class RequestExpired(DeliveryError):
+    pass
+
+
+class LinkDegraded(Exception):
+    pass
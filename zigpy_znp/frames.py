@@ -6,6 +6,37 @@ import dataclasses
 import zigpy_znp.types as t
 from zigpy_znp.exceptions import InvalidFrame
 
+# Bit widths used to fold a frame into a single byte, largest first. Frames are at most
+# 255 bytes long so the first fold will always bring them under 1024 bits.
+_FCS_FOLDS = tuple(
+    (bits, (1 << bits) - 1) for bits in (1024, 512, 256, 128, 64, 32, 16, 8)
+)
+
+
+def xor_checksum(data: bytes | bytearray | memoryview) -> int:
+    """
+    Computes the XOR of every byte in `data`, the frame check sequence used by MT.
+    """
+
+    # Short frames are quicker to checksum one byte at a time
+    if len(data) < 32:
+        checksum = 0
+
+        for byte in data:
+            checksum ^= byte
+
+        return checksum
+
+    # Longer ones are folded in half as a single integer until only a byte remains
+    value = int.from_bytes(data, "little")
+    bits = 8 * len(data)
+
+    for fold, mask in _FCS_FOLDS:
+        if bits > fold:
+            value = (value >> fold) ^ (value & mask)
+
+    return value
+
 
 @dataclasses.dataclass(frozen=True)
 class GeneralFrame:
@@ -20,9 +51,9 @@ class GeneralFrame:
         if not isinstance(self.data, t.Bytes):
             object.__setattr__(self, "data", t.Bytes(self.data))
 
-        if self.length > 250:
+        if len(self.data) > 250:
             raise InvalidFrame(
-                f"Frame length cannot exceed 250 bytes. Got: {self.length}"
+                f"Frame length cannot exceed 250 bytes. Got: {len(self.data)}"
             )
 
     @property
@@ -45,8 +76,38 @@ class GeneralFrame:
         payload, data = data[:length], data[length:]
         return cls(header, payload), data
 
+    @functools.cached_property
+    def checksum(self) -> t.uint8_t:
+        """
+        FCS of the serialized frame. Frames are immutable so it is computed only once.
+        """
+
+        return t.uint8_t(
+            len(self.data)
+            ^ (self.header & 0xFF)
+            ^ (self.header >> 8)
+            ^ xor_checksum(self.data)
+        )
+
+    def serialize_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """
+        Serializes the frame into a preallocated buffer, returning the new offset.
+        """
+
+        length = len(self.data)
+
+        buffer[offset] = length
+        buffer[offset + 1] = self.header & 0xFF
+        buffer[offset + 2] = self.header >> 8
+        buffer[offset + 3 : offset + 3 + length] = self.data
+
+        return offset + 3 + length
+
     def serialize(self) -> bytes:
-        return self.length.serialize() + self.header.serialize() + self.data.serialize()
+        buffer = bytearray(3 + len(self.data))
+        self.serialize_into(buffer)
+
+        return bytes(buffer)
 
 
 @dataclasses.dataclass
@@ -84,12 +145,17 @@ class TransportFrame:
         Calculates the FCS of the payload.
         """
 
-        checksum = functools.reduce(lambda a, b: a ^ b, self.payload.serialize())
-        return t.uint8_t(checksum)
+        return self.payload.checksum
 
-    def serialize(self) -> bytes:
-        return (
-            self.SOF.serialize()
-            + self.payload.serialize()
-            + self.checksum().serialize()
-        )
+    def serialize(self) -> bytearray:
+        """
+        Serializes the frame in a single pass into a buffer that can be passed directly
+        to the transport.
+        """
+
+        # [SoF:1] [Length:1] [Command:2] [Data:(Length)] [FCS:1]
+        buffer = bytearray(len(self.payload.data) + 5)
+        buffer[0] = self.SOF
+        buffer[self.payload.serialize_into(buffer, 1)] = self.payload.checksum
+
+        return buffer
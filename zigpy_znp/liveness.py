@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import enum
+import typing
+import asyncio
+import logging
+import collections
+import dataclasses
+
+from zigpy_znp.exceptions import LinkDegraded
+
+LOGGER = logging.getLogger(__name__)
+
+
+class UartError(enum.Enum):
+    # A complete frame was received but its checksum did not match
+    CHECKSUM = "checksum"
+    # Bytes that could not be part of a frame were skipped to find the next SoF
+    RESYNC = "resync"
+
+
+@dataclasses.dataclass(frozen=True)
+class LinkHealth:
+    """
+    Signals used to judge whether the radio is still alive.
+    """
+
+    # Seconds since the last valid frame was received, `None` if none ever was
+    quiet_for: float | None = None
+    frames_received: int = 0
+    checksum_errors: int = 0
+    resyncs: int = 0
+    # UART errors within the last `UART_ERROR_WINDOW` seconds
+    recent_uart_errors: int = 0
+    consecutive_sreq_timeouts: int = 0
+    # SREQs that took longer than their adaptive timeout, answered or not
+    slow_sreqs: int = 0
+    last_srsp_latency: float | None = None
+    max_srsp_latency: float | None = None
+
+
+class LivenessMonitor:
+    """
+    Tracks proof of life from the radio. Every valid frame counts, so the radio only
+    has to be pinged once the link has been quiet for a while. Signs of a failing link
+    are escalated through `on_failure` as soon as they cross their limits, instead of
+    waiting for the next ping.
+    """
+
+    # UART errors are counted within a sliding window of this many seconds
+    UART_ERROR_WINDOW = 60
+
+    def __init__(
+        self,
+        on_failure: typing.Callable[[LinkDegraded], None],
+        *,
+        max_sreq_timeouts: int,
+        max_uart_errors: int,
+    ) -> None:
+        self._on_failure = on_failure
+        self.max_sreq_timeouts = max_sreq_timeouts
+        self.max_uart_errors = max_uart_errors
+
+        self._last_frame_at: float | None = None
+        self._frames_received = 0
+        self._uart_errors: collections.Counter[UartError] = collections.Counter()
+        self._recent_uart_errors: collections.deque[float] = collections.deque()
+        self._consecutive_sreq_timeouts = 0
+        self._slow_sreqs = 0
+        self._last_srsp_latency: float | None = None
+        self._max_srsp_latency: float | None = None
+
+    def frame_received(self) -> None:
+        """
+        Called for every valid frame received from the radio.
+        """
+
+        self._last_frame_at = asyncio.get_running_loop().time()
+        self._frames_received += 1
+
+    def srsp_received(self, latency: float) -> None:
+        """
+        Called when the outstanding SREQ receives its SRSP.
+        """
+
+        self._consecutive_sreq_timeouts = 0
+        self._last_srsp_latency = latency
+
+        if self._max_srsp_latency is None or latency > self._max_srsp_latency:
+            self._max_srsp_latency = latency
+
+    def sreq_slow(self) -> None:
+        """
+        Called when an SREQ takes longer than expected. It may still be answered.
+        """
+
+        self._slow_sreqs += 1
+
+    def sreq_timed_out(self) -> None:
+        """
+        Called when an SREQ that was sent never receives its SRSP.
+        """
+
+        self._consecutive_sreq_timeouts += 1
+
+        if self._consecutive_sreq_timeouts >= self.max_sreq_timeouts:
+            count = self._consecutive_sreq_timeouts
+            self._consecutive_sreq_timeouts = 0
+
+            self._fail(f"{count} consecutive requests were not answered")
+
+    def uart_error(self, error: UartError) -> None:
+        """
+        Called when corrupted data is received from the UART.
+        """
+
+        now = asyncio.get_running_loop().time()
+
+        self._uart_errors[error] += 1
+        self._recent_uart_errors.append(now)
+
+        while self._recent_uart_errors[0] < now - self.UART_ERROR_WINDOW:
+            self._recent_uart_errors.popleft()
+
+        if len(self._recent_uart_errors) >= self.max_uart_errors:
+            count = len(self._recent_uart_errors)
+            self._recent_uart_errors.clear()
+
+            self._fail(
+                f"{count} corrupted frames were received within"
+                f" {self.UART_ERROR_WINDOW} seconds"
+            )
+
+    def _fail(self, reason: str) -> None:
+        LOGGER.warning("Radio link is degraded: %s", reason)
+        self._on_failure(LinkDegraded(reason))
+
+    def quiet_for(self) -> float:
+        """
+        Seconds since the last valid frame was received from the radio.
+        """
+
+        if self._last_frame_at is None:
+            return float("inf")
+
+        return asyncio.get_running_loop().time() - self._last_frame_at
+
+    def health(self) -> LinkHealth:
+        if self._last_frame_at is None:
+            quiet_for = None
+        else:
+            quiet_for = self.quiet_for()
+
+        return LinkHealth(
+            quiet_for=quiet_for,
+            frames_received=self._frames_received,
+            checksum_errors=self._uart_errors[UartError.CHECKSUM],
+            resyncs=self._uart_errors[UartError.RESYNC],
+            recent_uart_errors=len(self._recent_uart_errors),
+            consecutive_sreq_timeouts=self._consecutive_sreq_timeouts,
+            slow_sreqs=self._slow_sreqs,
+            last_srsp_latency=self._last_srsp_latency,
+            max_srsp_latency=self._max_srsp_latency,
+        )
+
+    def reset(self) -> None:
+        self._last_frame_at = None
+        self._frames_received = 0
+        self._uart_errors.clear()
+        self._recent_uart_errors.clear()
+        self._consecutive_sreq_timeouts = 0
+        self._slow_sreqs = 0
+        self._last_srsp_latency = None
+        self._max_srsp_latency = None
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.health()!r}>"
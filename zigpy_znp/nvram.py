@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+import math
+import typing
 import logging
+import functools
 import itertools
+import dataclasses
 
 import zigpy_znp.types as t
 import zigpy_znp.commands as c
@@ -13,12 +19,71 @@ LOGGER = logging.getLogger(__name__)
 # are performed on them.
 PROXIED_NVIDS = {nvids.OsalNvIds.POLL_RATE_OLD16}
 
+# Items that only change when they are written over MT can be cached. Items Z-Stack
+# updates while it is running (the NIB, keys, frame counters, tables) never are.
+CACHED_NVIDS = frozenset(
+    {
+        nvids.OsalNvIds.EXTADDR,
+        nvids.OsalNvIds.STARTUP_OPTION,
+        nvids.OsalNvIds.LOGICAL_TYPE,
+        nvids.OsalNvIds.CONCENTRATOR_ENABLE,
+        nvids.OsalNvIds.CONCENTRATOR_DISCOVERY,
+        nvids.OsalNvIds.CONCENTRATOR_RC,
+        nvids.OsalNvIds.SRC_RTG_EXPIRY_TIME,
+        nvids.OsalNvIds.NWK_CHILD_AGE_ENABLE,
+        nvids.OsalNvIds.BCAST_DELIVERY_TIME,
+        nvids.OsalNvIds.ZDO_DIRECT_CB,
+        nvids.OsalNvIds.TCLK_SEED,
+        nvids.OsalNvIds.HAS_CONFIGURED_ZSTACK1,
+        nvids.OsalNvIds.HAS_CONFIGURED_ZSTACK3,
+        nvids.OsalNvIds.ZIGPY_ZNP_MIGRATION_ID,
+    }
+)
+
+# Z-Stack rewrites these itself when it starts up
+RESET_NVIDS = frozenset({nvids.OsalNvIds.EXTADDR, nvids.OsalNvIds.STARTUP_OPTION})
+
+# 244 bytes is the most you can fit in a single write command
+NVRAM_CHUNK_SIZE = 244
+
+NvKey = typing.Tuple[int, int, int]
+
+
+@dataclasses.dataclass
+class NVRAMCacheCounters:
+    """
+    Reads answered from the NVRAM cache and the requests they would have taken, reads
+    of cacheable items that had to be sent to the radio, and items dropped on reset.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    round_trips_saved: int = 0
+    invalidations: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedNvItem:
+    """
+    Raw contents of an NVRAM item.
+    """
+
+    data: bytes
+
+    # Number of requests it takes to read the item from the radio
+    round_trips: int
+
 
 class NVRAMHelper:
-    def __init__(self, znp):
+    def __init__(self, znp, *, cache: bool = False):
         self.znp = znp
         self.align_structs = None
 
+        # Write-through cache of `CACHED_NVIDS`, by `(sys_id, item_id, sub_id)`
+        self.cache_enabled = cache
+        self._cache: dict[NvKey, CachedNvItem] = {}
+        self._cache_counters = NVRAMCacheCounters()
+
     async def determine_alignment(self) -> None:
         """
         Automatically determine struct memory alignment. Must be called before any
@@ -72,20 +137,121 @@ class NVRAMHelper:
 
         if issubclass(item_type, (t.CStruct, t.BaseListType)):
             assert self.align_structs is not None
-            value, remaining = item_type.deserialize(data, align=self.align_structs)
+            value, offset = t.deserialize_from(
+                item_type, data, align=self.align_structs
+            )
         else:
-            value, remaining = item_type.deserialize(data)
+            value, offset = t.deserialize_from(item_type, data)
 
-        if remaining and not allow_trailing:
-            raise ValueError(f"Data left after deserialization: {remaining!r}")
+        if offset < len(data) and not allow_trailing:
+            raise ValueError(f"Data left after deserialization: {data[offset:]!r}")
 
         return value
 
+    @staticmethod
+    def _osal_key(nv_id: t.uint16_t) -> NvKey:
+        # OSAL items are stored as subitems of `LEGACY` by newer Z-Stack releases
+        return (nvids.NvSysIds.ZSTACK, nvids.ExNvIds.LEGACY, nv_id)
+
+    def _cacheable(self, key: NvKey) -> bool:
+        sys_id, item_id, sub_id = key
+
+        return (
+            self.cache_enabled
+            and sys_id == nvids.NvSysIds.ZSTACK
+            and item_id == nvids.ExNvIds.LEGACY
+            and sub_id in CACHED_NVIDS
+        )
+
+    def _cache_put(self, key: NvKey, data: bytes, *, round_trips: int) -> None:
+        if self._cacheable(key):
+            self._cache[key] = CachedNvItem(bytes(data), round_trips)
+
+    def _cache_written(self, key: NvKey, data: bytes) -> None:
+        # Reading the item back takes a length request and a read for every chunk
+        round_trips = 1 + math.ceil(len(data) / NVRAM_CHUNK_SIZE)
+        self._cache_put(key, data, round_trips=round_trips)
+
+    def _cache_drop(self, key: NvKey) -> None:
+        self._cache.pop(key, None)
+
+    async def _read_through(
+        self,
+        key: NvKey,
+        read: typing.Callable[[], typing.Awaitable[tuple[bytes, int]]],
+    ) -> bytes | None:
+        """
+        Reads the raw contents of an item with `read`, unless they are cached. Returns
+        `None` if the item does not exist.
+
+        Missing items are not cached: they can be created by Z-Stack or by anything
+        else writing to NVRAM without going through this helper.
+        """
+
+        if not self._cacheable(key):
+            data, _ = await read()
+            return data or None
+
+        item = self._cache.get(key)
+
+        if item is not None:
+            self._cache_counters.hits += 1
+            self._cache_counters.round_trips_saved += item.round_trips
+
+            return item.data
+
+        self._cache_counters.misses += 1
+        data, round_trips = await read()
+
+        if not data:
+            return None
+
+        self._cache[key] = CachedNvItem(data, round_trips)
+
+        return data
+
+    def reset_received(self) -> None:
+        """
+        Drops cached items that Z-Stack may have rewritten while starting up.
+        """
+
+        startup_option = self._cache.get(self._osal_key(nvids.OsalNvIds.STARTUP_OPTION))
+
+        # Clearing the state or config on startup recreates most items
+        if startup_option is not None and any(startup_option.data):
+            stale = list(self._cache)
+        else:
+            stale = [key for key in self._cache if key[2] in RESET_NVIDS]
+
+        for key in stale:
+            del self._cache[key]
+
+        self._cache_counters.invalidations += len(stale)
+
+    def ext_addr_changed(self) -> None:
+        """
+        Drops the cached `EXTADDR` item, which `SYS.SetExtAddr` writes without going
+        through this helper.
+        """
+
+        if self._cache.pop(self._osal_key(nvids.OsalNvIds.EXTADDR), None) is not None:
+            self._cache_counters.invalidations += 1
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._cache_counters = NVRAMCacheCounters()
+
+    def cache_counters(self) -> NVRAMCacheCounters:
+        return dataclasses.replace(self._cache_counters)
+
     async def osal_delete(self, nv_id: t.uint16_t) -> bool:
         """
         Deletes an item from NVRAM. Returns whether or not the item existed.
         """
 
+        key = self._osal_key(nv_id)
+        self._cache_drop(key)
+
         length = (await self.znp.request(c.SYS.OSALNVLength.Req(Id=nv_id))).ItemLen
 
         if length == 0:
@@ -95,7 +261,10 @@ class NVRAMHelper:
             c.SYS.OSALNVDelete.Req(Id=nv_id, ItemLen=length)
         )
 
-        return delete_rsp.Status == t.Status.SUCCESS
+        if delete_rsp.Status != t.Status.SUCCESS:
+            return False
+
+        return True
 
     async def osal_write(self, nv_id: t.uint16_t, value, *, create: bool = False):
         """
@@ -106,6 +275,11 @@ class NVRAMHelper:
         """
 
         value = self.serialize(value)
+
+        # Nothing is cached while the write is in progress, in case it fails
+        key = self._osal_key(nv_id)
+        self._cache_drop(key)
+
         length = (await self.znp.request(c.SYS.OSALNVLength.Req(Id=nv_id))).ItemLen
 
         # Recreate the item if the length is not correct
@@ -135,15 +309,19 @@ class NVRAMHelper:
             )
 
         # 244 bytes is the most you can fit in a single `SYS.OSALNVWriteExt` command
-        for offset in range(0, len(value), 244):
-            await self.znp.request(
+        await self.znp.request_many(
+            [
                 c.SYS.OSALNVWriteExt.Req(
                     Id=nv_id,
                     Offset=offset,
                     Value=t.ShortBytes(value[offset : offset + 244]),
-                ),
-                RspStatus=t.Status.SUCCESS,
-            )
+                )
+                for offset in range(0, len(value), 244)
+            ],
+            RspStatus=t.Status.SUCCESS,
+        )
+
+        self._cache_written(key, value)
 
     async def osal_read(self, nv_id: t.uint16_t, *, item_type):
         """
@@ -164,11 +342,29 @@ class NVRAMHelper:
 
             return value
 
+        data = await self._read_through(
+            self._osal_key(nv_id), functools.partial(self._osal_read_data, nv_id)
+        )
+
+        if data is None:
+            raise KeyError(f"NV item does not exist: {nv_id!r}")
+
+        value = self.deserialize(data, item_type)
+        LOGGER.debug('Read NVRAM["LEGACY"][0x%04x] = %r', nv_id, value)
+
+        return value
+
+    async def _osal_read_data(self, nv_id: t.uint16_t) -> tuple[bytes, int]:
+        """
+        Reads the raw contents of an item, along with the number of requests it took.
+        """
+
         # Every item has a length, even missing ones
         length = (await self.znp.request(c.SYS.OSALNVLength.Req(Id=nv_id))).ItemLen
+        round_trips = 1
 
         if length == 0:
-            raise KeyError(f"NV item does not exist: {nv_id!r}")
+            return b"", round_trips
 
         data = b""
 
@@ -178,6 +374,7 @@ class NVRAMHelper:
                     c.SYS.OSALNVReadExt.Req(Id=nv_id, Offset=len(data)),
                     RspStatus=t.Status.SUCCESS,
                 )
+                round_trips += 1
 
                 data += read_rsp.Value
         except InvalidCommandResponse as e:
@@ -197,15 +394,13 @@ class NVRAMHelper:
                 RspStatus=t.Status.SUCCESS,
                 RspConfigId=nv_id,
             )
+            round_trips += 2
 
             data = read_rsp.Value
 
         assert len(data) == length
 
-        value = self.deserialize(data, item_type)
-        LOGGER.debug('Read NVRAM["LEGACY"][0x%04x] = %r', nv_id, value)
-
-        return value
+        return data, round_trips
 
     async def delete(
         self,
@@ -218,11 +413,17 @@ class NVRAMHelper:
         Deletes a subitem from NVRAM. Returns whether or not the item existed.
         """
 
+        key = (sys_id, item_id, sub_id)
+        self._cache_drop(key)
+
         delete_rsp = await self.znp.request(
             c.SYS.NVDelete.Req(SysId=sys_id, ItemId=item_id, SubId=sub_id)
         )
 
-        return delete_rsp.Status == t.Status.SUCCESS
+        if delete_rsp.Status != t.Status.SUCCESS:
+            return False
+
+        return True
 
     async def write(
         self,
@@ -241,6 +442,11 @@ class NVRAMHelper:
         """
 
         value = self.serialize(value)
+
+        # Nothing is cached while the write is in progress, in case it fails
+        key = (sys_id, item_id, sub_id)
+        self._cache_drop(key)
+
         length = (
             await self.znp.request(
                 c.SYS.NVLength.Req(SysId=sys_id, ItemId=item_id, SubId=sub_id)
@@ -283,17 +489,21 @@ class NVRAMHelper:
                 raise InvalidCommandResponse("Bad create status", create_rsp)
 
         # 244 bytes is the most you can fit in a single `SYS.NVWrite` command
-        for offset in range(0, len(value), 244):
-            await self.znp.request(
+        await self.znp.request_many(
+            [
                 c.SYS.NVWrite.Req(
                     SysId=sys_id,
                     ItemId=item_id,
                     SubId=sub_id,
                     Value=t.ShortBytes(value[offset : offset + 244]),
                     Offset=0,
-                ),
-                RspStatus=t.Status.SUCCESS,
-            )
+                )
+                for offset in range(0, len(value), 244)
+            ],
+            RspStatus=t.Status.SUCCESS,
+        )
+
+        self._cache_written(key, value)
 
     async def read(
         self,
@@ -312,17 +522,37 @@ class NVRAMHelper:
         Raises an `KeyError` error if the NVID doesn't exist.
         """
 
-        length_rsp = await self.znp.request(
-            c.SYS.NVLength.Req(SysId=sys_id, ItemId=item_id, SubId=sub_id)
+        data = await self._read_through(
+            (sys_id, item_id, sub_id),
+            functools.partial(
+                self._read_data, sys_id=sys_id, item_id=item_id, sub_id=sub_id
+            ),
         )
-        length = length_rsp.Length
 
-        if length == 0:
+        if data is None:
             raise KeyError(
                 f"NV item does not exist:"
                 f" sys_id={sys_id!r} item_id={item_id!r} sub_id={sub_id!r}"
             )
 
+        value = self.deserialize(data, item_type)
+        LOGGER.debug("Read NVRAM[%s][%s][0x%04x] = %r", sys_id, item_id, sub_id, value)
+
+        return value
+
+    async def _read_data(
+        self, *, sys_id: t.uint8_t, item_id: t.uint16_t, sub_id: t.uint16_t
+    ) -> tuple[bytes, int]:
+        """
+        Reads the raw contents of a subitem, along with the number of requests it took.
+        """
+
+        length_rsp = await self.znp.request(
+            c.SYS.NVLength.Req(SysId=sys_id, ItemId=item_id, SubId=sub_id)
+        )
+        length = length_rsp.Length
+        round_trips = 1
+
         data = b""
 
         while len(data) < length:
@@ -336,15 +566,13 @@ class NVRAMHelper:
                 ),
                 RspStatus=t.Status.SUCCESS,
             )
+            round_trips += 1
 
             data += read_rsp.Value
 
         assert len(data) == length
 
-        value = self.deserialize(data, item_type)
-        LOGGER.debug("Read NVRAM[%s][%s][0x%04x] = %r", sys_id, item_id, sub_id, value)
-
-        return value
+        return data, round_trips
 
     async def write_table(
         self,
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import json
+import typing
+import logging
+import pathlib
+import dataclasses
+
+import zigpy_znp.types as t
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectProbe:
+    """
+    Everything learned by probing a radio when connecting to it, along with what
+    identifies the radio and its firmware.
+    """
+
+    ieee: t.EUI64
+    code_revision: int | None
+    capabilities: t.MTCapabilities
+    align_structs: bool
+    zstack_version: float
+
+    # Pin states that were toggled before the radio responded
+    dtr_states: tuple[bool, ...]
+    rts_states: tuple[bool, ...]
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        return {
+            "ieee": str(self.ieee),
+            "code_revision": self.code_revision,
+            "capabilities": int(self.capabilities),
+            "align_structs": self.align_structs,
+            "zstack_version": self.zstack_version,
+            "dtr_states": list(self.dtr_states),
+            "rts_states": list(self.rts_states),
+        }
+
+    @classmethod
+    def from_dict(cls, obj: dict[str, typing.Any]) -> ConnectProbe:
+        return cls(
+            ieee=t.EUI64.convert(obj["ieee"]),
+            code_revision=obj["code_revision"],
+            capabilities=t.MTCapabilities(obj["capabilities"]),
+            align_structs=bool(obj["align_structs"]),
+            zstack_version=float(obj["zstack_version"]),
+            dtr_states=tuple(bool(s) for s in obj["dtr_states"]),
+            rts_states=tuple(bool(s) for s in obj["rts_states"]),
+        )
+
+
+class ProbeCache:
+    """
+    JSON file holding the last successful probe of the radio on each serial port. A
+    missing or unreadable file is treated as empty.
+
+    Reading and writing block, so these methods should be run in an executor.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = pathlib.Path(path)
+
+    def _read(self) -> dict[str, typing.Any]:
+        try:
+            obj = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            LOGGER.debug("Ignoring unreadable probe cache %s: %r", self.path, e)
+            return {}
+
+        if not isinstance(obj, dict):
+            return {}
+
+        return obj
+
+    def _write(self, obj: dict[str, typing.Any]) -> None:
+        # The file is replaced atomically so that it is never left half-written
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+        try:
+            tmp_path.write_text(json.dumps(obj, indent=4, sort_keys=True))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            LOGGER.warning("Failed to write probe cache %s: %r", self.path, e)
+
+    def get(self, port: str) -> ConnectProbe | None:
+        try:
+            return ConnectProbe.from_dict(self._read()[port])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def put(self, port: str, probe: ConnectProbe) -> None:
+        obj = self._read()
+        obj[port] = probe.as_dict()
+
+        self._write(obj)
+
+    def discard(self, port: str) -> None:
+        obj = self._read()
+
+        if obj.pop(port, None) is not None:
+            self._write(obj)
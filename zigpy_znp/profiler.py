@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import typing
+import asyncio
+import logging
+import contextlib
+import dataclasses
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class StartupPhase:
+    """
+    Wall time spent in a single phase of startup and the number of SREQs it sent.
+    """
+
+    name: str
+    duration: float
+    sreqs: int
+
+
+class StartupProfiler:
+    """
+    Records the phases of connecting to the radio and starting the network, in the
+    order they finished. Phases are not expected to be nested.
+    """
+
+    def __init__(self) -> None:
+        self._phases: list[StartupPhase] = []
+        self._sreqs = 0
+        self._active = 0
+
+    def sreq_sent(self) -> None:
+        """
+        Called for every SREQ written to the radio. Only those sent during a phase are
+        counted.
+        """
+
+        if self._active:
+            self._sreqs += 1
+
+    @contextlib.asynccontextmanager
+    async def phase(self, name: str) -> typing.AsyncIterator[None]:
+        """
+        Times the body of the context manager, even if it fails.
+        """
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sreqs = self._sreqs
+        self._active += 1
+
+        try:
+            yield
+        finally:
+            self._active -= 1
+            phase = StartupPhase(
+                name=name,
+                duration=loop.time() - start,
+                sreqs=self._sreqs - sreqs,
+            )
+            self._phases.append(phase)
+
+            LOGGER.debug(
+                "Startup phase %r took %0.3fs and %d requests",
+                phase.name,
+                phase.duration,
+                phase.sreqs,
+            )
+
+    def phases(self) -> list[StartupPhase]:
+        return list(self._phases)
+
+    def reset(self) -> None:
+        self._phases.clear()
+        self._sreqs = 0
+        self._active = 0
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} phases={self._phases!r}>"
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import typing
+import asyncio
+import logging
+import collections
+import dataclasses
+
+import zigpy_znp.types as t
+import zigpy_znp.commands as c
+
+if typing.TYPE_CHECKING:
+    from zigpy_znp.scheduler import PendingRequest
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class RequestPolicy:
+    """
+    How identical read-only requests are combined. Concurrent requests always share a
+    single exchange with the radio, unless a request of an `invalidated_by` type is
+    sent between them. If a `ttl` is set, successful responses are also reused for
+    that many seconds, until such a request is sent.
+    """
+
+    ttl: float | None = None
+    invalidated_by: frozenset[type[t.CommandBase]] = frozenset()
+
+
+REQUEST_POLICIES: dict[type[t.CommandBase], RequestPolicy] = {
+    # These only change when the radio is reset or told to change them
+    c.SYS.Version.Req: RequestPolicy(ttl=600),
+    c.SYS.GetExtAddr.Req: RequestPolicy(
+        ttl=600, invalidated_by=frozenset({c.SYS.SetExtAddr.Req})
+    ),
+    # Z-Stack creates and deletes NVRAM items on its own, lengths are only coalesced
+    c.SYS.OSALNVLength.Req: RequestPolicy(
+        invalidated_by=frozenset(
+            {
+                c.SYS.OSALNVItemInit.Req,
+                c.SYS.OSALNVWrite.Req,
+                c.SYS.OSALNVWriteExt.Req,
+                c.SYS.OSALNVDelete.Req,
+            }
+        )
+    ),
+    c.SYS.NVLength.Req: RequestPolicy(
+        invalidated_by=frozenset(
+            {c.SYS.NVCreate.Req, c.SYS.NVWrite.Req, c.SYS.NVDelete.Req}
+        )
+    ),
+    # These change along with the network
+    c.UTIL.GetDeviceInfo.Req: RequestPolicy(
+        invalidated_by=frozenset(
+            {
+                c.SYS.SetExtAddr.Req,
+                c.UTIL.AssocAdd.Req,
+                c.UTIL.AssocRemove.Req,
+                c.ZDO.StartupFromApp.Req,
+                c.AppConfig.BDBStartCommissioning.Req,
+            }
+        )
+    ),
+    c.UTIL.AssocGetWithAddress.Req: RequestPolicy(
+        invalidated_by=frozenset({c.UTIL.AssocAdd.Req, c.UTIL.AssocRemove.Req})
+    ),
+    c.ZDO.ExtRouteChk.Req: RequestPolicy(
+        invalidated_by=frozenset({c.ZDO.ExtRouteDisc.Req})
+    ),
+}
+
+
+@dataclasses.dataclass
+class RequestCacheCounters:
+    """
+    Number of requests of a single type that were answered from the cache, had to be
+    sent, joined an identical request that was already in flight, or were dropped
+    from the cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    invalidations: int = 0
+
+
+class _Waiter(asyncio.Future):
+    """
+    Future of a single caller waiting for a shared request. Unlike a shielded future,
+    cancelling it takes effect immediately, before the scheduler can send the request.
+    """
+
+    def __init__(self, in_flight: InFlightRequest) -> None:
+        super().__init__()
+        self._in_flight = in_flight
+
+    def cancel(self, *args, **kwargs) -> bool:
+        if not super().cancel(*args, **kwargs):
+            return False
+
+        self._in_flight.waiter_cancelled()
+        return True
+
+
+class InFlightRequest:
+    """
+    A request sent on behalf of every caller waiting for its response. It is abandoned
+    once the last of them is cancelled.
+    """
+
+    __slots__ = ("pending", "options", "waiters", "generation", "_abandon")
+
+    def __init__(
+        self,
+        pending: PendingRequest,
+        options: typing.Hashable,
+        generation: int,
+        abandon: typing.Callable[[PendingRequest], None],
+    ) -> None:
+        self.pending = pending
+        self.options = options
+        self.waiters = 0
+        self.generation = generation
+        self._abandon = abandon
+
+    def wait(self) -> asyncio.Future:
+        waiter = _Waiter(self)
+        self.waiters += 1
+
+        def copy_result(future: asyncio.Future) -> None:
+            if waiter.done():
+                return
+            elif future.cancelled():
+                waiter.cancel()
+            elif future.exception() is not None:
+                waiter.set_exception(future.exception())
+            else:
+                waiter.set_result(future.result())
+
+        self.pending.future.add_done_callback(copy_result)
+
+        return waiter
+
+    def waiter_cancelled(self) -> None:
+        self.waiters -= 1
+
+        if self.waiters == 0 and not self.pending.future.done():
+            self._abandon(self.pending)
+
+
+class RequestCache:
+    """
+    Coalesces identical in-flight requests and caches their responses according to a
+    policy for each request type. Cached responses form a bounded LRU.
+    """
+
+    MAX_SIZE = 256
+
+    def __init__(
+        self, policies: dict[type[t.CommandBase], RequestPolicy] = REQUEST_POLICIES
+    ) -> None:
+        self._policies = policies
+
+        # Request types whose cached responses are dropped by each type of request
+        self._invalidates: dict[type[t.CommandBase], set[type[t.CommandBase]]] = {}
+
+        for request_type, policy in policies.items():
+            for write_type in policy.invalidated_by:
+                self._invalidates.setdefault(write_type, set()).add(request_type)
+
+        self._cache: collections.OrderedDict[
+            t.CommandBase, tuple[float, t.CommandBase]
+        ] = collections.OrderedDict()
+        self._in_flight: dict[t.CommandBase, InFlightRequest] = {}
+        self._counters: collections.defaultdict[
+            t.CommandHeader, RequestCacheCounters
+        ] = collections.defaultdict(RequestCacheCounters)
+
+        # Incremented on every invalidation, so responses to requests sent before it
+        # are not cached
+        self._generation = 0
+
+    def policy(self, request: t.CommandBase) -> RequestPolicy | None:
+        return self._policies.get(type(request))
+
+    def get(self, request: t.CommandBase) -> t.CommandBase | None:
+        """
+        Returns a cached response that has not expired yet.
+        """
+
+        entry = self._cache.get(request)
+
+        if entry is not None:
+            expires, response = entry
+
+            if asyncio.get_running_loop().time() < expires:
+                self._cache.move_to_end(request)
+                self._counters[request.header].hits += 1
+                return response
+
+            del self._cache[request]
+
+        return None
+
+    def join(
+        self, request: t.CommandBase, options: typing.Hashable = None
+    ) -> InFlightRequest | None:
+        """
+        Returns the identical request currently in flight, if there is one and it was
+        sent with the same `options`, like its priority and timeout.
+        """
+
+        in_flight = self._in_flight.get(request)
+
+        if in_flight is None or in_flight.options != options:
+            return None
+
+        self._counters[request.header].coalesced += 1
+
+        return in_flight
+
+    def track(
+        self,
+        request: t.CommandBase,
+        pending: PendingRequest,
+        *,
+        options: typing.Hashable = None,
+        abandon: typing.Callable[[PendingRequest], None],
+    ) -> InFlightRequest:
+        """
+        Records a request that was just sent so that identical requests with the same
+        `options` can join it. `abandon` is called once every caller waiting for it has
+        been cancelled.
+        """
+
+        self._counters[request.header].misses += 1
+
+        in_flight = InFlightRequest(pending, options, self._generation, abandon)
+        self._in_flight[request] = in_flight
+        pending.future.add_done_callback(
+            lambda future: self._request_done(request, in_flight, future)
+        )
+
+        return in_flight
+
+    def _request_done(
+        self,
+        request: t.CommandBase,
+        in_flight: InFlightRequest,
+        future: asyncio.Future,
+    ) -> None:
+        if self._in_flight.get(request) is in_flight:
+            del self._in_flight[request]
+
+        policy = self._policies[type(request)]
+
+        if (
+            policy.ttl is None
+            or future.cancelled()
+            or future.exception() is not None
+            or not isinstance(future.result(), request.Rsp)
+            or in_flight.generation != self._generation
+        ):
+            return
+
+        expires = asyncio.get_running_loop().time() + policy.ttl
+        self._cache[request] = (expires, future.result())
+        self._cache.move_to_end(request)
+
+        if len(self._cache) > self.MAX_SIZE:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, request: t.CommandBase) -> None:
+        """
+        Drops cached responses that a request about to be sent will make stale.
+        """
+
+        targets = self._invalidates.get(type(request))
+
+        if targets is None:
+            return
+
+        self._generation += 1
+
+        for cached in [r for r in self._cache if type(r) in targets]:
+            del self._cache[cached]
+            self._counters[cached.header].invalidations += 1
+
+        # Requests sent from now on must not join ones that were sent before
+        for in_flight in [r for r in self._in_flight if type(r) in targets]:
+            del self._in_flight[in_flight]
+
+    def clear(self) -> None:
+        """
+        Drops every cached response, when the radio resets.
+
+        Requests in flight are forgotten without being failed: callers already waiting
+        on them still receive their responses, which are not cached. Identical requests
+        sent after the reset start a new exchange with the radio instead of joining
+        them, even while the old ones are still outstanding.
+        """
+
+        self._generation += 1
+
+        for cached in self._cache:
+            self._counters[cached.header].invalidations += 1
+
+        self._cache.clear()
+        self._in_flight.clear()
+
+    def counters(self) -> dict[t.CommandHeader, RequestCacheCounters]:
+        return {
+            header: dataclasses.replace(counters)
+            for header, counters in self._counters.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}"
+            f" cached={len(self._cache)}"
+            f" in_flight={len(self._in_flight)}"
+            f">"
+        )
@@ -0,0 +1,482 @@
+from __future__ import annotations
+
+import enum
+import heapq
+import typing
+import asyncio
+import logging
+import functools
+import itertools
+
+import zigpy_znp.types as t
+import zigpy_znp.logger as log
+from zigpy_znp.utils import DeadlineQueue, ListenerRegistry, OneShotResponseListener
+from zigpy_znp.exceptions import RequestExpired
+
+if typing.TYPE_CHECKING:
+    from zigpy_znp.uart import ZnpMtProtocol
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PriorityClass(enum.IntEnum):
+    """
+    Class of service of a request, from least to most urgent.
+    """
+
+    # Topology scans, binding and reporting configuration
+    MAINTENANCE = 0
+    # OTA blocks and other transfers that can take their time
+    BULK = 1
+    NORMAL = 2
+    # Commands sent on behalf of a user, like toggling a light
+    INTERACTIVE = 3
+
+
+# Share of the radio each class gets when all of them are backlogged
+PRIORITY_CLASS_WEIGHTS = {
+    PriorityClass.MAINTENANCE: 1,
+    PriorityClass.BULK: 2,
+    PriorityClass.NORMAL: 4,
+    PriorityClass.INTERACTIVE: 8,
+}
+
+
+class WeightedFairShare:
+    """
+    Start-time fair queuing: every request is tagged with the virtual time at which it
+    should start, which advances more slowly for classes with a higher weight. Serving
+    requests in order of their tags lets an urgent request skip ahead of a backlog of
+    less urgent ones without ever starving them.
+    """
+
+    def __init__(self, weights: dict[typing.Hashable, float]) -> None:
+        self._weights = weights
+        self._finish_times: dict[typing.Hashable, float] = {}
+        self._virtual_time = 0.0
+
+    def tag(self, key: typing.Hashable) -> float:
+        """
+        Returns the start tag of a new request of the given class.
+        """
+
+        start = max(self._virtual_time, self._finish_times.get(key, 0.0))
+        self._finish_times[key] = start + 1 / self._weights[key]
+
+        return start
+
+    def served(self, tag: float) -> None:
+        """
+        Advances the virtual time once a request starts being served.
+        """
+
+        if tag > self._virtual_time:
+            self._virtual_time = tag
+
+    def reset(self) -> None:
+        self._finish_times.clear()
+        self._virtual_time = 0.0
+
+
+class RequestBatch:
+    """
+    Requests that were queued together. If the batch stops on errors, the first request
+    to fail cancels every request after it before any of them can be sent.
+    """
+
+    def __init__(self, *, stop_on_error: bool) -> None:
+        self.stop_on_error = stop_on_error
+        self.requests: list[PendingRequest] = []
+
+    def cancel(self) -> None:
+        """
+        Cancels every request in the batch that has not completed yet.
+        """
+
+        for entry in self.requests:
+            if not entry.future.done():
+                entry.future.cancel()
+            elif not entry.future.cancelled():
+                # Nobody will look at the results of requests that were not awaited
+                entry.future.exception()
+
+
+class PendingRequest:
+    """
+    A request that has been encoded and is waiting to be sent to the radio.
+    """
+
+    __slots__ = (
+        "request",
+        "data",
+        "priority",
+        "priority_class",
+        "tag",
+        "timeout",
+        "slow_timeout",
+        "expected",
+        "batch",
+        "listener",
+        "future",
+        "sent_at",
+    )
+
+    def __init__(
+        self,
+        request: t.CommandBase,
+        data: bytes | bytearray,
+        *,
+        priority: int,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        tag: float = 0.0,
+        timeout: float,
+        slow_timeout: float | None = None,
+        responses: list[t.CommandBase] | None,
+        expected: t.CommandBase | None = None,
+        batch: RequestBatch | None = None,
+    ) -> None:
+        self.request = request
+        self.data = data
+        self.priority = priority
+        self.priority_class = priority_class
+        self.tag = tag
+        self.timeout = timeout
+        self.slow_timeout = slow_timeout
+        self.expected = expected
+        self.batch = batch
+
+        # Event loop time when the request was written out
+        self.sent_at: float | None = None
+
+        # Requests without a response resolve their future once they have been sent
+        if responses:
+            self.listener = OneShotResponseListener(responses)
+            self.future = self.listener.future
+        else:
+            self.listener = None
+            self.future = asyncio.get_running_loop().create_future()
+
+        if batch is not None:
+            batch.requests.append(self)
+
+    def failed(self) -> bool:
+        """
+        Whether the request completed without the response it expected.
+        """
+
+        if self.future.cancelled() or self.future.exception() is not None:
+            return True
+
+        return self.expected is not None and not self.expected.matches(
+            self.future.result()
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}"
+            f" request={self.request!r}"
+            f" priority={self.priority}"
+            f" priority_class={self.priority_class.name}"
+            f" done={self.future.done()}"
+            f">"
+        )
+
+
+class RequestScheduler:
+    """
+    Sends requests to the radio in order of priority while keeping at most one SREQ
+    outstanding, as required by the MT specification.
+
+    Requests are encoded before they are queued. When the SRSP of the outstanding SREQ
+    is received, the next queued request is written out from within the same
+    `data_received` call instead of waiting for its sender to be woken up.
+
+    Requests with the same priority share the radio between their priority classes
+    according to `PRIORITY_CLASS_WEIGHTS`, FIFO within a single class.
+
+    The scheduler does not know about ZNP: it is given the current UART, the listener
+    registry and deadline queue to use, and hooks called when a SREQ is sent, gets its
+    SRSP (along with the round-trip time), is slower than expected or times out.
+    """
+
+    def __init__(
+        self,
+        *,
+        uart: typing.Callable[[], ZnpMtProtocol | None],
+        listeners: ListenerRegistry,
+        deadlines: DeadlineQueue,
+        on_sreq_sent: typing.Callable[[t.CommandBase], None],
+        on_srsp: typing.Callable[[t.CommandBase, float], None],
+        on_sreq_slow: typing.Callable[[t.CommandBase], None],
+        on_sreq_timeout: typing.Callable[[t.CommandBase], None],
+    ) -> None:
+        self._uart = uart
+        self._listeners = listeners
+        self._deadlines = deadlines
+        self._on_sreq_sent = on_sreq_sent
+        self._on_srsp = on_srsp
+        self._on_sreq_slow = on_sreq_slow
+        self._on_sreq_timeout = on_sreq_timeout
+
+        # Heap of `(-priority, tag, order, request)`
+        self._queue: list[tuple[int, float, int, PendingRequest]] = []
+        self._counter = itertools.count()
+        self._fair_share = WeightedFairShare(PRIORITY_CLASS_WEIGHTS)
+
+        self._outstanding: PendingRequest | None = None
+        self._drain_task: asyncio.Task | None = None
+
+    @property
+    def outstanding(self) -> PendingRequest | None:
+        """
+        The SREQ that has been sent and is still waiting for its SRSP.
+        """
+
+        return self._outstanding
+
+    def submit(
+        self,
+        request: t.CommandBase,
+        data: bytes | bytearray,
+        *,
+        priority: int,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        timeout: float,
+        slow_timeout: float | None = None,
+        responses: list[t.CommandBase] | None = None,
+        expected: t.CommandBase | None = None,
+        batch: RequestBatch | None = None,
+        deadline: float | None = None,
+        immediate: bool = False,
+    ) -> PendingRequest:
+        """
+        Queues an encoded request. Its future resolves to the first command
+        matching any of `responses` or to `None` once the request is sent, if there
+        are no responses to wait for. Responses that do not match `expected` fail the
+        request's `batch`.
+
+        A SREQ fails if it is not answered within `timeout` seconds. If it is still
+        waiting for its SRSP after a shorter `slow_timeout`, the radio is only reported
+        to be slow: the SREQ keeps the radio busy and can still succeed.
+
+        Requests still queued at their `deadline`, in event loop time, are dropped
+        with `RequestExpired`. `immediate` requests are sent right away, even if a SREQ
+        is outstanding.
+        """
+
+        entry = PendingRequest(
+            request,
+            data,
+            priority=priority,
+            priority_class=priority_class,
+            tag=self._fair_share.tag(priority_class),
+            timeout=timeout,
+            slow_timeout=slow_timeout,
+            responses=responses,
+            expected=expected,
+            batch=batch,
+        )
+        entry.future.add_done_callback(lambda _: self._request_done(entry))
+
+        if immediate:
+            self._send(entry, outstanding=False)
+            return entry
+
+        if deadline is not None:
+            remaining = deadline - asyncio.get_running_loop().time()
+
+            if remaining <= 0:
+                self._drop_expired(entry)
+                return entry
+
+            self._deadlines.add(
+                entry.future, remaining, functools.partial(self._drop_expired, entry)
+            )
+
+        heapq.heappush(self._queue, (-priority, entry.tag, next(self._counter), entry))
+        self._dispatch()
+
+        return entry
+
+    def cancel(self, entry: PendingRequest) -> None:
+        """
+        Cancels a request, unregistering its response listener right away.
+        """
+
+        if entry.listener is not None:
+            self._listeners.remove(entry.listener)
+
+        entry.future.cancel()
+
+    def response_received(self) -> None:
+        """
+        Called synchronously by ZNP after every SRSP has been passed to the listeners.
+        If it completed the outstanding SREQ, the next request is sent immediately.
+        """
+
+        entry = self._outstanding
+
+        if entry is not None and entry.future.done():
+            assert entry.sent_at is not None
+            latency = asyncio.get_running_loop().time() - entry.sent_at
+
+            self._on_srsp(entry.request, latency)
+            self._release(entry)
+
+    def _request_done(self, entry: PendingRequest) -> None:
+        # Requests that time out or are cancelled must still free up the radio
+        if entry is self._outstanding:
+            self._release(entry)
+
+    def _drop_expired(self, entry: PendingRequest) -> None:
+        # Requests that have already been sent will time out on their own
+        if entry.sent_at is not None:
+            return
+
+        LOGGER.debug("Dropping request that expired before it was sent: %s", entry)
+        entry.future.set_exception(
+            RequestExpired(f"Request expired before it could be sent: {entry.request}")
+        )
+
+    def _slow(self, entry: PendingRequest) -> None:
+        LOGGER.debug("Request is taking longer than expected: %s", entry)
+        self._on_sreq_slow(entry.request)
+
+    def _expire(self, entry: PendingRequest) -> None:
+        entry.future.set_exception(asyncio.TimeoutError())
+        self._on_sreq_timeout(entry.request)
+
+        # Free up the radio right away instead of waiting for the done callback
+        if entry is self._outstanding:
+            self._release(entry)
+
+    def _release(self, entry: PendingRequest) -> None:
+        # The rest of the batch must not be sent once a request in it has failed
+        if entry.batch is not None and entry.batch.stop_on_error and entry.failed():
+            entry.batch.cancel()
+
+        self._outstanding = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Sends queued requests until a SREQ is outstanding or the queue is empty.
+        """
+
+        while self._outstanding is None and self._queue:
+            uart = self._uart()
+
+            if uart is None:
+                self._fail_queued()
+                return
+
+            # Apply backpressure if the transport or the radio cannot keep up
+            if not uart.tx_ready():
+                self._wait_for_uart(uart)
+                return
+
+            *_, entry = heapq.heappop(self._queue)
+
+            # Requests whose senders gave up while they were queued are dropped
+            if entry.future.done():
+                continue
+
+            self._fair_share.served(entry.tag)
+
+            self._send(entry)
+
+    def _send(self, entry: PendingRequest, *, outstanding: bool = True) -> None:
+        uart = self._uart()
+
+        if uart is None:
+            entry.future.set_exception(
+                RuntimeError("Coordinator is disconnected, cannot send request")
+            )
+            return
+
+        LOGGER.debug("Sending request: %s", entry.request)
+        entry.sent_at = asyncio.get_running_loop().time()
+
+        if entry.listener is None:
+            LOGGER.debug("Request has no response, not waiting for one.")
+            uart.write(entry.data)
+            entry.future.set_result(None)
+            return
+
+        self._on_sreq_sent(entry.request)
+
+        # The slot and the response listener have to exist before the request is sent:
+        # the SRSP can be received before `write` returns
+        if outstanding:
+            self._outstanding = entry
+
+        LOGGER.log(log.TRACE, "Creating one-shot listener %s", entry.listener)
+        self._listeners.add(entry.listener)
+
+        # Remove the listener when the future is done, not only when it gets a result
+        entry.future.add_done_callback(lambda _: self._listeners.remove(entry.listener))
+
+        # We should get a SRSP in a reasonable amount of time
+        self._deadlines.add(
+            entry.future, entry.timeout, functools.partial(self._expire, entry)
+        )
+
+        if entry.slow_timeout is not None and entry.slow_timeout < entry.timeout:
+            self._deadlines.add(
+                entry.future, entry.slow_timeout, functools.partial(self._slow, entry)
+            )
+
+        uart.write(entry.data)
+
+    def _wait_for_uart(self, uart) -> None:
+        if self._drain_task is not None:
+            return
+
+        async def drain() -> None:
+            try:
+                await uart.drain()
+            finally:
+                self._drain_task = None
+
+            self._dispatch()
+
+        self._drain_task = asyncio.create_task(drain())
+
+    def _fail_queued(self) -> None:
+        queue, self._queue = self._queue, []
+
+        for *_, entry in queue:
+            if not entry.future.done():
+                entry.future.set_exception(
+                    RuntimeError("Coordinator is disconnected, cannot send request")
+                )
+
+    def close(self) -> None:
+        """
+        Fails every queued request and forgets the outstanding one.
+        """
+
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+
+        self._outstanding = None
+        self._fail_queued()
+        self._fair_share.reset()
+
+    def __len__(self) -> int:
+        """
+        Number of requests that are queued or outstanding.
+        """
+
+        queued = sum(not entry.future.done() for *_, entry in self._queue)
+
+        return queued + (self._outstanding is not None)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}"
+            f" outstanding={self._outstanding!r}"
+            f" queued={len(self._queue)}"
+            f">"
+        )
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import struct
 import typing
+import functools
 
+import zigpy.types as zigpy_t
 from zigpy.types import int8s, uint8_t, enum_factory  # noqa: F401
 
-from zigpy_znp.types.cstruct import CStruct
+from zigpy_znp.types.cstruct import CStruct, CStructArray, int_converter, struct_format
 
 if typing.TYPE_CHECKING:
     import enum
@@ -53,6 +56,60 @@ else:
         pass
 
 
+@functools.lru_cache(maxsize=None)
+def int_unpacker(
+    obj_type: type,
+) -> tuple[struct.Struct, typing.Callable[[int], int]] | None:
+    """
+    Returns a `struct` unpacker and converter for fixed-width integer types that are
+    deserialized like any other integer, or `None` for every other type.
+    """
+
+    if (
+        not issubclass(obj_type, zigpy_t.FixedIntType)
+        or obj_type.deserialize.__func__
+        is not zigpy_t.FixedIntType.deserialize.__func__
+    ):
+        return None
+
+    code = struct_format(obj_type)
+
+    if code is None:
+        return None
+
+    return struct.Struct("<" + code), int_converter(obj_type)
+
+
+def deserialize_from(
+    obj_type: type, data, offset: int = 0, *, align=False
+) -> tuple[typing.Any, int]:
+    """
+    Deserializes an object of any type from `data` starting at `offset`, returning the
+    object and the offset right after it. Types without a `deserialize_from` method are
+    given a copy of the remaining data, so that they never keep a view of a buffer.
+    """
+
+    unpacker = int_unpacker(obj_type)
+
+    if unpacker is not None:
+        int_struct, converter = unpacker
+
+        if len(data) - offset < int_struct.size:
+            raise ValueError(f"Data is too short to contain {int_struct.size} bytes")
+
+        value = converter(int_struct.unpack_from(data, offset)[0])
+        return value, offset + int_struct.size
+
+    if issubclass(obj_type, (CStruct, BaseListType)):
+        return obj_type.deserialize_from(data, offset, align=align)
+    elif hasattr(obj_type, "deserialize_from"):
+        return obj_type.deserialize_from(data, offset)
+
+    value, remaining = obj_type.deserialize(bytes(data[offset:]))
+
+    return value, len(data) - len(remaining)
+
+
 class Bytes(bytes):
     def serialize(self) -> Bytes:
         return self
@@ -61,6 +118,10 @@ class Bytes(bytes):
     def deserialize(cls, data: bytes) -> tuple[Bytes, bytes]:
         return cls(data), b""
 
+    @classmethod
+    def deserialize_from(cls, data, offset: int = 0) -> tuple[Bytes, int]:
+        return cls(data[offset:]), len(data)
+
     def __repr__(self) -> str:
         # Reading byte sequences like \x200\x21 is extremely annoying
         # compared to \x20\x30\x21
@@ -89,10 +150,15 @@ class ShortBytes(Bytes):
 
     @classmethod
     def deserialize(cls, data: bytes) -> tuple[Bytes, bytes]:
-        length, data = cls._header.deserialize(data)
-        if length > len(data):
+        value, offset = cls.deserialize_from(data)
+        return value, data[offset:]
+
+    @classmethod
+    def deserialize_from(cls, data, offset: int = 0) -> tuple[Bytes, int]:
+        length, offset = deserialize_from(cls._header, data, offset)
+        if length > len(data) - offset:
             raise ValueError(f"Data is too short to contain {length} bytes of data")
-        return cls(data[:length]), data[length:]
+        return cls(data[offset : offset + length]), offset + length
 
 
 class LongBytes(ShortBytes):
@@ -113,11 +179,33 @@ class BaseListType(list):
             return item.serialize()
 
     @classmethod
-    def _deserialize_item(cls, data, *, align):
+    def deserialize(cls, data: bytes, *, align=False) -> tuple[BaseListType, bytes]:
+        r, offset = cls.deserialize_from(data, align=align)
+        return r, data[offset:]
+
+    @classmethod
+    def _deserialize_items_from(
+        cls, data, offset: int, count: int, *, align
+    ) -> tuple[list, int]:
         if issubclass(cls._item_type, CStruct):
-            return cls._item_type.deserialize(data, align=align)
-        else:
-            return cls._item_type.deserialize(data)
+            # Structs all have the same size and are decoded together
+            end = offset + count * cls._item_type.get_size(align=align)
+
+            if len(data) < end:
+                raise ValueError(
+                    f"Data is too short to contain {count} items: {bytes(data)!r}"
+                )
+
+            array = CStructArray(cls._item_type, data[offset:end], align=align)
+            return list(array), end
+
+        items = []
+
+        for _i in range(count):
+            item, offset = deserialize_from(cls._item_type, data, offset, align=align)
+            items.append(item)
+
+        return items, offset
 
 
 class LVList(BaseListType):
@@ -135,13 +223,12 @@ class LVList(BaseListType):
         )
 
     @classmethod
-    def deserialize(cls, data: bytes, *, align=False) -> tuple[LVList, bytes]:
-        length, data = cls._header.deserialize(data)
-        r = cls()
-        for _i in range(length):
-            item, data = cls._deserialize_item(data, align=align)
-            r.append(item)
-        return r, data
+    def deserialize_from(
+        cls, data, offset: int = 0, *, align=False
+    ) -> tuple[LVList, int]:
+        length, offset = deserialize_from(cls._header, data, offset)
+        items, offset = cls._deserialize_items_from(data, offset, length, align=align)
+        return cls(items), offset
 
 
 class FixedList(BaseListType):
@@ -163,12 +250,13 @@ class FixedList(BaseListType):
         return b"".join([self._serialize_item(i, align=align) for i in self])
 
     @classmethod
-    def deserialize(cls, data: bytes, *, align=False) -> tuple[FixedList, bytes]:
-        r = cls()
-        for _i in range(cls._length):
-            item, data = cls._deserialize_item(data, align=align)
-            r.append(item)
-        return r, data
+    def deserialize_from(
+        cls, data, offset: int = 0, *, align=False
+    ) -> tuple[FixedList, int]:
+        items, offset = cls._deserialize_items_from(
+            data, offset, cls._length, align=align
+        )
+        return cls(items), offset
 
 
 class CompleteList(BaseListType):
@@ -180,9 +268,19 @@ class CompleteList(BaseListType):
         return b"".join([self._serialize_item(i, align=align) for i in self])
 
     @classmethod
-    def deserialize(cls, data: bytes, *, align=False) -> tuple[CompleteList, bytes]:
+    def deserialize_from(
+        cls, data, offset: int = 0, *, align=False
+    ) -> tuple[CompleteList, int]:
+        if issubclass(cls._item_type, CStruct):
+            size = cls._item_type.get_size(align=align)
+            count = -(-(len(data) - offset) // size)
+            items, offset = cls._deserialize_items_from(
+                data, offset, count, align=align
+            )
+            return cls(items), offset
+
         r = cls()
-        while data:
-            item, data = cls._deserialize_item(data, align=align)
+        while offset < len(data):
+            item, offset = deserialize_from(cls._item_type, data, offset, align=align)
             r.append(item)
-        return r, data
+        return r, offset
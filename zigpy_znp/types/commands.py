@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import enum
+import struct
 import typing
 import logging
+import operator
 import dataclasses
 
 import zigpy.zdo.types
 
 import zigpy_znp.types as t
+from zigpy_znp.types.cstruct import int_converter, struct_format
 
 LOGGER = logging.getLogger(__name__)
 
@@ -204,7 +207,7 @@ class CommandsMeta(type):
                 if definition.command_type == CommandType.AREQ:
 
                     class Req(CommandBase, header=header, schema=definition.req_schema):
-                        pass
+                        __slots__ = param_slots(definition.req_schema)
 
                     Req.__qualname__ = qualname + ".Req"
                     Req.Req = Req
@@ -218,12 +221,12 @@ class CommandsMeta(type):
                     class Req(  # type:ignore[no-redef]
                         CommandBase, header=req_header, schema=definition.req_schema
                     ):
-                        pass
+                        __slots__ = param_slots(definition.req_schema)
 
                     class Rsp(
                         CommandBase, header=rsp_header, schema=definition.rsp_schema
                     ):
-                        pass
+                        __slots__ = param_slots(definition.rsp_schema)
 
                     Req.__qualname__ = qualname + ".Req"
                     Req.Req = Req
@@ -244,7 +247,7 @@ class CommandsMeta(type):
                     class Callback(
                         CommandBase, header=header, schema=definition.rsp_schema
                     ):
-                        pass
+                        __slots__ = param_slots(definition.rsp_schema)
 
                     Callback.__qualname__ = qualname + ".Callback"
                     Callback.Req = None
@@ -265,7 +268,7 @@ class CommandsMeta(type):
                     class Rsp(  # type:ignore[no-redef]
                         CommandBase, header=header, schema=definition.rsp_schema
                     ):
-                        pass
+                        __slots__ = param_slots(definition.rsp_schema)
 
                     Rsp.__qualname__ = qualname + ".Rsp"
                     Rsp.Req = None
@@ -290,7 +293,347 @@ class CommandsBase(metaclass=CommandsMeta, subsystem=None):
     pass
 
 
+def fixed_size(param_type: type) -> int | None:
+    """
+    Returns the serialized size of a type that always deserializes successfully from
+    enough bytes, or `None` if its size depends on the data.
+    """
+
+    # Strict enums can fail to deserialize values without a member
+    if (
+        issubclass(param_type, enum.Enum)
+        and param_type._missing_.__func__ is enum.Enum._missing_.__func__
+    ):
+        return None
+
+    if issubclass(param_type, int) and hasattr(param_type, "_size"):
+        return param_type._size
+
+    if issubclass(param_type, t.FixedList):
+        item_size = fixed_size(param_type._item_type)
+
+        if item_size is None or param_type._length is None:
+            return None
+
+        return param_type._length * item_size
+
+    return None
+
+
+def fixed_frame_sizes(schema: tuple[t.Param, ...]) -> frozenset[int] | None:
+    """
+    Computes every valid frame data length for a schema of fixed-size parameters.
+    Trailing optional parameters can be omitted so there may be more than one.
+    """
+
+    size = 0
+    sizes = set()
+
+    for param in schema:
+        param_size = fixed_size(param.type)
+
+        if param_size is None:
+            return None
+
+        if param.optional:
+            sizes.add(size)
+
+        size += param_size
+
+    sizes.add(size)
+
+    return frozenset(sizes)
+
+
+def frame_layout(
+    schema: tuple[t.Param, ...]
+) -> tuple[tuple[int | None, int, bool], ...] | None:
+    """
+    Describes a schema as `(prefix_size, item_size, optional)` steps, so that the data
+    length of its frames can be checked without parsing them. A parameter is either
+    `item_size` bytes (`prefix_size` is 0), a little-endian count of `prefix_size` bytes
+    followed by that many items, or every remaining byte (`prefix_size` is `None`).
+
+    Returns `None` if any parameter can fail to deserialize from enough bytes.
+    """
+
+    layout = []
+
+    for index, param in enumerate(schema):
+        size = fixed_size(param.type)
+
+        if size is not None:
+            layout.append((0, size, param.optional))
+            continue
+
+        if issubclass(param.type, t.ShortBytes):
+            prefix_size, item_size = param.type._header._size, 1
+        elif issubclass(param.type, t.LVList):
+            prefix_size = param.type._header._size
+            item_size = fixed_size(param.type._item_type)
+        elif issubclass(param.type, t.Bytes) and index == len(schema) - 1:
+            prefix_size, item_size = None, 1
+        elif issubclass(param.type, t.CompleteList) and index == len(schema) - 1:
+            prefix_size = None
+            item_size = fixed_size(param.type._item_type)
+        else:
+            return None
+
+        if item_size is None:
+            return None
+
+        layout.append((prefix_size, item_size, param.optional))
+
+    return tuple(layout)
+
+
+def frame_data_size(layout: tuple[tuple[int | None, int, bool], ...], data) -> int:
+    """
+    Computes the data length of a frame from the length prefixes within it. The
+    result is larger than the data if it is truncated.
+    """
+
+    offset = 0
+
+    for prefix_size, item_size, optional in layout:
+        # Trailing optional parameters can be omitted
+        if optional and offset == len(data):
+            break
+
+        if prefix_size is None:
+            remaining = len(data) - offset
+            offset += -(-remaining // item_size) * item_size
+        elif prefix_size == 0:
+            offset += item_size
+        elif offset + prefix_size > len(data):
+            return offset + prefix_size
+        else:
+            count = int.from_bytes(data[offset : offset + prefix_size], "little")
+            offset += prefix_size + count * item_size
+
+    return offset
+
+
+class CommandCodec:
+    """
+    Serializer and deserializer compiled once for a command schema. Every run of
+    consecutive required fixed-width integer parameters is packed and unpacked with a
+    single `struct.Struct`.
+    """
+
+    def __init__(self, schema: tuple[t.Param, ...]) -> None:
+        self.schema = schema
+        self.is_cstruct = tuple(issubclass(p.type, t.CStruct) for p in schema)
+
+        # Index of the first parameter in a run -> (struct, parameters in the run)
+        self.runs: dict[int, tuple[struct.Struct, tuple[t.Param, ...]]] = {}
+
+        start = 0
+
+        while start < len(schema):
+            end = start
+            run_format = "<"
+
+            while end < len(schema):
+                code = struct_format(schema[end].type)
+
+                if schema[end].optional or code is None:
+                    break
+
+                run_format += code
+                end += 1
+
+            # A single byte isn't worth going through `struct` for
+            if end - start > 1 or (end > start and struct.calcsize(run_format) > 1):
+                self.runs[start] = (struct.Struct(run_format), schema[start:end])
+                start = end
+            else:
+                start += 1
+
+        self._run_converters = {
+            index: tuple(
+                (param.name, int_converter(param.type)) for param in run_params
+            )
+            for index, (_, run_params) in self.runs.items()
+        }
+
+        # Serialization steps: either a run of parameters packed together or a single
+        # parameter serialized on its own
+        self._encode_steps: list[tuple[int, int, struct.Struct | None, bool]] = []
+        index = 0
+
+        while index < len(schema):
+            if index in self.runs:
+                run_struct, run_params = self.runs[index]
+                self._encode_steps.append(
+                    (index, index + len(run_params), run_struct, False)
+                )
+                index += len(run_params)
+            else:
+                self._encode_steps.append(
+                    (index, index + 1, None, self.is_cstruct[index])
+                )
+                index += 1
+
+    def decode_run(
+        self, index: int, data, offset: int, params: dict[str, typing.Any]
+    ) -> tuple[int, int]:
+        """
+        Deserializes the run of parameters starting at `index` into `params`, returning
+        the index of the next parameter and the offset after the run. Nothing is done
+        if there is no run or the data is too short, so that the per-parameter path can
+        produce a meaningful error.
+        """
+
+        run = self.runs.get(index)
+
+        if run is None or len(data) - offset < run[0].size:
+            return index, offset
+
+        run_struct = run[0]
+        converters = self._run_converters[index]
+
+        for (name, converter), value in zip(
+            converters, run_struct.unpack_from(data, offset)
+        ):
+            params[name] = converter(value)
+
+        return index + len(converters), offset + run_struct.size
+
+    def encode(self, values: tuple[typing.Any, ...], *, align=False) -> bytes:
+        chunks = []
+
+        for start, end, run_struct, is_cstruct in self._encode_steps:
+            if run_struct is not None:
+                chunks.append(run_struct.pack(*values[start:end]))
+                continue
+
+            value = values[start]
+
+            # At this point the optional params are assumed to be in a valid order
+            if value is None:
+                continue
+
+            if is_cstruct:
+                chunks.append(value.serialize(align=align))
+            else:
+                chunks.append(value.serialize())
+
+        return b"".join(chunks)
+
+
+class ParamDecoder:
+    """
+    Incrementally deserializes the parameters of a command from a frame.
+    """
+
+    def __init__(self, codec: CommandCodec, frame, *, align=False) -> None:
+        self.codec = codec
+        self.schema = codec.schema
+        self.frame = frame
+        self.align = align
+
+        self._data = memoryview(frame.data)
+        self._offset = 0
+        self._index = 0
+        self._params: dict[str, typing.Any] = {}
+
+    def decode(self, *, until: str | None = None) -> dict[str, typing.Any]:
+        """
+        Deserializes parameters up to and including `until`, or all of them, and
+        returns every parameter parsed so far.
+        """
+
+        data = self._data
+        params = self._params
+
+        while self._index < len(self.schema):
+            if until is not None and until in params:
+                return params
+
+            if self._index in self.codec.runs:
+                self._index, self._offset = self.codec.decode_run(
+                    self._index, data, self._offset, params
+                )
+
+                if self._index >= len(self.schema) or (
+                    until is not None and until in params
+                ):
+                    continue
+
+            param = self.schema[self._index]
+            align = self.align and self.codec.is_cstruct[self._index]
+
+            try:
+                params[param.name], self._offset = t.deserialize_from(
+                    param.type, data, self._offset, align=align
+                )
+            except ValueError:
+                out_of_data = self._offset >= len(data)
+
+                if out_of_data and param.optional:
+                    # If we're out of data and the parameter is optional, we're done
+                    self._index = len(self.schema)
+                    break
+                elif out_of_data and not param.optional:
+                    # If we're out of data but the parameter is required, this is bad
+                    raise ValueError(
+                        f"Frame data is truncated (parsed {params}),"
+                        f" required parameter remains: {param}"
+                    )
+                else:
+                    # Otherwise, let the exception happen
+                    raise
+
+            self._index += 1
+
+        if self._offset < len(data):
+            raise ValueError(
+                f"Frame {self.frame} contains trailing data after parsing:"
+                f" {bytes(data[self._offset :])!r}"
+            )
+
+        return params
+
+
+def param_slots(schema: tuple[t.Param, ...]) -> tuple[str, ...]:
+    """
+    Slots of a command class: one for every parameter in its schema.
+    """
+
+    return tuple(param.name for param in schema)
+
+
+def values_getter(
+    names: tuple[str, ...],
+) -> typing.Callable[[CommandBase], tuple[typing.Any, ...]]:
+    """
+    Creates a function that reads the given attributes of a command as a tuple.
+    """
+
+    if len(names) == 1:
+        getter = operator.attrgetter(names[0])
+        return lambda command: (getter(command),)
+
+    if not names:
+        return lambda command: ()
+
+    return operator.attrgetter(*names)
+
+
+def restore_command(
+    cls: type[CommandBase], partial: bool, params: dict[str, typing.Any]
+) -> CommandBase:
+    """
+    Recreates a command when it is copied.
+    """
+
+    return cls(partial=partial, **params)
+
+
 class CommandBase:
+    __slots__ = ("_partial", "_decoder")
+
     Req = None
     Rsp = None
     Callback = None
@@ -299,10 +642,16 @@ class CommandBase:
         super().__init_subclass__()
         cls.header = header
         cls.schema = schema
+        cls._param_names = frozenset(p.name for p in schema)
+        cls._param_slots = param_slots(schema)
+        cls._get_values = staticmethod(values_getter(cls._param_slots))
+        cls._frame_sizes = fixed_frame_sizes(schema)
+        cls._frame_layout = frame_layout(schema)
+        cls._codec = CommandCodec(schema)
 
     def __init__(self, *, partial=False, **params):
-        super().__setattr__("_partial", partial)
-        super().__setattr__("_bound_params", {})
+        object.__setattr__(self, "_partial", partial)
+        object.__setattr__(self, "_decoder", None)
 
         all_params = [p.name for p in self.schema]
         optional_params = [p.name for p in self.schema if p.optional]
@@ -329,11 +678,11 @@ class CommandBase:
             if missing_params:
                 raise KeyError(f"Missing parameters: {set(all_params) - given_params}")
 
-        bound_params = {}
+        bound_values = {}
 
         for param in self.schema:
             if params.get(param.name) is None and (partial or param.optional):
-                bound_params[param.name] = (param, None)
+                bound_values[param.name] = None
                 continue
 
             value = params[param.name]
@@ -375,9 +724,21 @@ class CommandBase:
                     f"Invalid parameter value: {param.name}={value!r}"
                 ) from e
 
-            bound_params[param.name] = (param, value)
+            bound_values[param.name] = value
 
-        super().__setattr__("_bound_params", bound_params)
+        # Parameters are only set once they have all been validated
+        for name, value in bound_values.items():
+            object.__setattr__(self, name, value)
+
+    def _values(self) -> tuple[typing.Any, ...]:
+        """
+        Values of every parameter, in schema order.
+        """
+
+        if self._decoder is not None:
+            self._decode()
+
+        return self._get_values(self)
 
     def to_frame(self, *, align=False):
         if self._partial:
@@ -385,56 +746,123 @@ class CommandBase:
 
         from zigpy_znp.frames import GeneralFrame
 
-        chunks = []
+        return GeneralFrame(
+            self.header, self._codec.encode(self._values(), align=align)
+        )
 
-        for param, value in self._bound_params.values():
-            # At this point the optional params are assumed to be in a valid order
-            if value is None:
-                continue
+    @classmethod
+    def from_frame(cls, frame, *, align=False) -> CommandBase:
+        if frame.header != cls.header:
+            raise ValueError(
+                f"Wrong frame header in {cls}: {cls.header} != {frame.header}"
+            )
 
-            if issubclass(param.type, t.CStruct):
-                chunks.append(value.serialize(align=align))
-            else:
-                chunks.append(value.serialize())
+        return cls._from_decoded(ParamDecoder(cls._codec, frame, align=align).decode())
+
+    @classmethod
+    def _from_decoded(cls, params: dict[str, typing.Any]) -> CommandBase:
+        """
+        Creates a command from deserialized parameters. They are already of the correct
+        type and serializable so none of the validation in `__init__` is repeated.
+        """
+
+        command = cls.__new__(cls)
+        object.__setattr__(command, "_partial", False)
+        object.__setattr__(command, "_decoder", None)
+
+        for name in cls._param_slots:
+            object.__setattr__(command, name, params.get(name))
 
-        return GeneralFrame(self.header, b"".join(chunks))
+        return command
 
     @classmethod
-    def from_frame(cls, frame, *, align=False) -> CommandBase:
+    def from_frame_lazy(cls, frame, *, align=False) -> CommandBase:
+        """
+        Creates a command from a frame without parsing it. Parameters are deserialized
+        only as they are accessed, up to and including the parameter being read.
+
+        The frame is still fully validated: its length is checked against the length
+        prefixes within it and commands whose parameters can fail to deserialize
+        from enough bytes are parsed right away.
+        """
+
+        if cls._frame_layout is None:
+            return cls.from_frame(frame, align=align)
+
         if frame.header != cls.header:
             raise ValueError(
                 f"Wrong frame header in {cls}: {cls.header} != {frame.header}"
             )
 
-        data = frame.data
-        params = {}
+        cls._check_frame_length(frame)
 
-        for param in cls.schema:
-            try:
-                if issubclass(param.type, t.CStruct):
-                    params[param.name], data = param.type.deserialize(data, align=align)
-                else:
-                    params[param.name], data = param.type.deserialize(data)
-            except ValueError:
-                if not data and param.optional:
-                    # If we're out of data and the parameter is optional, we're done
-                    break
-                elif not data and not param.optional:
-                    # If we're out of data but the parameter is required, this is bad
-                    raise ValueError(
-                        f"Frame data is truncated (parsed {params}),"
-                        f" required parameter remains: {param}"
-                    )
-                else:
-                    # Otherwise, let the exception happen
-                    raise
+        command = cls.__new__(cls)
+        object.__setattr__(command, "_partial", False)
+        object.__setattr__(
+            command, "_decoder", ParamDecoder(cls._codec, frame, align=align)
+        )
+
+        return command
+
+    @classmethod
+    def validate_frame(cls, frame, *, align=False) -> None:
+        """
+        Checks that a frame can be parsed as this command, raising a `ValueError` if it
+        cannot. Frames are only parsed if checking their length is not enough.
+        """
+
+        if cls._frame_layout is None:
+            cls.from_frame(frame, align=align)
+        else:
+            cls._check_frame_length(frame)
 
-        if data:
+    @classmethod
+    def _check_frame_length(cls, frame) -> None:
+        if cls._frame_sizes is not None:
+            if len(frame.data) not in cls._frame_sizes:
+                raise ValueError(
+                    f"Frame {frame} has an invalid length for {cls}:"
+                    f" {len(frame.data)} not in {sorted(cls._frame_sizes)}"
+                )
+
+            return
+
+        size = frame_data_size(cls._frame_layout, frame.data)
+
+        if size != len(frame.data):
             raise ValueError(
-                f"Frame {frame} contains trailing data after parsing: {data}"
+                f"Frame {frame} has an invalid length for {cls}:"
+                f" {len(frame.data)} != {size}"
             )
 
-        return cls(**params)
+    def _decode(self, until: str | None = None) -> None:
+        """
+        Decodes a lazy command up to and including the given parameter, filling in
+        the slots of every parameter decoded so far.
+        """
+
+        decoder = self._decoder
+        params = decoder.decode(until=until)
+
+        for name, value in params.items():
+            object.__setattr__(self, name, value)
+
+        # Once everything is decoded, missing optional parameters are filled in
+        if decoder._index >= len(self.schema):
+            for name in self._param_slots:
+                if name not in params:
+                    object.__setattr__(self, name, None)
+
+            object.__setattr__(self, "_decoder", None)
+
+    def __getattr__(self, key):
+        # Only called when a slot is empty: the parameters of lazy commands are set
+        # only once they have been decoded
+        if key in type(self)._param_names and self._decoder is not None:
+            self._decode(until=key)
+            return object.__getattribute__(self, key)
+
+        raise AttributeError(f"{type(self).__qualname__} has no attribute {key!r}")
 
     def matches(self, other: CommandBase) -> bool:
         if type(self) is not type(other):
@@ -442,16 +870,12 @@ class CommandBase:
 
         assert self.header == other.header
 
-        param_pairs = zip(self._bound_params.values(), other._bound_params.values())
-
-        for (
-            (expected_param, expected_value),
-            (actual_param, actual_value),
-        ) in param_pairs:
-            assert expected_param == actual_param
-
+        for name, expected_value in zip(self._param_slots, self._values()):
             # Only non-None bound params are considered
-            if expected_value is not None and expected_value != actual_value:
+            if expected_value is None:
+                continue
+
+            if expected_value != getattr(other, name):
                 return False
 
         return True
@@ -461,7 +885,7 @@ class CommandBase:
         Returns a copy of the current command with replaced parameters.
         """
 
-        params = {key: value for key, (param, value) in self._bound_params.items()}
+        params = self.as_dict()
         params.update(kwargs)
 
         return type(self)(partial=self._partial, **params)
@@ -471,28 +895,16 @@ class CommandBase:
         Converts the command into a dictionary.
         """
 
-        return {p.name: v for p, v in self._bound_params.values()}
+        return dict(zip(self._param_slots, self._values()))
 
     def __eq__(self, other):
-        return type(self) is type(other) and self._bound_params == other._bound_params
+        return type(self) is type(other) and self._values() == other._values()
 
     def __hash__(self):
-        params = tuple(self._bound_params.items())
-        return hash((type(self), self.header, self.schema, params))
-
-    def __getattribute__(self, key):
-        try:
-            return object.__getattribute__(self, key)
-        except AttributeError:
-            pass
-
-        try:
-            param, value = object.__getattribute__(self, "_bound_params")[key]
-            return value
-        except KeyError:
-            pass
+        return hash((type(self), self._values()))
 
-        raise AttributeError(f"{self} has no attribute {key!r}")
+    def __reduce__(self):
+        return restore_command, (type(self), self._partial, self.as_dict())
 
     def __setattr__(self, key, value):
         raise RuntimeError("Command instances are immutable")
@@ -501,7 +913,7 @@ class CommandBase:
         raise RuntimeError("Command instances are immutable")
 
     def __repr__(self):
-        params = [f"{p.name}={v!r}" for p, v in self._bound_params.values()]
+        params = [f"{n}={v!r}" for n, v in zip(self._param_slots, self._values())]
 
         return f'{self.__class__.__qualname__}({", ".join(params)})'
 
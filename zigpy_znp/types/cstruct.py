@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import enum
+import struct
 import typing
 import inspect
+import functools
 import dataclasses
+import collections.abc
 
 import zigpy.types as zigpy_t
 
@@ -14,6 +18,38 @@ class ListSubclass(list):
     pass
 
 
+def struct_format(param_type: type) -> str | None:
+    """
+    Returns the `struct` format character of a little-endian fixed-width integer type,
+    or `None` if the type cannot be packed with `struct`.
+    """
+
+    if not issubclass(param_type, int) or not hasattr(param_type, "_size"):
+        return None
+
+    if getattr(param_type, "_byteorder", "little") != "little":
+        return None
+
+    code = {1: "B", 2: "H", 4: "I", 8: "Q"}.get(param_type._size)
+
+    if code is None:
+        return None
+
+    return code.lower() if param_type._signed else code
+
+
+def int_converter(param_type: type) -> typing.Callable[[int], typing.Any]:
+    """
+    Returns a function converting an unpacked integer into `param_type`. Values that
+    come out of `struct` are already in range so only enums need to be validated.
+    """
+
+    if issubclass(param_type, enum.Enum):
+        return param_type
+
+    return functools.partial(int.__new__, param_type)
+
+
 @dataclasses.dataclass(frozen=True)
 class CStructField:
     name: str
@@ -39,6 +75,122 @@ class CStructField:
             raise TypeError(f"Cannot get size of unknown type: {self.type!r}")
 
 
+class CStructLayout:
+    """
+    Memory layout of a struct, computed once per struct class and alignment. Every
+    struct is packed and unpacked with a single `struct.Struct`: integer fields map to
+    their format characters, all other fields are read and written as byte strings.
+    """
+
+    def __init__(self, cls: type[CStruct], *, align: bool) -> None:
+        self.padded_fields: list[tuple[int, int, CStructField]] = []
+        self.names = tuple(f.name for f in cls.fields)
+        self.alignment = 1
+
+        offset = 0
+        struct_format_str = "<"
+
+        # Byte ranges that have to be filled with the padding byte
+        self.padding: list[tuple[int, int]] = []
+
+        # Converters from unpacked values to field values and back. Most integer
+        # fields are handled by `struct` itself and are only converted when unpacked.
+        decoders = []
+        self.encoders: list[tuple[int, typing.Callable[[typing.Any], bytes]]] = []
+
+        for index, field in enumerate(cls.fields):
+            size, alignment = field.get_size_and_alignment(align=align)
+            padding = (-offset) % alignment
+            self.alignment = max(self.alignment, alignment)
+
+            if padding:
+                self.padding.append((offset, offset + padding))
+                struct_format_str += f"{padding}x"
+
+            self.padded_fields.append((padding, size, field))
+            offset += padding + size
+
+            code = struct_format(field.type)
+
+            if code is not None:
+                struct_format_str += code
+                decoders.append(int_converter(field.type))
+
+                # Enum values must be checked before they are packed
+                if issubclass(field.type, enum.Enum):
+                    self.encoders.append((index, field.type))
+
+                continue
+
+            struct_format_str += f"{size}s"
+            decoders.append(field_decoder(field.type, align=align))
+            self.encoders.append((index, field_encoder(field.type, align=align)))
+
+        final_padding = (-offset) % self.alignment
+
+        if final_padding:
+            self.padding.append((offset, offset + final_padding))
+            struct_format_str += f"{final_padding}x"
+
+        self.size = offset + final_padding
+        self.struct = struct.Struct(struct_format_str)
+        self.decoders = tuple(decoders)
+
+        assert self.struct.size == self.size
+
+        # Padding is zero-filled by `struct` so only other bytes need to be written
+        if cls._padding_byte == b"\x00":
+            self.padding = []
+
+        self._padding_byte = cls._padding_byte
+
+    def decode(self, values: typing.Iterable[typing.Any]) -> dict[str, typing.Any]:
+        return {
+            name: decoder(value)
+            for name, decoder, value in zip(self.names, self.decoders, values)
+        }
+
+    def pack_into(self, buffer, offset: int, values: list[typing.Any]) -> None:
+        for index, encoder in self.encoders:
+            values[index] = encoder(values[index])
+
+        self.struct.pack_into(buffer, offset, *values)
+
+        for start, end in self.padding:
+            buffer[offset + start : offset + end] = self._padding_byte * (end - start)
+
+
+def field_decoder(
+    field_type: type, *, align: bool
+) -> typing.Callable[[bytes], typing.Any]:
+    """
+    Returns a function deserializing a non-integer field from its exact bytes.
+    """
+
+    if issubclass(field_type, CStruct):
+        return lambda data: field_type.deserialize(data, align=align)[0]
+
+    return lambda data: field_type.deserialize(data)[0]
+
+
+def field_encoder(
+    field_type: type, *, align: bool
+) -> typing.Callable[[typing.Any], bytes]:
+    """
+    Returns a function serializing a non-integer field, converting it first if it is
+    not already of the right type.
+    """
+
+    if issubclass(field_type, CStruct):
+        return lambda value: (
+            value if isinstance(value, field_type) else field_type(value)
+        ).serialize(align=align)
+
+    return lambda value: (
+        value if isinstance(value, field_type) else field_type(value)
+    ).serialize()
+
+
 class CStruct:
     _padding_byte = b"\xFF"
 
@@ -57,18 +209,10 @@ class CStruct:
             setattr(fields, field.name, field)
 
         cls.fields = fields
-
-    def __new__(cls, *args, **kwargs) -> CStruct:
-        # Like a copy constructor
-        if len(args) == 1 and isinstance(args[0], cls):
-            if kwargs:
-                raise ValueError(f"Cannot use copy constructor with kwargs: {kwargs!r}")
-
-            kwargs = args[0].as_dict()
-            args = ()
+        cls._layouts = {}
 
         # Pretend our signature is `__new__(cls, p1: t1, p2: t2, ...)`
-        signature = inspect.Signature(
+        cls._signature = inspect.Signature(
             parameters=[
                 inspect.Parameter(
                     name=f.name,
@@ -80,7 +224,16 @@ class CStruct:
             ]
         )
 
-        bound = signature.bind(*args, **kwargs)
+    def __new__(cls, *args, **kwargs) -> CStruct:
+        # Like a copy constructor
+        if len(args) == 1 and isinstance(args[0], cls):
+            if kwargs:
+                raise ValueError(f"Cannot use copy constructor with kwargs: {kwargs!r}")
+
+            kwargs = args[0].as_dict()
+            args = ()
+
+        bound = cls._signature.bind(*args, **kwargs)
         bound.apply_defaults()
 
         instance = super().__new__(cls)
@@ -105,93 +258,105 @@ class CStruct:
     def as_dict(self) -> dict[str, typing.Any]:
         return {f.name: getattr(self, f.name) for f in self.fields}
 
+    @classmethod
+    def get_layout(cls, *, align=False) -> CStructLayout:
+        try:
+            return cls._layouts[align]
+        except KeyError:
+            layout = cls._layouts[align] = CStructLayout(cls, align=align)
+            return layout
+
     @classmethod
     def get_padded_fields(
         cls, *, align=False
     ) -> typing.Iterable[tuple[int, int, CStructField]]:
-        offset = 0
-
-        for field in cls.fields:
-            size, alignment = field.get_size_and_alignment(align=align)
-            padding = (-offset) % alignment
-            offset += padding + size
-
-            yield padding, size, field
+        return iter(cls.get_layout(align=align).padded_fields)
 
     @classmethod
     def get_alignment(cls, *, align=False) -> int:
-        alignments = []
-
-        for field in cls.fields:
-            size, alignment = field.get_size_and_alignment(align=align)
-            alignments.append(alignment)
-
-        return max(alignments)
+        return cls.get_layout(align=align).alignment
 
     @classmethod
     def get_size(cls, *, align=False) -> int:
-        total_size = 0
-
-        for padding, size, _field in cls.get_padded_fields(align=align):
-            total_size += padding + size
-
-        final_padding = (-total_size) % cls.get_alignment(align=align)
-
-        return total_size + final_padding
+        return cls.get_layout(align=align).size
 
-    def serialize(self, *, align=False) -> bytes:
-        result = b""
+    def _converted_values(self) -> list[typing.Any]:
+        values = []
 
-        for padding, _, field in self.get_padded_fields(align=align):
+        for field in self.fields:
             value = getattr(self, field.name)
 
             if value is None:
                 raise ValueError(f"Field {field} cannot be empty")
 
             try:
-                value = field.type(value)
+                values.append(field.type(value))
             except Exception as e:
                 raise ValueError(
                     f"Failed to convert {field.name}={value!r} from type"
                     f" {type(value)} to {field.type}"
                 ) from e
 
-            result += self._padding_byte * padding
+        return values
+
+    def serialize_into(self, buffer, offset: int = 0, *, align=False) -> int:
+        """
+        Serializes the struct into a writable buffer at the given offset, returning the
+        offset right after it.
+        """
 
-            if isinstance(value, CStruct):
-                result += value.serialize(align=align)
-            else:
-                result += value.serialize()
+        layout = self.get_layout(align=align)
 
-        # Pad the result to our final length
-        return result.ljust(self.get_size(align=align), self._padding_byte)
+        try:
+            layout.pack_into(buffer, offset, [getattr(self, n) for n in layout.names])
+        except (struct.error, TypeError, ValueError, AttributeError):
+            # Fields are converted only if they cannot be packed as-is
+            layout.pack_into(buffer, offset, self._converted_values())
+
+        return offset + layout.size
+
+    def serialize(self, *, align=False) -> bytes:
+        buffer = bytearray(self.get_size(align=align))
+        self.serialize_into(buffer, align=align)
+
+        return bytes(buffer)
 
     @classmethod
-    def deserialize(cls, data: bytes, *, align=False) -> tuple[CStruct, bytes]:
-        instance = cls()
+    def deserialize_from(
+        cls, data, offset: int = 0, *, align=False
+    ) -> tuple[CStruct, int]:
+        """
+        Deserializes a struct from a buffer at the given offset without copying it,
+        returning the struct and the offset right after it.
+        """
 
-        orig_length = len(data)
-        expected_size = cls.get_size(align=align)
+        layout = cls.get_layout(align=align)
 
-        if orig_length < expected_size:
+        if len(data) - offset < layout.size:
             raise ValueError(
-                f"Data is too short, must be at least {expected_size} bytes: {data!r}"
+                f"Data is too short, must be at least {layout.size} bytes:"
+                f" {bytes(data[offset:])!r}"
             )
 
-        for padding, _, field in cls.get_padded_fields(align=align):
-            data = data[padding:]
+        values = layout.struct.unpack_from(data, offset)
 
-            if issubclass(field.type, CStruct):
-                value, data = field.type.deserialize(data, align=align)
-            else:
-                value, data = field.type.deserialize(data)
+        return cls._from_unpacked(layout, values), offset + layout.size
 
-            setattr(instance, field.name, value)
+    @classmethod
+    def _from_unpacked(
+        cls, layout: CStructLayout, values: typing.Iterable[typing.Any]
+    ) -> CStruct:
+        # Values that were unpacked from binary data are already valid
+        instance = super().__new__(cls)
+        instance.__dict__.update(layout.decode(values))
+
+        return instance
 
-        # Strip off the final padding
-        data = data[expected_size - (orig_length - len(data)) :]
+    @classmethod
+    def deserialize(cls, data: bytes, *, align=False) -> tuple[CStruct, bytes]:
+        instance, offset = cls.deserialize_from(data, align=align)
 
-        return instance, data
+        return instance, data[offset:]
 
     def replace(self, **kwargs) -> CStruct:
         d = self.as_dict().copy()
@@ -208,3 +373,87 @@ class CStruct:
     def __repr__(self) -> str:
         kwargs = ", ".join([f"{k}={v!r}" for k, v in self.as_dict().items()])
         return f"{type(self).__name__}({kwargs})"
+
+
+class CStructArray(collections.abc.Sequence):
+    """
+    Table of structs stored back to back, like the address manager table. The whole
+    table is unpacked in one pass into columns of raw values and structs are only
+    created for the rows that are read.
+    """
+
+    def __init__(self, struct_type: type[CStruct], data, *, align=False) -> None:
+        layout = struct_type.get_layout(align=align)
+
+        if len(data) % layout.size != 0:
+            raise ValueError(
+                f"Data length is not a multiple of the {struct_type.__name__} size"
+                f" {layout.size}: {bytes(data)!r}"
+            )
+
+        self.struct_type = struct_type
+        self.align = align
+
+        self._layout = layout
+        self._data = bytes(data)
+        self._length = len(data) // layout.size
+
+        # One tuple of unconverted values per field
+        self.columns = tuple(zip(*layout.struct.iter_unpack(self._data))) or tuple(
+            () for _ in layout.names
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        values = [column[index] for column in self.columns]
+
+        return self.struct_type._from_unpacked(self._layout, values)
+
+    def live_indices(self, *, empty: typing.Iterable[CStruct] = ()) -> list[int]:
+        """
+        Returns the indices of rows that are not empty. Rows that are all `0x00` or all
+        `0xFF`, as well as rows identical to any of the `empty` structs, are empty.
+        Padding is not considered.
+        """
+
+        layout = self._layout
+
+        empty_rows = {
+            layout.struct.unpack(b"\x00" * layout.size),
+            layout.struct.unpack(b"\xFF" * layout.size),
+        }
+        empty_rows.update(
+            layout.struct.unpack(e.serialize(align=self.align)) for e in empty
+        )
+
+        return [
+            index
+            for index, row in enumerate(zip(*self.columns))
+            if row not in empty_rows
+        ]
+
+    def live(self, *, empty: typing.Iterable[CStruct] = ()) -> list[CStruct]:
+        """
+        Returns the structs of all rows that are not empty.
+        """
+
+        return [self[index] for index in self.live_indices(empty=empty)]
+
+    def serialize(self) -> bytes:
+        return self._data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, collections.abc.Sequence) or isinstance(
+            other, (str, bytes)
+        ):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.struct_type.__name__}, {list(self)!r})"
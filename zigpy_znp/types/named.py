@@ -71,13 +71,27 @@ class AddrModeAddress:
 
     @classmethod
     def deserialize(cls, data: bytes) -> tuple[AddrModeAddress, bytes]:
-        mode, data = AddrMode.deserialize(data)
-        address, data = zigpy_types.EUI64.deserialize(data)
+        value, offset = cls.deserialize_from(data)
 
-        if mode != AddrMode.IEEE:
-            address, _ = zigpy_types.NWK.deserialize(address.serialize())
+        return value, data[offset:]
 
-        return cls(mode=mode, address=address), data
+    @classmethod
+    def deserialize_from(cls, data, offset: int = 0) -> tuple[AddrModeAddress, int]:
+        mode, offset = basic.deserialize_from(AddrMode, data, offset)
+
+        if len(data) - offset < 8:
+            raise ValueError(
+                f"Data is too short to contain an address: {bytes(data[offset:])!r}"
+            )
+
+        if mode == AddrMode.IEEE:
+            address, offset = basic.deserialize_from(zigpy_types.EUI64, data, offset)
+        else:
+            # NWK addresses are padded to the size of an IEEE address
+            address, _ = basic.deserialize_from(zigpy_types.NWK, data, offset)
+            offset += 8
+
+        return cls(mode=mode, address=address), offset
 
     def serialize(self) -> bytes:
         result = (
@@ -1,33 +1,56 @@
 from __future__ import annotations
 
-import typing
 import asyncio
 import logging
 
 import zigpy.config
 import zigpy.serial
 
+import zigpy_znp.types as t
 import zigpy_znp.config as conf
 import zigpy_znp.frames as frames
 import zigpy_znp.logger as log
-from zigpy_znp.types import Bytes
-from zigpy_znp.exceptions import InvalidFrame
+from zigpy_znp.liveness import UartError
 
 LOGGER = logging.getLogger(__name__)
 
+# Each byte on the wire is framed by a start and a stop bit
+UART_BITS_PER_BYTE = 10
 
-class BufferTooShort(Exception):
-    pass
+# How far ahead of the UART, in bytes, writers may get before they are paced. This is
+# roughly one maximally-sized MT frame, which the radio is always able to buffer.
+UART_MAX_TX_LEAD = 256
 
 
 class ZnpMtProtocol(asyncio.Protocol):
-    def __init__(self, api, *, url: str | None = None) -> None:
+    def __init__(
+        self, api, *, url: str | None = None, baudrate: int | None = None
+    ) -> None:
         self._buffer = bytearray()
         self._api = api
         self._transport = None
         self._connected_event = asyncio.Event()
 
+        # Outgoing frames are queued and written out together once per loop iteration
+        self._tx_queue: list[bytes | bytearray] = []
+        self._tx_flush_handle: asyncio.Handle | None = None
+
+        # Set while the transport is accepting data, cleared by `pause_writing`
+        self._writing_allowed = asyncio.Event()
+        self._writing_allowed.set()
+
+        # Loop time at which the UART is expected to finish sending everything written
+        self._tx_idle_at = 0.0
+
+        # The radio and its bootloader can send anything while they start up, so UART
+        # errors are only reported once a valid frame has been received
+        self._synced = False
+
+        # Set while skipping over garbage, so that a run of it is reported only once
+        self._resyncing = False
+
         self.url = url
+        self.baudrate = baudrate
 
     def close(self) -> None:
         """Closes the port."""
@@ -35,9 +58,15 @@ class ZnpMtProtocol(asyncio.Protocol):
         self._api = None
         self._buffer.clear()
 
+        # Nothing can be written anymore so wake up anyone waiting on the transport
+        self._writing_allowed.set()
+
         if self._transport is not None:
             LOGGER.debug("Closing serial port")
 
+            # Anything queued during this loop iteration is still sent out
+            self._flush_writes()
+
             self._transport.close()
             self._transport = None
 
@@ -64,13 +93,15 @@ class ZnpMtProtocol(asyncio.Protocol):
         """Callback when data is received."""
         self._buffer += data
 
-        LOGGER.log(log.TRACE, "Received data: %s", Bytes.__repr__(data))
+        # Formatting the data is expensive so only do it when it will actually be logged
+        if LOGGER.isEnabledFor(log.TRACE):
+            LOGGER.log(log.TRACE, "Received data: %s", t.Bytes.__repr__(data))
 
         for frame in self._extract_frames():
             LOGGER.log(log.TRACE, "Parsed frame: %s", frame)
 
             try:
-                self._api.frame_received(frame.payload)
+                self._api.frame_received(frame)
             except Exception as e:
                 LOGGER.error(
                     "Received an exception while passing frame to API: %s",
@@ -78,17 +109,113 @@ class ZnpMtProtocol(asyncio.Protocol):
                     exc_info=e,
                 )
 
+    def pause_writing(self) -> None:
+        """The transport's write buffer has passed its high-water mark."""
+        LOGGER.debug("Transport write buffer is full, pausing writes")
+        self._writing_allowed.clear()
+
+    def resume_writing(self) -> None:
+        """The transport's write buffer has drained below its low-water mark."""
+        LOGGER.debug("Transport write buffer has drained, resuming writes")
+        self._writing_allowed.set()
+
+    async def drain(self) -> None:
+        """
+        Waits until the transport can accept more data and the UART has caught up with
+        what has already been written to it.
+        """
+
+        await self._writing_allowed.wait()
+        delay = self._tx_delay()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def tx_ready(self) -> bool:
+        """
+        Whether more data can be written right now without waiting in `drain`.
+        """
+
+        return self._writing_allowed.is_set() and self._tx_delay() <= 0
+
+    def _tx_delay(self) -> float:
+        if self.baudrate is None or self._transport is None:
+            return 0.0
+
+        return (
+            self._tx_idle_at
+            - asyncio.get_running_loop().time()
+            - UART_MAX_TX_LEAD * UART_BITS_PER_BYTE / self.baudrate
+        )
+
     def send(self, payload: frames.GeneralFrame) -> None:
         """Sends data taking care of framing."""
         self.write(frames.TransportFrame(payload).serialize())
 
-    def write(self, data: bytes) -> None:
+    def write(self, data: bytes | bytearray) -> None:
         """
         Writes raw bytes to the transport. This method should be used instead of
         directly writing to the transport with `transport.write`.
+
+        Writes are only coalesced when called from within the running event loop.
+        Without one, any queued frames and `data` are written out immediately.
         """
 
-        LOGGER.log(log.TRACE, "Sending data: %s", Bytes.__repr__(data))
+        if LOGGER.isEnabledFor(log.TRACE):
+            LOGGER.log(log.TRACE, "Sending data: %s", t.Bytes.__repr__(data))
+
+        # Frames written while a flush is pending are sent together with it
+        if self._tx_flush_handle is not None:
+            self._tx_queue.append(data)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # There is no end of the loop iteration to wait for
+            self._flush_writes()
+            self._transport_write(data)
+            return
+
+        # The first frame in a loop iteration goes out immediately, everything written
+        # after it is coalesced into a single write at the end of the iteration
+        self._tx_flush_handle = loop.call_soon(self._flush_writes)
+        self._transport_write(data)
+
+    def _flush_writes(self) -> None:
+        """
+        Writes every queued frame to the transport with a single call.
+        """
+
+        if self._tx_flush_handle is not None:
+            self._tx_flush_handle.cancel()
+            self._tx_flush_handle = None
+
+        if not self._tx_queue:
+            return
+
+        data = b"".join(self._tx_queue)
+        self._tx_queue.clear()
+
+        self._transport_write(data)
+
+    def _transport_write(self, data: bytes | bytearray) -> None:
+        if self._transport is None:
+            LOGGER.debug("Transport is closed, dropping %d bytes", len(data))
+            return
+
+        if self.baudrate is not None:
+            try:
+                now = asyncio.get_running_loop().time()
+            except RuntimeError:
+                # Writers are only paced from within the event loop
+                now = self._tx_idle_at
+
+            self._tx_idle_at = (
+                max(now, self._tx_idle_at)
+                + len(data) * UART_BITS_PER_BYTE / self.baudrate
+            )
+
         self._transport.write(data)
 
     def set_dtr_rts(self, *, dtr: bool, rts: bool) -> None:
@@ -101,54 +228,80 @@ class ZnpMtProtocol(asyncio.Protocol):
         self._transport.serial.dtr = dtr
         self._transport.serial.rts = rts
 
-    def _extract_frames(self) -> typing.Iterator[frames.TransportFrame]:
-        """Extracts frames from the buffer until it is exhausted."""
-        while True:
-            try:
-                yield self._extract_frame()
-            except BufferTooShort:
-                # If the buffer is too short, there is nothing more we can do
-                break
-            except InvalidFrame:
+    def _extract_frames(self) -> list[frames.GeneralFrame]:
+        """
+        Extracts every complete frame from the buffer. Frames are parsed in place and
+        the buffer is compacted only once, after all of them have been extracted.
+        """
+
+        buffer = self._buffer
+        size = len(buffer)
+        offset = 0
+        extracted = []
+
+        with memoryview(buffer) as view:
+            # The shortest possible frame is 5 bytes long:
+            # [SoF:1] [Length:1] [Command:2] [Data:(Length)] [FCS:1]
+            while size - offset >= 5:
+                length = buffer[offset + 1]
+                end = offset + length + 5
+
+                if buffer[offset] == frames.TransportFrame.SOF and length <= 250:
+                    if end > size:
+                        # Wait for the rest of the frame
+                        break
+
+                    if (
+                        frames.xor_checksum(view[offset + 1 : end - 1])
+                        == buffer[end - 1]
+                    ):
+                        extracted.append(
+                            frames.GeneralFrame(
+                                t.CommandHeader(
+                                    buffer[offset + 2] | (buffer[offset + 3] << 8)
+                                ),
+                                t.Bytes(view[offset + 4 : end - 1]),
+                            )
+                        )
+                        offset = end
+
+                        self._synced = True
+                        self._resyncing = False
+                        continue
+
+                    self._uart_error(UartError.CHECKSUM)
+                else:
+                    self._uart_error(UartError.RESYNC)
+
                 # If the buffer contains invalid data, drop it until we find the SoF
-                sof_index = self._buffer.find(frames.TransportFrame.SOF, 1)
+                sof_index = buffer.find(frames.TransportFrame.SOF, offset + 1)
 
                 if sof_index < 0:
                     # If we don't have a SoF in the buffer, drop everything
-                    self._buffer.clear()
+                    offset = size
                 else:
-                    del self._buffer[:sof_index]
-
-    def _extract_frame(self) -> frames.TransportFrame:
-        """Extracts a single frame from the buffer."""
-
-        # The shortest possible frame is 5 bytes long
-        if len(self._buffer) < 5:
-            raise BufferTooShort()
-
-        # The buffer must start with a SoF
-        if self._buffer[0] != frames.TransportFrame.SOF:
-            raise InvalidFrame()
+                    offset = sof_index
 
-        length = self._buffer[1]
+        if offset > 0:
+            del buffer[:offset]
 
-        # If the packet length field exceeds 250, our packet is not valid
-        if length > 250:
-            raise InvalidFrame()
+        return extracted
 
-        # Don't bother deserializing anything if the packet is too short
-        # [SoF:1] [Length:1] [Command:2] [Data:(Length)] [FCS:1]
-        if len(self._buffer) < length + 5:
-            raise BufferTooShort()
+    def _uart_error(self, error: UartError) -> None:
+        LOGGER.debug("Dropping corrupted data from the UART: %s", error.value)
 
-        # At this point we should have a complete frame
-        # If not, deserialization will fail and the error will propapate up
-        frame, rest = frames.TransportFrame.deserialize(self._buffer)
+        if error is UartError.RESYNC:
+            # A run of garbage is skipped in several steps when it is received in
+            # chunks or contains bytes that look like a SoF
+            if self._resyncing:
+                return
 
-        # If we get this far then we have a valid frame. Update the buffer.
-        del self._buffer[: len(self._buffer) - len(rest)]
+            self._resyncing = True
+        else:
+            self._resyncing = False
 
-        return frame
+        if self._synced and self._api is not None:
+            self._api.uart_error(error)
 
     def __repr__(self) -> str:
         return (
@@ -170,7 +323,7 @@ async def connect(config: conf.ConfigType, api) -> ZnpMtProtocol:
 
     _, protocol = await zigpy.serial.create_serial_connection(
         loop=loop,
-        protocol_factory=lambda: ZnpMtProtocol(api, url=port),
+        protocol_factory=lambda: ZnpMtProtocol(api, url=port, baudrate=baudrate),
         url=port,
         baudrate=baudrate,
         xonxoff=(flow_control == "software"),
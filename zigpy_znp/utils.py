@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import time
+import heapq
 import typing
 import asyncio
 import inspect
 import logging
 import functools
+import itertools
+import collections
 import dataclasses
 
 import zigpy_znp.types as t
+import zigpy_znp.logger as log
 
 LOGGER = logging.getLogger(__name__)
 
+KeyT = typing.TypeVar("KeyT", bound=typing.Hashable)
+
 
 def deduplicate_commands(
     commands: typing.Iterable[t.CommandBase],
@@ -132,6 +139,9 @@ class CallbackResponseListener(BaseResponseListener):
     """
 
     callback: typing.Callable[[t.CommandBase], typing.Any]
+    engine: CallbackEngine | None = dataclasses.field(
+        default=None, compare=False, repr=False
+    )
 
     def _resolve(self, response: t.CommandBase) -> bool:
         try:
@@ -140,7 +150,10 @@ class CallbackResponseListener(BaseResponseListener):
 
             # Run coroutines in the background
             if asyncio.iscoroutine(result):
-                asyncio.create_task(result)
+                if self.engine is not None:
+                    self.engine.submit(result)
+                else:
+                    asyncio.create_task(result)
         except Exception:
             LOGGER.warning(
                 "Caught an exception while executing callback", exc_info=True
@@ -165,6 +178,680 @@ class CatchAllResponse:
         return True
 
 
+def index_key(
+    command: t.CommandBase,
+) -> tuple[tuple[str, ...], tuple[typing.Any, ...]] | None:
+    """
+    Returns the names and values of every parameter bound by a partial command, which
+    any command it matches must share. `None` is returned if they can't be hashed.
+    """
+
+    if not isinstance(command, t.CommandBase):
+        return None
+
+    names = []
+    values = []
+
+    for name, value in command.as_dict().items():
+        if value is not None:
+            names.append(name)
+            values.append(value)
+
+    try:
+        hash(tuple(values))
+    except TypeError:
+        return None
+
+    return tuple(names), tuple(values)
+
+
+@dataclasses.dataclass(frozen=True)
+class ListenerGauges:
+    """
+    Number of listeners currently registered, by type.
+    """
+
+    one_shot: int = 0
+    callback: int = 0
+
+
+class ListenerBucket:
+    """
+    Listeners registered for a single command header. One-shot listeners are indexed by
+    the parameter values their commands require, so finding the few that can match a
+    response is a dictionary lookup instead of a scan.
+    """
+
+    def __init__(self, header: typing.Any) -> None:
+        self.header = header
+
+        # Listeners keyed by their registration order
+        self._listeners: dict[int, BaseResponseListener] = {}
+        self._callbacks: dict[int, CallbackResponseListener] = {}
+        self._unindexed: dict[int, OneShotResponseListener] = {}
+
+        # Parameter names -> parameter values -> one-shot listeners
+        self._index: dict[
+            tuple[str, ...], dict[tuple, dict[int, OneShotResponseListener]]
+        ] = {}
+        self._index_keys: dict[int, list[tuple[tuple[str, ...], tuple]]] = {}
+
+    @property
+    def gauges(self) -> ListenerGauges:
+        return ListenerGauges(
+            one_shot=len(self._listeners) - len(self._callbacks),
+            callback=len(self._callbacks),
+        )
+
+    def add(self, order: int, listener: BaseResponseListener, commands) -> None:
+        self._listeners[order] = listener
+
+        if not isinstance(listener, OneShotResponseListener):
+            self._callbacks[order] = listener
+            return
+
+        keys = []
+
+        for command in commands:
+            key = index_key(command)
+
+            if key is None:
+                self._unindexed[order] = listener
+                continue
+
+            names, values = key
+            self._index.setdefault(names, {}).setdefault(values, {})[order] = listener
+            keys.append(key)
+
+        if keys:
+            self._index_keys[order] = keys
+
+    def remove(self, order: int) -> None:
+        self._listeners.pop(order, None)
+        self._callbacks.pop(order, None)
+        self._unindexed.pop(order, None)
+
+        for names, values in self._index_keys.pop(order, ()):
+            by_values = self._index[names]
+            listeners = by_values[values]
+            del listeners[order]
+
+            # Don't leave behind empty indices
+            if not listeners:
+                del by_values[values]
+
+            if not by_values:
+                del self._index[names]
+
+    def candidates(
+        self, response: t.CommandBase
+    ) -> list[tuple[int, BaseResponseListener]]:
+        """
+        Returns every listener that could match the response, in registration order.
+        """
+
+        candidates = {**self._callbacks, **self._unindexed}
+
+        for names, by_values in self._index.items():
+            try:
+                values = tuple(getattr(response, name) for name in names)
+                listeners = by_values.get(values)
+            except TypeError:
+                # Unhashable values cannot be looked up so we fall back to scanning
+                for listeners in by_values.values():
+                    candidates.update(listeners)
+            else:
+                if listeners is not None:
+                    candidates.update(listeners)
+
+        return sorted(candidates.items(), key=lambda item: item[0])
+
+    def __iter__(self) -> typing.Iterator[BaseResponseListener]:
+        return iter(list(self._listeners.values()))
+
+    def __len__(self) -> int:
+        return len(self._listeners)
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, ListenerBucket):
+            return NotImplemented
+
+        return self.header == other.header and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {list(self)!r}>"
+
+
+class ListenerRegistry:
+    """
+    Listeners keyed by the headers of the commands they match. Listeners are tracked by
+    identity so adding and removing one takes constant time, and the number of each
+    type that is registered is kept up to date as they come and go.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[typing.Any, ListenerBucket] = {}
+        self._counter = itertools.count()
+
+        # Registration order and remaining headers of every listener, by identity
+        self._registrations: dict[int, tuple[int, set[typing.Any]]] = {}
+
+        self.one_shot_count = 0
+        self.callback_count = 0
+
+    @property
+    def gauges(self) -> ListenerGauges:
+        """
+        Number of listeners of each type that are currently registered.
+        """
+
+        return ListenerGauges(
+            one_shot=self.one_shot_count, callback=self.callback_count
+        )
+
+    def header_gauges(self) -> dict[typing.Any, ListenerGauges]:
+        """
+        Number of listeners of each type that are currently registered, by header.
+        """
+
+        return {header: bucket.gauges for header, bucket in self._buckets.items()}
+
+    def _update_gauges(self, listener: BaseResponseListener, delta: int) -> None:
+        if isinstance(listener, OneShotResponseListener):
+            self.one_shot_count += delta
+        else:
+            self.callback_count += delta
+
+    def add(self, listener: BaseResponseListener) -> None:
+        """
+        Registers a listener for all of the commands it matches.
+        """
+
+        # Registering a listener twice only moves it to the back of the queue
+        self.remove(listener)
+
+        order = next(self._counter)
+        headers = listener.matching_headers()
+        self._registrations[id(listener)] = (order, headers)
+        self._update_gauges(listener, +1)
+
+        for header in headers:
+            commands = [c for c in listener.matching_commands if c.header == header]
+
+            if header not in self._buckets:
+                self._buckets[header] = ListenerBucket(header)
+
+            self._buckets[header].add(order, listener, commands)
+
+    def remove(self, listener: BaseResponseListener) -> None:
+        """
+        Unregisters a listener. Does nothing if it is not registered.
+        """
+
+        registration = self._registrations.pop(id(listener), None)
+
+        if registration is None:
+            return
+
+        order, headers = registration
+        self._update_gauges(listener, -1)
+
+        for header in headers:
+            self._remove_from_bucket(header, order)
+
+    def _remove_from_bucket(self, header: typing.Any, order: int) -> None:
+        bucket = self._buckets[header]
+        bucket.remove(order)
+
+        if not bucket:
+            LOGGER.log(
+                log.TRACE, "Cleaning up empty listener list for header %s", header
+            )
+            del self._buckets[header]
+
+    def resolve(self, response: t.CommandBase) -> bool:
+        """
+        Resolves every listener matching the response, returning whether any did.
+        A single response resolves at most one one-shot listener.
+        """
+
+        candidates = []
+
+        for header in (response.header, CatchAllResponse.header):
+            bucket = self._buckets.get(header)
+
+            if bucket is not None:
+                candidates.extend(
+                    listener for _, listener in bucket.candidates(response)
+                )
+
+        matched = False
+        one_shot_matched = False
+
+        for listener in candidates:
+            # XXX: A single response should *not* resolve multiple one-shot listeners!
+            #      `future.add_done_callback` doesn't remove our listeners synchronously
+            #      so doesn't prevent this from happening.
+            if one_shot_matched and isinstance(listener, OneShotResponseListener):
+                continue
+
+            if not listener.resolve(response):
+                LOGGER.log(log.TRACE, "%s does not match %s", response, listener)
+                continue
+
+            matched = True
+            LOGGER.log(log.TRACE, "%s matches %s", response, listener)
+
+            if isinstance(listener, OneShotResponseListener):
+                one_shot_matched = True
+
+        return matched
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._registrations.clear()
+        self.one_shot_count = 0
+        self.callback_count = 0
+
+    def get(self, header, default=None) -> ListenerBucket | None:
+        return self._buckets.get(header, default)
+
+    def __getitem__(self, header) -> ListenerBucket:
+        # Looking up a header that has no listeners does not create an empty bucket
+        try:
+            return self._buckets[header]
+        except KeyError:
+            return ListenerBucket(header)
+
+    def __contains__(self, header) -> bool:
+        return header in self._buckets
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __iter__(self) -> typing.Iterator:
+        return iter(self._buckets)
+
+    def keys(self):
+        return self._buckets.keys()
+
+    def values(self):
+        return self._buckets.values()
+
+    def items(self):
+        return self._buckets.items()
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, ListenerRegistry):
+            return NotImplemented
+
+        return self._buckets == other._buckets and self.gauges == other.gauges
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._buckets!r}>"
+
+
+class DeadlineQueue:
+    """
+    Expires futures at their deadlines. Deadlines are kept in a heap and a single event
+    loop timer is scheduled for the earliest one, so waiting on many futures at once
+    does not require a timer handle or a task for each of them.
+
+    Futures that complete before their deadline are left in the heap and are skipped
+    once they reach the top of it.
+    """
+
+    # The heap is compacted once it holds this many entries, whichever is larger
+    MIN_COMPACT_SIZE = 64
+
+    # Event loops run timers up to one tick of their clock early
+    CLOCK_RESOLUTION = time.get_clock_info("monotonic").resolution
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, asyncio.Future, typing.Callable | None]] = []
+        self._counter = itertools.count()
+        self._compact_at = self.MIN_COMPACT_SIZE
+
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_when: float | None = None
+
+    def add(
+        self,
+        future: asyncio.Future,
+        timeout: float,
+        callback: typing.Callable[[], typing.Any] | None = None,
+    ) -> None:
+        """
+        Fails the future with a `TimeoutError` if it is not done within `timeout`
+        seconds. If a callback is provided, it is called instead.
+        """
+
+        loop = asyncio.get_running_loop()
+        when = loop.time() + timeout
+
+        heapq.heappush(self._heap, (when, next(self._counter), future, callback))
+
+        if len(self._heap) >= self._compact_at:
+            self._compact()
+
+        if self._timer_when is None or when < self._timer_when:
+            self._schedule(loop, when)
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if not entry[2].done()]
+        heapq.heapify(self._heap)
+
+        self._compact_at = max(self.MIN_COMPACT_SIZE, 2 * len(self._heap))
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, when: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+
+        self._timer = loop.call_at(when, self._expire)
+        self._timer_when = when
+
+    def _expire(self) -> None:
+        self._timer = None
+        self._timer_when = None
+
+        loop = asyncio.get_running_loop()
+        now = loop.time() + getattr(loop, "_clock_resolution", self.CLOCK_RESOLUTION)
+        heap = self._heap
+
+        while heap and (heap[0][0] <= now or heap[0][2].done()):
+            _, _, future, callback = heapq.heappop(heap)
+
+            if future.done():
+                continue
+
+            if callback is None:
+                future.set_exception(asyncio.TimeoutError())
+                continue
+
+            try:
+                callback()
+            except Exception:
+                LOGGER.warning(
+                    "Caught an exception while expiring %s", future, exc_info=True
+                )
+
+        if heap:
+            self._schedule(loop, heap[0][0])
+
+    def clear(self) -> None:
+        """
+        Forgets every deadline without expiring anything.
+        """
+
+        if self._timer is not None:
+            self._timer.cancel()
+
+        self._timer = None
+        self._timer_when = None
+        self._heap.clear()
+        self._compact_at = self.MIN_COMPACT_SIZE
+
+    def __len__(self) -> int:
+        """
+        Number of futures with a deadline that are not done yet.
+        """
+
+        return sum(not entry[2].done() for entry in self._heap)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} pending={len(self)}>"
+
+
+@dataclasses.dataclass(frozen=True)
+class RoundTripStats:
+    """
+    Smoothed round-trip time and its mean deviation for one class of requests, in
+    seconds, and how many times its timeout has been doubled since the last sample.
+    """
+
+    samples: int
+    srtt: float
+    rttvar: float
+    backoff: int = 0
+
+    @property
+    def rto(self) -> float:
+        """
+        Retransmission timeout, as computed by TCP (RFC 6298).
+        """
+
+        return (self.srtt + 4 * self.rttvar) * 2**self.backoff
+
+
+class RoundTripEstimator(typing.Generic[KeyT]):
+    """
+    Estimates how long the radio takes to respond to each class of requests. Timeouts
+    derived from the estimates let a stalled radio be detected in about as long as a
+    slow response takes, instead of after the worst case timeout.
+    """
+
+    # Gains from RFC 6298
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+
+    # Every request that times out doubles the next timeout, up to this many times
+    MAX_BACKOFF = 6
+
+    def __init__(self) -> None:
+        self._stats: dict[KeyT, RoundTripStats] = {}
+
+    def sample(self, key: KeyT, rtt: float) -> None:
+        """
+        Records a measured round-trip time.
+        """
+
+        stats = self._stats.get(key)
+
+        if stats is None:
+            self._stats[key] = RoundTripStats(samples=1, srtt=rtt, rttvar=rtt / 2)
+            return
+
+        self._stats[key] = RoundTripStats(
+            samples=stats.samples + 1,
+            srtt=(1 - self.ALPHA) * stats.srtt + self.ALPHA * rtt,
+            rttvar=(1 - self.BETA) * stats.rttvar + self.BETA * abs(stats.srtt - rtt),
+        )
+
+    def timed_out(self, key: KeyT) -> None:
+        """
+        Backs off the timeout of a request that did not receive a response in time.
+        """
+
+        stats = self._stats.get(key)
+
+        if stats is not None and stats.backoff < self.MAX_BACKOFF:
+            self._stats[key] = dataclasses.replace(stats, backoff=stats.backoff + 1)
+
+    def timeout(self, key: KeyT, *, minimum: float, maximum: float) -> float:
+        """
+        Timeout for the next request, bounded by `minimum` and `maximum`. Requests that
+        have never been measured use `maximum`.
+        """
+
+        stats = self._stats.get(key)
+
+        if stats is None:
+            return maximum
+
+        return min(max(stats.rto, minimum), maximum)
+
+    def stats(self) -> dict[KeyT, RoundTripStats]:
+        return dict(self._stats)
+
+    def clear(self) -> None:
+        self._stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._stats!r}>"
+
+
+@dataclasses.dataclass(frozen=True)
+class CallbackEngineCounters:
+    """
+    Number of coroutine callbacks run by a `CallbackEngine`, by how they finished, and
+    the number currently waiting or running.
+    """
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    queued: int = 0
+    running: int = 0
+
+
+class CallbackEngine:
+    """
+    Runs coroutine callbacks in the background on long-lived worker tasks instead of
+    creating a task for every callback. Idle workers are reused and new ones are only
+    started when all of them are busy. If `max_workers` is set, at most that many
+    callbacks run at once and the rest wait in a FIFO queue.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers = max_workers
+
+        self._queue: collections.deque[typing.Coroutine] = collections.deque()
+        self._idle: collections.deque[asyncio.Future] = collections.deque()
+        self._workers: set[asyncio.Task] = set()
+
+        # Workers that were cancelled by `close` but have not finished yet
+        self._closing: set[asyncio.Task] = set()
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._running = 0
+
+    def submit(self, coroutine: typing.Coroutine) -> None:
+        """
+        Runs a coroutine as soon as a worker is free.
+        """
+
+        self._submitted += 1
+        self._queue.append(coroutine)
+
+        # Coroutines stay queued until a worker starts them, so that `close` can always
+        # find the ones that never ran
+        while self._idle:
+            waiter = self._idle.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        if self._max_workers is None or len(self._workers) < self._max_workers:
+            worker = asyncio.get_running_loop().create_task(self._worker())
+            self._workers.add(worker)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if not self._queue:
+                waiter = loop.create_future()
+                self._idle.append(waiter)
+                await waiter
+
+                # Another worker may have taken the coroutine first
+                continue
+
+            coroutine = self._queue.popleft()
+            self._running += 1
+
+            try:
+                await coroutine
+            except asyncio.CancelledError:
+                # Workers are only cancelled when the engine is closed, which also
+                # resets the counters
+                if asyncio.current_task() not in self._workers:
+                    raise
+
+                self._running -= 1
+                self._dropped += 1
+            except Exception:
+                self._running -= 1
+                self._failed += 1
+                LOGGER.warning(
+                    "Caught an exception while executing callback", exc_info=True
+                )
+            else:
+                self._running -= 1
+                self._completed += 1
+
+    def counters(self) -> CallbackEngineCounters:
+        return CallbackEngineCounters(
+            submitted=self._submitted,
+            completed=self._completed,
+            failed=self._failed,
+            dropped=self._dropped,
+            queued=len(self._queue),
+            running=self._running,
+        )
+
+    def close(self) -> None:
+        """
+        Cancels every worker. Callbacks that have not started yet are never run. Use
+        `wait_closed` to wait for the cancelled workers to finish.
+        """
+
+        for coroutine in self._queue:
+            coroutine.close()
+
+        self._queue.clear()
+
+        for waiter in self._idle:
+            waiter.cancel()
+
+        self._idle.clear()
+
+        for worker in self._workers:
+            worker.cancel()
+            self._closing.add(worker)
+            worker.add_done_callback(self._closing.discard)
+
+        self._workers.clear()
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._running = 0
+
+    async def wait_closed(self) -> None:
+        """
+        Waits until every worker cancelled by `close` has finished.
+        """
+
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def __len__(self) -> int:
+        """
+        Number of callbacks that are queued or running.
+        """
+
+        return len(self._queue) + self._running
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}"
+            f" workers={len(self._workers)}"
+            f" queued={len(self._queue)}"
+            f" running={self._running}"
+            f">"
+        )
+
+
 def combine_concurrent_calls(
     function: typing.CoroutineFunction,
 ) -> typing.CoroutineFunction:
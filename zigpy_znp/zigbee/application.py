@@ -3,6 +3,8 @@ from __future__ import annotations
 import os
 import asyncio
 import logging
+import datetime
+import contextlib
 
 import zigpy.zcl
 import zigpy.zdo
@@ -24,13 +26,54 @@ import zigpy_znp.config as conf
 import zigpy_znp.commands as c
 from zigpy_znp.api import ZNP
 from zigpy_znp.utils import combine_concurrent_calls
-from zigpy_znp.exceptions import CommandNotRecognized, InvalidCommandResponse
+from zigpy_znp.profiler import StartupPhase
+from zigpy_znp.scheduler import PRIORITY_CLASS_WEIGHTS, PriorityClass, WeightedFairShare
+from zigpy_znp.exceptions import (
+    RequestExpired,
+    CommandNotRecognized,
+    InvalidCommandResponse,
+)
 from zigpy_znp.types.nvids import OsalNvIds
 from zigpy_znp.zigbee.device import ZNPCoordinator
 
 ZDO_ENDPOINT = 0
 ZHA_ENDPOINT = 1
 ZDO_PROFILE = 0x0000
+OTA_CLUSTER = 0x0019
+
+# ZDO requests that scan or reconfigure the network instead of discovering devices
+MAINTENANCE_ZDO_COMMANDS = {
+    zdo_t.ZDOCmd.Bind_req,
+    zdo_t.ZDOCmd.Unbind_req,
+    zdo_t.ZDOCmd.Mgmt_Lqi_req,
+    zdo_t.ZDOCmd.Mgmt_Rtg_req,
+    zdo_t.ZDOCmd.Mgmt_Bind_req,
+    zdo_t.ZDOCmd.Mgmt_NWK_Update_req,
+}
+
+# ZCL global commands that configure devices instead of controlling them
+MAINTENANCE_ZCL_COMMANDS = {
+    0x06,  # Configure Reporting
+    0x08,  # Read Reporting Configuration
+    0x0C,  # Discover Attributes
+    0x11,  # Discover Commands Received
+    0x13,  # Discover Commands Generated
+    0x15,  # Discover Attributes Extended
+}
+
+# Clusters whose commands control devices on behalf of a user, like toggling a light
+INTERACTIVE_ZCL_CLUSTERS = {
+    0x0006,  # On/Off
+    0x0008,  # Level Control
+    0x0101,  # Door Lock
+    0x0102,  # Window Covering
+    0x0300,  # Color Control
+}
+
+# Individual cluster commands that do the same: `(cluster, command)`
+INTERACTIVE_ZCL_COMMANDS = {
+    (0x0005, 0x05),  # Scenes: Recall Scene
+}
 
 # All of these are in seconds
 PROBE_TIMEOUT = 5
@@ -39,6 +82,11 @@ DATA_CONFIRM_TIMEOUT = 8
 EXTENDED_DATA_CONFIRM_TIMEOUT = 30
 DEVICE_JOIN_MAX_DELAY = 5
 
+# Packets that cannot be sent this long after they were created are dropped, their
+# senders will have given up on them
+PACKET_TTL = 20
+EXTENDED_PACKET_TTL = 60
+
 REQUEST_MAX_RETRIES = 5
 REQUEST_ERROR_RETRY_DELAY = 0.5
 
@@ -83,6 +131,10 @@ class ControllerApplication(zigpy.application.ControllerApplication):
         self._znp: ZNP | None = None
         self._version_rsp = None
         self._join_announce_tasks: dict[t.EUI64, asyncio.TimerHandle] = {}
+        self._concurrency_share = WeightedFairShare(PRIORITY_CLASS_WEIGHTS)
+
+        # Endpoints already registered on a running radio, while hot attaching to it
+        self._live_endpoints: dict[int, c.AF.Register.Req] | None = None
 
     ##################################################################
     # Implementation of the core zigpy ControllerApplication methods #
@@ -111,30 +163,50 @@ class ControllerApplication(zigpy.application.ControllerApplication):
     async def disconnect(self):
         if self._znp is not None:
             try:
-                await self._znp.reset(wait_for_reset=False)
+                # The radio keeps running the network so that we can hot attach to it
+                if not self.znp_config[conf.CONF_HOT_ATTACH]:
+                    await self._znp.reset(wait_for_reset=False)
             except Exception as e:
                 LOGGER.warning("Failed to reset before disconnect: %s", e)
             finally:
-                self._znp.close()
-                self._znp = None
+                znp, self._znp = self._znp, None
+                znp.close()
+                await znp.wait_closed()
+
+    def _endpoint_registration(
+        self, descriptor: zdo_t.SimpleDescriptor
+    ) -> c.AF.Register.Req:
+        return c.AF.Register.Req(
+            Endpoint=descriptor.endpoint,
+            ProfileId=descriptor.profile,
+            DeviceId=descriptor.device_type,
+            DeviceVersion=descriptor.device_version,
+            LatencyReq=c.af.LatencyReq.NoLatencyReqs,
+            InputClusters=descriptor.input_clusters,
+            OutputClusters=descriptor.output_clusters,
+        )
 
     async def add_endpoint(self, descriptor: zdo_t.SimpleDescriptor) -> None:
         """
         Registers a new endpoint on the device.
         """
 
-        await self._znp.request(
-            c.AF.Register.Req(
-                Endpoint=descriptor.endpoint,
-                ProfileId=descriptor.profile,
-                DeviceId=descriptor.device_type,
-                DeviceVersion=descriptor.device_version,
-                LatencyReq=c.af.LatencyReq.NoLatencyReqs,
-                InputClusters=descriptor.input_clusters,
-                OutputClusters=descriptor.output_clusters,
-            ),
-            RspStatus=t.Status.SUCCESS,
-        )
+        registration = self._endpoint_registration(descriptor)
+
+        if self._live_endpoints is not None:
+            live_registration = self._live_endpoints.get(descriptor.endpoint)
+
+            if live_registration == registration:
+                LOGGER.debug("Endpoint %d is already registered", descriptor.endpoint)
+                return
+            elif live_registration is not None:
+                # Z-Stack does not allow an endpoint to be registered twice
+                await self._znp.request(
+                    c.AF.Delete.Req(Endpoint=descriptor.endpoint),
+                    RspStatus=t.Status.SUCCESS,
+                )
+
+        await self._znp.request(registration, RspStatus=t.Status.SUCCESS)
 
     async def load_network_info(self, *, load_devices=False) -> None:
         """
@@ -173,37 +245,72 @@ class ControllerApplication(zigpy.application.ControllerApplication):
         )
 
     async def start_network(self, *, read_only=False):
+        phase = self._znp.startup_phase
+
         if self.state.node_info == zigpy.state.NodeInfo():
-            await self.load_network_info()
+            async with phase("load network info"):
+                await self.load_network_info()
+
+        hot_attached = False
+
+        if self.znp_config[conf.CONF_HOT_ATTACH]:
+            async with phase("hot attach"):
+                hot_attached = await self._hot_attach(read_only=read_only)
+
+        if hot_attached:
+            LOGGER.info("Radio is already running the network, not restarting it")
+        else:
+            if not read_only:
+                async with phase("migrate nvram"):
+                    await self._znp.migrate_nvram()
 
-        if not read_only:
-            await self._znp.migrate_nvram()
-            await self._write_stack_settings()
+                async with phase("write stack settings"):
+                    await self._write_stack_settings()
 
-        await self._znp.reset()
+            async with phase("reset"):
+                await self._znp.reset()
 
         if self.znp_config[conf.CONF_TX_POWER] is not None:
-            await self.set_tx_power(dbm=self.znp_config[conf.CONF_TX_POWER])
+            async with phase("set tx power"):
+                await self.set_tx_power(dbm=self.znp_config[conf.CONF_TX_POWER])
 
-        await self._znp.start_network()
+        if not hot_attached:
+            await self._znp.start_network()
 
-        self._version_rsp = await self._znp.request(c.SYS.Version.Req())
+        async with phase("read version"):
+            self._version_rsp = await self._znp.request(c.SYS.Version.Req())
 
         # The CC2531 running Z-Stack Home 1.2 overrides the LED setting if it is changed
         # before the coordinator has started.
         if self.znp_config[conf.CONF_LED_MODE] is not None:
-            await self._set_led_mode(led=0xFF, mode=self.znp_config[conf.CONF_LED_MODE])
+            async with phase("set led mode"):
+                await self._set_led_mode(
+                    led=0xFF, mode=self.znp_config[conf.CONF_LED_MODE]
+                )
 
-        await self.register_endpoints()
+        # Endpoints are registered while hot attaching
+        if not hot_attached:
+            async with phase("register endpoints"):
+                await self.register_endpoints()
 
-        # Receive a callback for every known ZDO command
-        await self._znp.request(c.ZDO.MsgCallbackRegister.Req(ClusterId=0xFFFF))
+        async with phase("initialize coordinator"):
+            # Receive a callback for every known ZDO command
+            await self._znp.request(c.ZDO.MsgCallbackRegister.Req(ClusterId=0xFFFF))
 
-        # Setup the coordinator as a zigpy device and initialize it to request node info
-        self.devices[self.state.node_info.ieee] = ZNPCoordinator(
-            self, self.state.node_info.ieee, self.state.node_info.nwk
+            # Setup the coordinator as a zigpy device and initialize it to request
+            # node info
+            self.devices[self.state.node_info.ieee] = ZNPCoordinator(
+                self, self.state.node_info.ieee, self.state.node_info.nwk
+            )
+            await self._device.schedule_initialize()
+
+        phases = self._znp.startup_phases()
+        LOGGER.debug(
+            "Startup took %0.3fs and %d requests: %s",
+            sum(p.duration for p in phases),
+            sum(p.sreqs for p in phases),
+            ", ".join(f"{p.name}={p.duration:0.3f}s" for p in phases),
         )
-        await self._device.schedule_initialize()
 
         # Deprecate ZNP-specific config
         if self.znp_config[conf.CONF_MAX_CONCURRENT_REQUESTS] is not None:
@@ -229,6 +336,100 @@ class ControllerApplication(zigpy.application.ControllerApplication):
                 "Your network is using the insecure Zigbee2MQTT network key!"
             )
 
+    def startup_phases(self) -> list[StartupPhase]:
+        """
+        Wall time and number of SREQs of each phase of connecting to the radio and
+        starting the network.
+        """
+
+        return self._znp.startup_phases()
+
+    async def _hot_attach(self, *, read_only: bool) -> bool:
+        """
+        Attaches to a radio that is already running our network with our settings,
+        without resetting it and starting the network again. Returns `False` if the
+        radio has to be started from scratch.
+        """
+
+        try:
+            device_info = await self._znp.request(
+                c.UTIL.GetDeviceInfo.Req(), RspStatus=t.Status.SUCCESS
+            )
+            nwk_info = await self._znp.request(c.ZDO.ExtNwkInfo.Req())
+        except CommandNotRecognized:
+            LOGGER.debug("Radio cannot report its network state, not hot attaching")
+            return False
+
+        node_info = self.state.node_info
+        network_info = self.state.network_info
+
+        if (
+            device_info.DeviceState != t.DeviceState.StartedAsCoordinator
+            or device_info.IEEE != node_info.ieee
+            or device_info.NWK != node_info.nwk
+            or nwk_info.PanId != network_info.pan_id
+            or nwk_info.ExtendedPanId != network_info.extended_pan_id
+            or nwk_info.Channel != network_info.channel
+        ):
+            LOGGER.debug(
+                "Radio is not running our network, not hot attaching: %s, %s",
+                device_info,
+                nwk_info,
+            )
+            return False
+
+        # Changed NVRAM settings only take effect once the radio is reset
+        if not read_only and (
+            await self._znp.migrate_nvram() or await self._write_stack_settings()
+        ):
+            LOGGER.debug("Stack settings have changed, not hot attaching")
+            return False
+
+        # Only endpoints that are missing or different have to be registered again
+        self._live_endpoints = await self._read_live_endpoints()
+
+        try:
+            await self.register_endpoints()
+        except (CommandNotRecognized, InvalidCommandResponse) as e:
+            LOGGER.debug("Failed to update endpoints, not hot attaching: %r", e)
+            return False
+        finally:
+            self._live_endpoints = None
+
+        return True
+
+    async def _read_live_endpoints(self) -> dict[int, c.AF.Register.Req]:
+        """
+        Reads the endpoints registered on the radio from its simple descriptors.
+        """
+
+        active_ep_rsp = await self._znp.request_callback_rsp(
+            request=c.ZDO.ActiveEpReq.Req(DstAddr=0x0000, NWKAddrOfInterest=0x0000),
+            RspStatus=t.Status.SUCCESS,
+            callback=c.ZDO.ActiveEpRsp.Callback(
+                partial=True, Src=0x0000, Status=t.ZDOStatus.SUCCESS
+            ),
+        )
+
+        endpoints = {}
+
+        for endpoint in active_ep_rsp.ActiveEndpoints:
+            simple_desc_rsp = await self._znp.request_callback_rsp(
+                request=c.ZDO.SimpleDescReq.Req(
+                    DstAddr=0x0000, NWKAddrOfInterest=0x0000, Endpoint=endpoint
+                ),
+                RspStatus=t.Status.SUCCESS,
+                callback=c.ZDO.SimpleDescRsp.Callback(
+                    partial=True, Src=0x0000, Status=t.ZDOStatus.SUCCESS
+                ),
+            )
+
+            endpoints[endpoint] = self._endpoint_registration(
+                simple_desc_rsp.SimpleDescriptor
+            )
+
+        return endpoints
+
     async def set_tx_power(self, dbm: int) -> None:
         """
         Sets the radio TX power.
@@ -622,9 +823,20 @@ class ControllerApplication(zigpy.application.ControllerApplication):
 
     async def _watchdog_feed(self):
         """
-        Watchdog loop to periodically test if Z-Stack is still running.
+        Watchdog loop to periodically test if Z-Stack is still running. Any frame
+        received from the radio proves that it is, so it is only pinged once the link
+        has been quiet for a while.
         """
 
+        quiet_for = self._znp.link_health().quiet_for
+
+        if (
+            quiet_for is not None
+            and quiet_for < self.znp_config[conf.CONF_WATCHDOG_QUIET_PERIOD]
+        ):
+            LOGGER.debug("Radio was active %0.2fs ago, not pinging it", quiet_for)
+            return
+
         await self._znp.request(c.SYS.Ping.Req())
 
     async def _set_led_mode(self, *, led: t.uint8_t, mode: c.util.LEDMode) -> None:
@@ -723,6 +935,108 @@ class ControllerApplication(zigpy.application.ControllerApplication):
 
         return candidates[-1]
 
+    def _packet_priority(self, packet: zigpy.types.ZigbeePacket) -> PriorityClass:
+        """
+        Picks the priority class of an outgoing packet based on what it contains.
+        """
+
+        if packet.dst_ep == ZDO_ENDPOINT:
+            if packet.cluster_id in MAINTENANCE_ZDO_COMMANDS:
+                return PriorityClass.MAINTENANCE
+
+            return PriorityClass.NORMAL
+
+        if packet.cluster_id == OTA_CLUSTER:
+            return PriorityClass.BULK
+
+        data = packet.data.serialize()
+
+        if not data:
+            return PriorityClass.NORMAL
+
+        frame_control = data[0]
+        frame_type = frame_control & 0b00000011
+        to_server = not frame_control & 0b00001000
+
+        # The manufacturer code is only present in manufacturer-specific frames
+        command_index = 4 if frame_control & 0b00000100 else 2
+
+        if frame_type == 0b01 and to_server and len(data) > command_index:
+            command = data[command_index]
+
+            # Other cluster commands, like adding groups, are not urgent
+            if (
+                packet.cluster_id in INTERACTIVE_ZCL_CLUSTERS
+                or (packet.cluster_id, command) in INTERACTIVE_ZCL_COMMANDS
+            ):
+                return PriorityClass.INTERACTIVE
+        elif (
+            frame_type == 0b00
+            and len(data) > command_index
+            and data[command_index] in MAINTENANCE_ZCL_COMMANDS
+        ):
+            return PriorityClass.MAINTENANCE
+
+        return PriorityClass.NORMAL
+
+    def _packet_deadline(self, packet: zigpy.types.ZigbeePacket) -> float:
+        """
+        Event loop time after which a packet is no longer worth sending.
+        """
+
+        ttl = EXTENDED_PACKET_TTL if packet.extended_timeout else PACKET_TTL
+        age = datetime.datetime.now(datetime.timezone.utc) - packet.timestamp
+
+        return asyncio.get_running_loop().time() + ttl - age.total_seconds()
+
+    def _drop_expired_packet(self, stage: str) -> RequestExpired:
+        """
+        Counts a packet that expired at the given stage of being sent.
+        """
+
+        self.state.counters["Expired_Packets"][stage].increment()
+
+        return RequestExpired(f"Packet expired before it could be sent ({stage})")
+
+    @contextlib.asynccontextmanager
+    async def _limit_concurrency(
+        self,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        deadline: float | None = None,
+    ):
+        """
+        Limits the number of concurrent requests, admitting waiting requests fairly
+        according to their priority class. Requests still waiting at their `deadline`
+        are dropped.
+        """
+
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            raise self._drop_expired_packet("admission")
+
+        tag = self._concurrency_share.tag(priority_class)
+
+        if self._concurrent_requests_semaphore.locked():
+            LOGGER.debug(
+                "Max concurrency (%s) reached, delaying %s request (%s enqueued)",
+                self._concurrent_requests_semaphore.max_value,
+                priority_class.name,
+                self._concurrent_requests_semaphore.num_waiting,
+            )
+
+        # The semaphore wakes up the waiter with the highest priority first
+        try:
+            async with async_timeout.timeout_at(deadline):
+                await self._concurrent_requests_semaphore.acquire(priority=-tag)
+        except asyncio.TimeoutError:
+            raise self._drop_expired_packet("admission") from None
+
+        self._concurrency_share.served(tag)
+
+        try:
+            yield
+        finally:
+            self._concurrent_requests_semaphore.release()
+
     async def _send_request_raw(
         self,
         dst_addr: t.AddrModeAddress,
@@ -737,6 +1051,8 @@ class ControllerApplication(zigpy.application.ControllerApplication):
         *,
         relays: list[int] | None = None,
         extended_timeout: bool = False,
+        priority_class: PriorityClass = PriorityClass.NORMAL,
+        deadline: float | None = None,
     ) -> None:
         """
         Used by `request`/`mrequest`/`broadcast` to send a request.
@@ -799,6 +1115,8 @@ class ControllerApplication(zigpy.application.ControllerApplication):
                     callback=c.ZDO.MgmtPermitJoinRsp.Callback(
                         Src=permit_addr, partial=True
                     ),
+                    priority_class=priority_class,
+                    deadline=deadline,
                 )
             # Internally forward ZDO requests destined for the coordinator back to zigpy
             # so we can send internal Z-Stack requests when necessary
@@ -838,37 +1156,42 @@ class ControllerApplication(zigpy.application.ControllerApplication):
 
         if dst_ep == ZDO_ENDPOINT or dst_addr.mode == t.AddrMode.Broadcast:
             # Broadcasts and ZDO requests will not receive a confirmation
-            await self._znp.request(request=request, RspStatus=t.Status.SUCCESS)
+            await self._znp.request(
+                request=request,
+                RspStatus=t.Status.SUCCESS,
+                priority_class=priority_class,
+                deadline=deadline,
+            )
         else:
-            async with async_timeout.timeout(
-                EXTENDED_DATA_CONFIRM_TIMEOUT
-                if extended_timeout
-                else DATA_CONFIRM_TIMEOUT
-            ):
-                # Shield from cancellation to prevent requests that time out in higher
-                # layers from missing expected responses
-                response = await asyncio.shield(
-                    self._znp.request_callback_rsp(
-                        request=request,
-                        RspStatus=t.Status.SUCCESS,
-                        callback=c.AF.DataConfirm.Callback(
-                            partial=True,
-                            TSN=sequence,
-                            # XXX: can this ever not match?
-                            # Endpoint=src_ep,
-                        ),
-                        # Multicasts eventually receive a confirmation but waiting for
-                        # it is unnecessary
-                        background=(dst_addr.mode == t.AddrMode.Group),
-                    )
-                )
+            # Requests that time out here or in higher layers keep running in the
+            # background to prevent them from missing expected responses
+            response = await self._znp.request_callback_rsp(
+                request=request,
+                RspStatus=t.Status.SUCCESS,
+                callback=c.AF.DataConfirm.Callback(
+                    partial=True,
+                    TSN=sequence,
+                    # XXX: can this ever not match?
+                    # Endpoint=src_ep,
+                ),
+                wait_timeout=(
+                    EXTENDED_DATA_CONFIRM_TIMEOUT
+                    if extended_timeout
+                    else DATA_CONFIRM_TIMEOUT
+                ),
+                # Multicasts eventually receive a confirmation but waiting for
+                # it is unnecessary
+                background=(dst_addr.mode == t.AddrMode.Group),
+                priority_class=priority_class,
+                deadline=deadline,
+            )
 
-                # Both the callback and the response can have an error status
-                if response.Status != t.Status.SUCCESS:
-                    raise InvalidCommandResponse(
-                        f"Unsuccessful request status code: {response.Status!r}",
-                        response,
-                    )
+            # Both the callback and the response can have an error status
+            if response.Status != t.Status.SUCCESS:
+                raise InvalidCommandResponse(
+                    f"Unsuccessful request status code: {response.Status!r}",
+                    response,
+                )
 
     @combine_concurrent_calls
     async def _discover_route(self, nwk: t.NWK) -> None:
@@ -917,6 +1240,8 @@ class ControllerApplication(zigpy.application.ControllerApplication):
             device = None
 
         dst_addr = t.AddrModeAddress.from_zigpy_type(packet.dst)
+        priority_class = self._packet_priority(packet)
+        deadline = self._packet_deadline(packet)
 
         succeeded = False
         association = None
@@ -931,8 +1256,12 @@ class ControllerApplication(zigpy.application.ControllerApplication):
         # Don't release the concurrency-limiting semaphore until we are done trying.
         # There is no point in allowing requests to take turns getting buffer errors.
         try:
-            async with self._limit_concurrency():
+            async with self._limit_concurrency(priority_class, deadline):
                 for attempt in range(REQUEST_MAX_RETRIES):
+                    # There is no point in retrying a packet nobody is waiting for
+                    if attempt > 0 and asyncio.get_running_loop().time() >= deadline:
+                        raise self._drop_expired_packet("retry")
+
                     try:
                         # ZDO requests do not generate `AF.DataConfirm` messages
                         # indicating that a route is missing so we need to explicitly
@@ -950,7 +1279,9 @@ class ControllerApplication(zigpy.application.ControllerApplication):
                                         c.zdo.RouteOptions.MTO_ROUTE
                                         | c.zdo.RouteOptions.NO_ROUTE_CACHE
                                     ),
-                                )
+                                ),
+                                priority_class=priority_class,
+                                deadline=deadline,
                             )
 
                             if route_status.Status != c.zdo.RoutingStatus.SUCCESS:
@@ -968,9 +1299,13 @@ class ControllerApplication(zigpy.application.ControllerApplication):
                             data=packet.data.serialize(),
                             relays=force_relays,
                             extended_timeout=packet.extended_timeout,
+                            priority_class=priority_class,
+                            deadline=deadline,
                         )
                         succeeded = True
                         break
+                    except RequestExpired:
+                        raise self._drop_expired_packet("queue") from None
                     except InvalidCommandResponse as e:
                         status = e.response.Status
 
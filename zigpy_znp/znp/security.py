@@ -154,41 +154,58 @@ async def write_nwk_frame_counter(
         )
 
 
-async def read_addr_manager_entries(znp: ZNP) -> typing.Sequence[t.AddrMgrEntry]:
+async def read_struct_table(
+    znp: ZNP, rows: typing.AsyncIterator[bytes], item_type: type[t.CStruct]
+) -> t.CStructArray:
+    """
+    Reads the raw entries of an NVRAM table and decodes them all at once.
+    """
+
+    size = item_type.get_size(align=znp.nvram.align_structs)
+    data = []
+
+    async for row in rows:
+        if len(row) != size:
+            raise ValueError(f"Invalid {item_type.__name__} table entry: {row!r}")
+
+        data.append(row)
+
+    return t.CStructArray(item_type, b"".join(data), align=znp.nvram.align_structs)
+
+
+async def read_addr_manager_entries(znp: ZNP) -> t.CStructArray:
     if znp.version >= 3.30:
-        entries = [
-            entry
-            async for entry in znp.nvram.read_table(
-                item_id=ExNvIds.ADDRMGR,
-                item_type=t.AddrMgrEntry,
-            )
-        ]
-    else:
-        entries = list(
-            await znp.nvram.osal_read(
-                OsalNvIds.ADDRMGR, item_type=t.AddressManagerTable
-            )
+        return await read_struct_table(
+            znp,
+            znp.nvram.read_table(item_id=ExNvIds.ADDRMGR, item_type=t.Bytes),
+            t.AddrMgrEntry,
         )
 
-    return entries
+    # On older devices this "table" is a single array in NVRAM
+    data = await znp.nvram.osal_read(OsalNvIds.ADDRMGR, item_type=t.Bytes)
+
+    return t.CStructArray(t.AddrMgrEntry, data, align=znp.nvram.align_structs)
 
 
 async def read_hashed_link_keys(  # type:ignore[misc]
     znp: ZNP, tclk_seed: t.KeyData
 ) -> typing.AsyncGenerator[zigpy.state.Key, None]:
     if znp.version >= 3.30:
-        entries = znp.nvram.read_table(
+        rows = znp.nvram.read_table(
             item_id=ExNvIds.TCLK_TABLE,
-            item_type=t.TCLKDevEntry,
+            item_type=t.Bytes,
         )
     else:
-        entries = znp.nvram.osal_read_table(
+        rows = znp.nvram.osal_read_table(
             start_nvid=OsalNvIds.LEGACY_TCLK_TABLE_START,
             end_nvid=OsalNvIds.LEGACY_TCLK_TABLE_END,
-            item_type=t.TCLKDevEntry,
+            item_type=t.Bytes,
         )
 
-    async for entry in entries:
+    entries = await read_struct_table(znp, rows, t.TCLKDevEntry)
+
+    # Erased entries are skipped before they are decoded
+    for entry in entries.live():
         if entry.extAddr == t.EUI64.convert("00:00:00:00:00:00:00:00"):
             continue
 
@@ -210,21 +227,22 @@ async def read_unhashed_link_keys(
 ) -> typing.AsyncGenerator[zigpy.state.Key, None]:
     if znp.version == 3.30:
         link_key_offset_base = 0x0000
-        table = znp.nvram.read_table(
+        rows = znp.nvram.read_table(
             item_id=ExNvIds.APS_KEY_DATA_TABLE,
-            item_type=t.APSKeyDataTableEntry,
+            item_type=t.Bytes,
         )
     elif znp.version == 3.0:
         link_key_offset_base = OsalNvIds.LEGACY_APS_LINK_KEY_DATA_START
-        table = znp.nvram.osal_read_table(
+        rows = znp.nvram.osal_read_table(
             start_nvid=OsalNvIds.LEGACY_APS_LINK_KEY_DATA_START,
             end_nvid=OsalNvIds.LEGACY_APS_LINK_KEY_DATA_END,
-            item_type=t.APSKeyDataTableEntry,
+            item_type=t.Bytes,
         )
     else:
         return
 
-    aps_key_data_table = [entry async for entry in table]
+    # Only the entries referenced by the link key table are decoded
+    aps_key_data_table = await read_struct_table(znp, rows, t.APSKeyDataTableEntry)
 
     # The link key table's size is dynamic so it has junk at the end
     link_key_table_raw = await znp.nvram.osal_read(
@@ -260,7 +278,9 @@ async def read_devices(
     addr_mgr = await read_addr_manager_entries(znp)
     devices = {}
 
-    for entry in addr_mgr:
+    for entry in addr_mgr.live(
+        empty=[const.EMPTY_ADDR_MGR_ENTRY_ZSTACK1, const.EMPTY_ADDR_MGR_ENTRY_ZSTACK3]
+    ):
         if entry.extAddr in (
             t.EUI64.convert("00:00:00:00:00:00:00:00"),
             t.EUI64.convert("FF:FF:FF:FF:FF:FF:FF:FF"),